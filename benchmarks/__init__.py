@@ -0,0 +1 @@
+"""Benchmarks for the dashboard sections; see benchmarks.run."""
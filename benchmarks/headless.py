@@ -0,0 +1,64 @@
+"""A stand-in for the `streamlit` module that renders sections headlessly.
+
+Widgets and layout come from stelle.headless.HeadlessStreamlit; here every
+chart or table is serialised the way Streamlit would (Plotly figures to JSON,
+frames to Arrow IPC) so its payload size and serialisation cost are part of
+the measurement.
+"""
+import time
+
+import pyarrow as pa
+
+from stelle.headless import HeadlessStreamlit
+
+
+def _arrow_bytes(data):
+    frame = getattr(data, "data", data)  # Styler wraps its frame
+    if isinstance(frame, dict):
+        frame = pa.table(frame)
+    table = frame if isinstance(frame, pa.Table) else pa.Table.from_pandas(frame)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().size
+
+
+class RecordingStreamlit(HeadlessStreamlit):
+    """Records the elements a section emits instead of sending them to a browser."""
+
+    def __init__(self):
+        self.elements = []
+
+    # Elements
+    def _record(self, kind, payload_bytes=0, seconds=0.0):
+        self.elements.append({"kind": kind, "bytes": payload_bytes, "serialize_s": seconds})
+
+    def plotly_chart(self, figure, **kwargs):
+        start = time.perf_counter()
+        size = len(figure.to_json())
+        self._record("plotly_chart", size, time.perf_counter() - start)
+
+    def dataframe(self, data, **kwargs):
+        start = time.perf_counter()
+        if hasattr(data, "to_html"):
+            # Streamlit renders a Styler's computed styles alongside the data
+            getattr(data, "_compute", lambda: None)()
+        size = _arrow_bytes(data)
+        self._record("dataframe", size, time.perf_counter() - start)
+
+    table = dataframe
+
+    def metric(self, *args, **kwargs):
+        self._record("metric")
+
+    def _text(self, *args, **kwargs):
+        self._record("text")
+
+    markdown = header = subheader = caption = text = write = _text
+    warning = success = info = error = _text
+
+    def payload_bytes(self):
+        return sum(element["bytes"] for element in self.elements)
+
+    def serialize_seconds(self):
+        return sum(element["serialize_s"] for element in self.elements)
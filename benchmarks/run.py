@@ -0,0 +1,169 @@
+"""Benchmarks for every dashboard section at scalable data volumes.
+
+    python -m benchmarks.run --rows 1e3 1e4 1e5 1e6
+    python -m benchmarks.run --rows 1e6 --baseline benchmarks/results/<commit>.json
+
+Each volume runs in fresh interpreters, so caches and peak memory do not leak
+between sizes. Synthetic order lines (stelle.data.synthetic_orders) are
+sharded once, then every section in SECTIONS is rendered through the headless
+stand-in for `st`:
+
+- cold: the first render in the process. Sections run in registry order, so a
+  cache shared by several sections (e.g. traffic) is charged to the first one.
+- warm: the identical rerun a widget interaction would trigger.
+- peak memory: a second interpreter repeats the cold renders under
+  tracemalloc, so the tracing overhead stays out of the timings.
+
+Results go to benchmarks/results/<commit>.json and are compared against a
+baseline file when one is given. 1e8 rows needs on the order of 10 GB.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+DEFAULT_ROWS = [1e3, 1e4, 1e5, 1e6]
+SLOWER_RATIO = 1.2
+
+
+def _render(name, ctx):
+    from benchmarks.headless import RecordingStreamlit
+    from stelle.sections import render
+
+    st = RecordingStreamlit()
+    start = time.perf_counter()
+    render(name, st, ctx)
+    return time.perf_counter() - start, st
+
+
+def measure(rows, trace=False):
+    """Render every section at `rows` order lines in this interpreter."""
+    from stelle.data import synthetic_orders
+    from stelle.sections import SECTIONS, SectionContext
+    from stelle.shards import shards_for
+
+    start = time.perf_counter()
+    dataset = synthetic_orders(rows)
+    generate_s = time.perf_counter() - start
+    start = time.perf_counter()
+    shards = shards_for(dataset)
+    ctx = SectionContext(data=dataset, dataset=dataset, cube=shards.cube(), shards=shards)
+    result = {"rows": rows, "generate_s": generate_s, "shard_s": time.perf_counter() - start, "sections": {}}
+    for name in SECTIONS:
+        if trace:
+            tracemalloc.start()
+            _render(name, ctx)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            result["sections"][name] = {"peak_mb": peak / 2**20}
+            continue
+        cold_s, st = _render(name, ctx)
+        warm_s, _ = _render(name, ctx)
+        result["sections"][name] = {
+            "cold_s": cold_s,
+            "warm_s": warm_s,
+            "serialize_s": st.serialize_seconds(),
+            "payload_bytes": st.payload_bytes(),
+            "elements": len(st.elements),
+        }
+    return result
+
+
+def _worker(rows, trace):
+    command = [sys.executable, "-m", "benchmarks.run", "--worker", str(rows)] + (["--trace"] if trace else [])
+    done = subprocess.run(command, capture_output=True, text=True, cwd=os.path.dirname(os.path.dirname(__file__)))
+    if done.returncode:
+        return {"rows": rows, "error": done.stderr.strip().splitlines()[-1:] or [f"exit {done.returncode}"]}
+    return json.loads(done.stdout.strip().splitlines()[-1])
+
+
+def run(sizes):
+    results = []
+    for rows in sizes:
+        timed = _worker(rows, trace=False)
+        if "error" not in timed:
+            traced = _worker(rows, trace=True)
+            for name, section in traced.get("sections", {}).items():
+                timed["sections"][name].update(section)
+        results.append(timed)
+        print(format_result(timed), flush=True)
+    return results
+
+
+def format_result(result):
+    if "error" in result:
+        return f"{result['rows']:>12,} rows  FAILED: {result['error'][0]}"
+    lines = [f"{result['rows']:>12,} rows  generate {result['generate_s']:.2f}s  shard {result['shard_s']:.2f}s"]
+    for name, section in result["sections"].items():
+        lines.append(f"    {name:<22} cold {section['cold_s'] * 1000:9.1f}ms  warm {section['warm_s'] * 1000:8.1f}ms"
+                     f"  peak {section.get('peak_mb', float('nan')):8.1f}MB  payload {section['payload_bytes'] / 1024:8.1f}KB")
+    return "\n".join(lines)
+
+
+def compare(results, baseline):
+    """Print cold-render ratios against `baseline` results for matching sizes."""
+    previous = {entry["rows"]: entry for entry in baseline["results"] if "error" not in entry}
+    for result in results:
+        old = previous.get(result["rows"])
+        if old is None or "error" in result:
+            continue
+        for name, section in result["sections"].items():
+            before = old["sections"].get(name)
+            if before is None:
+                continue
+            ratio = section["cold_s"] / before["cold_s"] if before["cold_s"] else float("inf")
+            flag = "  SLOWER" if ratio > SLOWER_RATIO else ""
+            print(f"{result['rows']:>12,} {name:<22} {before['cold_s'] * 1000:9.1f}ms -> {section['cold_s'] * 1000:9.1f}ms"
+                  f"  x{ratio:.2f}{flag}")
+
+
+def _commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def _versions():
+    import numpy
+    import pandas
+    import plotly
+    return {"python": platform.python_version(), "numpy": numpy.__version__,
+            "pandas": pandas.__version__, "plotly": plotly.__version__}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark every dashboard section headlessly.")
+    parser.add_argument("--rows", type=float, nargs="+", default=DEFAULT_ROWS, help="order-line counts, e.g. 1e3 1e6")
+    parser.add_argument("--out", help="results file (default: benchmarks/results/<commit>.json)")
+    parser.add_argument("--baseline", help="earlier results file to compare cold renders against")
+    parser.add_argument("--worker", type=float, help=argparse.SUPPRESS)
+    parser.add_argument("--trace", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker is not None:
+        print(json.dumps(measure(int(args.worker), trace=args.trace)))
+        return
+
+    commit = _commit()
+    results = run([int(rows) for rows in args.rows])
+    out = args.out or os.path.join(RESULTS_DIR, f"{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w") as handle:
+        json.dump({"commit": commit, "created": datetime.now(timezone.utc).isoformat(),
+                   "versions": _versions(), "results": results}, handle, indent=1)
+    print(f"Wrote {out}")
+    if args.baseline:
+        with open(args.baseline) as handle:
+            compare(results, json.load(handle))
+
+
+if __name__ == "__main__":
+    main()
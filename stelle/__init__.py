@@ -0,0 +1 @@
+"""Data and analytics layer behind the Stelle Restaurant Analytics Dashboard."""
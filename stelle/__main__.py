@@ -0,0 +1,118 @@
+"""Headless entry points, run as `python -m stelle <command>`.
+
+    python -m stelle precompute --out snapshots
+
+writes a KPI snapshot (see stelle.snapshots) for the dashboard to load; point
+the dashboard at the same root with $STELLE_SNAPSHOTS. Suitable for cron.
+
+    python -m stelle generate --rows 1e8 --out fixtures
+
+writes seeded synthetic orders, reviews, rosters and inventory (see
+stelle.generate) and prints the environment that points the dashboard at them.
+
+    python -m stelle partition --source orders.parquet --out orders
+
+rewrites an order export as Parquet partitioned by location and month (see
+stelle.storage), so date-range views read only the months they show.
+
+    python -m stelle report --out reports --workers 8
+
+renders every dashboard section for each location to static HTML pages that
+open offline (see stelle.reports); suitable for a nightly cron job. Browsers
+print the pages to PDF.
+
+Each command imports only the modules it needs when it runs, so `generate`
+does not pay for Plotly or the dashboard sections.
+"""
+import argparse
+import os
+import time
+
+from stelle.importtime import timed_import
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m stelle", description="Stelle dashboard tools.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    precompute = commands.add_parser("precompute", help="write a KPI snapshot for the dashboard")
+    precompute.add_argument("--source", help="order export (default: $STELLE_DATA, else sample data)")
+    precompute.add_argument("--reviews", help="review export (default: $STELLE_REVIEWS, else sample reviews)")
+    precompute.add_argument("--out", default=os.environ.get("STELLE_SNAPSHOTS", "snapshots"),
+                            help="snapshot root (default: $STELLE_SNAPSHOTS, else ./snapshots)")
+    precompute.add_argument("--keep", type=int, help="versions to keep (default: stelle.snapshots.KEEP_VERSIONS)")
+    generate = commands.add_parser("generate", help="write seeded synthetic data for load testing")
+    generate.add_argument("--rows", type=float, default=1e6, help="approximate order lines (default: 1e6)")
+    generate.add_argument("--out", default="fixtures", help="output directory (default: ./fixtures)")
+    generate.add_argument("--years", type=int, default=3, help="years of history (default: 3)")
+    generate.add_argument("--start", default="2022-01-01", help="first day (default: 2022-01-01)")
+    generate.add_argument("--locations", type=int, default=8, help="number of locations (default: 8)")
+    generate.add_argument("--seed", type=int, default=0)
+    generate.add_argument("--chunk-rows", type=float, default=2e6, help="order lines per write (default: 2e6)")
+    generate.add_argument("--overwrite", action="store_true", help="replace existing orders under --out")
+    partition = commands.add_parser("partition", help="rewrite an order export partitioned by location and month")
+    partition.add_argument("--source", help="order export (default: $STELLE_DATA, else sample data)")
+    partition.add_argument("--out", required=True, help="dataset root; partitions present in the export are replaced")
+    report = commands.add_parser("report", help="render every section per location to static HTML")
+    report.add_argument("--source", help="order export (default: $STELLE_DATA, else sample data)")
+    report.add_argument("--out", default="reports", help="output directory (default: ./reports)")
+    report.add_argument("--locations", nargs="+", help="locations to report on (default: every location)")
+    report.add_argument("--sections", nargs="+", metavar="SECTION",
+                        help="sections to include, as named in the dashboard (default: all)")
+    report.add_argument("--start", help="first day to include (default: the first in the data)")
+    report.add_argument("--end", help="last day to include (default: the last in the data)")
+    report.add_argument("--time-period", choices=["Daily", "Weekly", "Monthly"], default="Daily")
+    report.add_argument("--theme", choices=["Light Mode", "Dark Mode"], default="Light Mode")
+    report.add_argument("--workers", type=int, help="worker processes (default: one per CPU)")
+    args = parser.parse_args(argv)
+
+    if args.command == "precompute":
+        start = time.perf_counter()
+        snapshots = timed_import("stelle.snapshots")
+        data, sentiment = timed_import("stelle.data"), timed_import("stelle.sentiment")
+        os.makedirs(args.out, exist_ok=True)
+        keep = snapshots.KEEP_VERSIONS if args.keep is None else args.keep
+        path = snapshots.write_snapshot(args.out, data.load_data(args.source), sentiment.load_reviews(args.reviews), keep=keep)
+        print(f"Wrote {path} in {time.perf_counter() - start:.1f}s")
+    elif args.command == "generate":
+        start = time.perf_counter()
+        generator = timed_import("stelle.generate")
+        config = generator.GeneratorConfig(rows=int(args.rows), start=args.start, years=args.years, locations=args.locations,
+                                 seed=args.seed, chunk_rows=int(args.chunk_rows))
+        try:
+            paths = generator.generate(config, args.out, overwrite=args.overwrite)
+        except FileExistsError:
+            parser.error(f"{args.out} already holds generated orders; pass --overwrite to replace them")
+        print(f"Generated in {time.perf_counter() - start:.1f}s; to use it:")
+        for name, path in paths.items():
+            if name.startswith("STELLE_"):
+                print(f"  export {name}={os.path.abspath(path)}")
+    elif args.command == "partition":
+        start = time.perf_counter()
+        data, storage = timed_import("stelle.data"), timed_import("stelle.storage")
+        index = storage.write_partitioned(data.load_data(args.source), args.out)
+        print(f"Wrote {len(index.files):,} files in {time.perf_counter() - start:.1f}s; to use it:")
+        print(f"  export STELLE_DATA={os.path.abspath(args.out)}")
+    elif args.command == "report":
+        start = time.perf_counter()
+        if args.source:
+            # Sections reach the data through $STELLE_DATA too (on-disk query
+            # engines, the alert monitor); workers inherit it
+            os.environ["STELLE_DATA"] = args.source
+        sections = timed_import("stelle.sections").SECTIONS
+        unknown = [name for name in args.sections or [] if name not in sections]
+        if unknown:
+            parser.error(f"unknown sections {', '.join(unknown)}; choose from {', '.join(sections)}")
+        try:
+            pages, failures = timed_import("stelle.reports").build_reports(args.out, args.source, args.locations, args.sections, args.start, args.end,
+                                            args.time_period, args.theme, args.workers)
+        except ValueError as error:
+            parser.error(str(error))
+        print(f"Wrote {len(pages)} pages in {time.perf_counter() - start:.1f}s to {os.path.join(args.out, 'index.html')}")
+        for location, name, failure in failures:
+            print(f"  {location}: {name} failed: {failure}")
+        if failures:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
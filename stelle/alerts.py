@@ -0,0 +1,324 @@
+"""Streaming anomaly alerts over per-location metric series.
+
+Every (location, metric) pair is a series, and an AlertEngine keeps the
+statistics of all of them in numpy arrays, one slot per series. A new period
+updates every series with a handful of vector operations, O(1) per
+observation however long the history:
+
+    EWMA              exponentially weighted mean and variance
+    Rolling z-score   running sum and sum of squares over the last `window`
+                      observations, kept in a ring buffer
+    Seasonal          an EWMA baseline per season slot (weekday for daily
+                      periods, hour of the week for finer ones) and an EWMA
+                      variance of the residuals from it
+
+Each observation is scored against the statistics from before it. An alert
+opens when the score reaches `threshold` and stays active until the series
+scores below `clear` again.
+
+An AlertMonitor runs the engine in a background thread. It feeds it the
+closed periods of the dashboard data, and each scan loads and aggregates
+only the rows from the last day it fed; partitioned datasets are pruned to
+those days' files (see stelle.storage). The newest day is still open and
+waits for the next one. The dashboard reads the published active alerts
+without waiting.
+"""
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from stelle.data import data_extent, load_data
+from stelle.importtime import timed_import
+
+METRICS = {"Sales": "sum", "Customers": "sum", "Service Time": "mean", "Staff Present": "mean"}
+DETECTORS = ("EWMA", "Rolling z-score", "Seasonal")
+ALERT_COLUMNS = ["Location", "Metric", "Detector", "Since", "Period", "Value", "Expected", "Score"]
+ALERT_INTERVAL = float(os.environ.get("STELLE_ALERT_INTERVAL", "60"))
+ALERT_FREQ = os.environ.get("STELLE_ALERT_FREQ", "D")
+# Engine state: arrays with one row per series, and per detector and series
+SERIES_STATE = {"count": np.int64, "mean": float, "var": float, "ring": float, "head": np.int64, "filled": np.int64,
+                "total": float, "squares": float, "baseline": float, "seen": bool, "residual_var": float,
+                "residuals": np.int64}
+DETECTOR_STATE = {"active": bool, "since": np.int64, "last": np.int64, "value": float, "expected": float,
+                  "score": float}
+
+
+class AlertEngine:
+    """Anomaly scores and active alerts for many metric series, updated together."""
+
+    def __init__(self, slots=7, window=28, alpha=0.1, seasonal_alpha=0.2, threshold=3.0, clear=2.0):
+        self.slots = slots
+        self.window = window
+        self.alpha = alpha
+        self.seasonal_alpha = seasonal_alpha
+        self.threshold = threshold
+        self.clear = clear
+        self.keys = []
+        self._positions = {}
+        shapes = {"ring": (window,), "baseline": (slots,), "seen": (slots,)}
+        for name, dtype in SERIES_STATE.items():
+            setattr(self, name, np.zeros((0, *shapes.get(name, ())), dtype=dtype))
+        for name, dtype in DETECTOR_STATE.items():
+            setattr(self, name, np.zeros((len(DETECTORS), 0), dtype=dtype))
+
+    def positions(self, keys):
+        """Array positions of `keys`, adding series not seen before."""
+        new = [key for key in dict.fromkeys(keys) if key not in self._positions]
+        if new:
+            for key in new:
+                self._positions[key] = len(self.keys)
+                self.keys.append(key)
+            for name in SERIES_STATE:
+                state = getattr(self, name)
+                setattr(self, name, np.concatenate([state, np.zeros((len(new), *state.shape[1:]), state.dtype)]))
+            for name in DETECTOR_STATE:
+                state = getattr(self, name)
+                setattr(self, name, np.concatenate([state, np.zeros((len(DETECTORS), len(new)), state.dtype)], axis=1))
+        return np.array([self._positions[key] for key in keys], dtype=np.int64)
+
+    def update(self, period, slot, values):
+        """Score and absorb one period's `values`, one per series (NaN where unobserved)."""
+        period = pd.Timestamp(period).value
+        x = np.asarray(values, dtype=float)
+        ok = ~np.isnan(x)
+        x = np.where(ok, x, 0.0)
+        warm = self.count >= self.window
+        scores = np.full((len(DETECTORS), len(x)), np.nan)
+        expected = np.empty_like(scores)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # EWMA: score against the mean and variance so far, then fold x in
+            expected[0] = self.mean
+            scores[0] = np.where(ok & warm, (x - self.mean) / np.sqrt(self.var), np.nan)
+            diff = x - self.mean
+            first = ok & (self.count == 0)
+            self.var = np.where(ok & ~first, (1 - self.alpha) * (self.var + self.alpha * diff * diff), self.var)
+            self.mean = np.where(first, x, np.where(ok, self.mean + self.alpha * diff, self.mean))
+
+            # Rolling z-score over the ring buffer's window
+            full = self.filled >= self.window
+            mean = self.total / self.filled
+            expected[1] = mean
+            scores[1] = np.where(ok & full, (x - mean) / np.sqrt(np.maximum(self.squares / self.filled - mean * mean, 0)),
+                                 np.nan)
+            rows = np.flatnonzero(ok)
+            leaving = np.where(full, self.ring[np.arange(len(x)), self.head], 0.0)
+            self.total = np.where(ok, self.total + x - leaving, self.total)
+            self.squares = np.where(ok, self.squares + x * x - leaving * leaving, self.squares)
+            self.ring[rows, self.head[rows]] = x[rows]
+            self.head = np.where(ok, (self.head + 1) % self.window, self.head)
+            self.filled = np.where(ok, np.minimum(self.filled + 1, self.window), self.filled)
+            # Running sums drift; resum each series once per pass over its buffer
+            resum = np.flatnonzero(ok & (self.head == 0) & (self.filled == self.window))
+            self.total[resum] = self.ring[resum].sum(axis=1)
+            self.squares[resum] = (self.ring[resum] ** 2).sum(axis=1)
+
+            # Seasonal: residual from this slot's baseline, scored by the residual variance
+            seen = self.seen[:, slot]
+            baseline = self.baseline[:, slot]
+            residual = x - baseline
+            expected[2] = baseline
+            scores[2] = np.where(ok & seen & (self.residuals >= self.window),
+                                 residual / np.sqrt(self.residual_var), np.nan)
+            fold = ok & seen
+            self.residual_var = np.where(fold, np.where(self.residuals == 0, residual * residual,
+                                                        (1 - self.alpha) * self.residual_var
+                                                        + self.alpha * residual * residual), self.residual_var)
+            self.residuals = self.residuals + fold
+            self.baseline[:, slot] = np.where(ok, np.where(seen, baseline + self.seasonal_alpha * residual, x), baseline)
+            self.seen[:, slot] = seen | ok
+
+        self.count = self.count + ok
+        magnitude = np.abs(scores)
+        breach = magnitude >= self.threshold
+        opened = breach & ~self.active
+        self.since = np.where(opened, period, self.since)
+        self.last = np.where(breach, period, self.last)
+        self.value = np.where(breach, x, self.value)
+        self.expected = np.where(breach, expected, self.expected)
+        self.score = np.where(breach, scores, self.score)
+        self.active = (self.active | breach) & ~(magnitude < self.clear)
+        return int(opened.sum())
+
+    def alerts(self):
+        """Active alerts, strongest first, as a frame of ALERT_COLUMNS."""
+        detector, series = np.nonzero(self.active)
+        if not len(series):
+            return pd.DataFrame(columns=ALERT_COLUMNS)
+        frame = pd.DataFrame({
+            "Location": [self.keys[i][0] for i in series],
+            "Metric": [self.keys[i][1] for i in series],
+            "Detector": [DETECTORS[d] for d in detector],
+            "Since": pd.to_datetime(self.since[detector, series]),
+            "Period": pd.to_datetime(self.last[detector, series]),
+            "Value": self.value[detector, series],
+            "Expected": self.expected[detector, series],
+            "Score": self.score[detector, series],
+        })
+        return frame.iloc[np.argsort(-np.abs(frame["Score"].to_numpy()), kind="stable")].reset_index(drop=True)
+
+
+def period_label(period):
+    """A period as its day, with the time only for periods shorter than a day."""
+    return f"{period:%Y-%m-%d}" if period == period.normalize() else f"{period:%Y-%m-%d %H:%M}"
+
+
+def describe(alert):
+    """One-line summary of an alert row."""
+    direction = "above" if alert["Value"] > alert["Expected"] else "below"
+    return (f"{alert['Location']}: {alert['Metric']} {alert['Value']:,.1f} is {direction} "
+            f"the expected {alert['Expected']:,.1f} ({alert['Detector']}, {period_label(alert['Period'])})")
+
+
+def _step(freq):
+    epoch = pd.Timestamp(0)
+    return epoch + pd.tseries.frequencies.to_offset(freq) - epoch
+
+
+def period_table(rows, freq, first_day, last_day):
+    """METRICS per period (rows) and location (columns) over the days [first_day, last_day)."""
+    fine = "Timestamp" in rows and _step(freq) < pd.Timedelta(days=1)
+    periods = (rows["Timestamp"] if fine else rows["Date"]).dt.floor(freq).rename("Period")
+    metrics = [metric for metric in METRICS if metric in rows]
+    grouped = rows.groupby([periods, rows["Location"]], observed=True)
+    table = grouped.agg(**{metric: (metric, METRICS[metric]) for metric in metrics}).unstack("Location")
+    table = table.reindex(pd.date_range(first_day, last_day, freq=freq, inclusive="left"))
+    # Sums over periods without orders are zero; means stay unobserved
+    for metric in metrics:
+        if METRICS[metric] == "sum":
+            table[metric] = table[metric].fillna(0)
+    return table
+
+
+class AlertMonitor:
+    """Background worker feeding closed periods of the dashboard data to an AlertEngine."""
+
+    def __init__(self, source=None, load=load_data, freq=ALERT_FREQ, interval=ALERT_INTERVAL):
+        self.source = source
+        self.load = load
+        self.freq = freq
+        self.interval = interval
+        self.engine = None
+        self.ready = False
+        self.error = None
+        self._first = None
+        self._fed_day = None
+        self._fed_history = None
+        self._published = pd.DataFrame(columns=ALERT_COLUMNS)
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._scanned = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="stelle-alerts", daemon=True)
+        self.thread.start()
+
+    def _new_engine(self):
+        return AlertEngine(slots=7 if _step(self.freq) >= pd.Timedelta(days=1) else 7 * 24)
+
+    def _slot(self, period):
+        return period.dayofweek if self.engine.slots == 7 else period.dayofweek * 24 + period.hour
+
+    def _run(self):
+        while True:
+            try:
+                self.scan()
+                self.error = None
+            except Exception as error:  # keep serving the last alerts; retry next interval
+                self.error = error
+            self._scanned.set()
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def wake(self):
+        """Scan now rather than at the next interval."""
+        self._wake.set()
+
+    def wait(self, timeout=None):
+        """Block until the first scan has finished or failed; returns whether alerts are ready."""
+        self._scanned.wait(timeout)
+        return self.ready
+
+    def _closed(self, day):
+        """(what identifies the rows before `day` that a load from `since` skips, `since`).
+
+        Partitioned sources are identified by their files wholly before `day`,
+        and `since` is the first day of the files holding `day` or later ones,
+        which a load reads anyway. A single export is read whole and held by
+        the data cache, so its row count before `day` serves.
+        """
+        source = self.source or os.environ.get("STELLE_DATA")
+        if source and os.path.isdir(source):
+            storage = timed_import("stelle.storage")
+            if storage.is_partitioned(source):
+                files = storage.partition_index(source).files
+                since = min([day] + [part.first.normalize() for part in files if part.last >= day])
+                return tuple(sorted((part.path, part.bytes) for part in files if part.last < day)), since
+        return int(self.load(self.source)["Date"].searchsorted(day)), day
+
+    def scan(self):
+        """Feed the days completed since the previous scan; returns the number of periods fed.
+
+        Only rows from about the last fed day on are loaded, so a partitioned
+        source reads just the files holding the new days.
+        """
+        first, newest, _ = data_extent(self.source)
+        if first is None:
+            return 0
+        last_closed = newest - pd.Timedelta(days=1)
+        rows = None
+        if self.engine is not None and first == self._first:
+            closed, since = self._closed(self._fed_day)
+            rows = self.load(self.source, since, last_closed)
+            kept = int(rows["Date"].searchsorted(self._fed_day))
+            if (closed, kept) != self._fed_history:
+                rows = None
+        if rows is None:
+            # Not an extension of what was fed: replay from the beginning
+            self.engine, self._first, self._fed_day = self._new_engine(), first, first
+            rows = self.load(self.source, first, last_closed)
+        if newest <= self._fed_day:
+            self._publish()
+            return 0
+        dates = rows["Date"]
+        table = period_table(rows.iloc[int(dates.searchsorted(self._fed_day)):], self.freq, self._fed_day, newest)
+        metrics = table.columns.get_level_values(0)
+        positions = self.engine.positions(list(zip(table.columns.get_level_values(1), metrics)))
+        values = np.full((len(table), len(self.engine.keys)), np.nan)
+        values[:, positions] = table.to_numpy(dtype=float)
+        for period, row in zip(table.index, values):
+            self.engine.update(period, self._slot(period), row)
+        closed, since = self._closed(newest)
+        self._fed_day, self._fed_history = newest, (closed, len(rows) - int(dates.searchsorted(since)))
+        self._publish()
+        return len(table)
+
+    def _publish(self):
+        alerts = self.engine.alerts()
+        with self._lock:
+            self._published = alerts
+            self.ready = True
+
+    def active(self, locations=None, metrics=None):
+        """The latest published alerts, optionally for some locations or metrics only."""
+        with self._lock:
+            alerts = self._published
+        if locations is not None:
+            alerts = alerts[alerts["Location"].isin(locations)]
+        if metrics is not None:
+            alerts = alerts[alerts["Metric"].isin(metrics)]
+        return alerts.reset_index(drop=True)
+
+
+_monitors = {}
+_monitors_lock = threading.Lock()
+
+
+def alert_monitor():
+    """Process-wide AlertMonitor over the dashboard data, started on first use."""
+    key = (os.environ.get("STELLE_DATA"), ALERT_FREQ)
+    with _monitors_lock:
+        monitor = _monitors.get(key)
+        if monitor is None:
+            monitor = _monitors[key] = AlertMonitor()
+        return monitor
@@ -0,0 +1,86 @@
+"""Static assets for the dashboard chrome, loaded once per process.
+
+Streamlit reruns the whole script on every interaction. Passing a path to
+`st.image` rereads the file each time, so images are read on first use and
+served from memory afterwards; theme and section CSS are constants. Restart
+the app to pick up a changed image.
+
+SECTION_CSS styles the cards, tables and metrics of every section. The shell
+injects it once per run, so fragment reruns of a section add nothing to the
+page, and the static reports embed it in each page's stylesheet.
+"""
+import threading
+
+THEME_CSS = {
+    "Dark Mode": """
+        <style>
+            .stApp {
+                background-color: #2E2E2E;
+                color: white;
+            }
+        </style>
+    """,
+}
+
+SECTION_CSS = """
+    .card {
+        background-color: #f0f2f5;
+        border-radius: 10px;
+        padding: 20px;
+        margin: 10px;
+        box-shadow: 0 2px 5px rgba(0, 0, 0, 0.1);
+    }
+    .ai-bot {
+        background-color: #e7f3fe;
+        border-left: 5px solid #2196F3;
+        padding: 10px;
+        margin: 10px 0;
+        border-radius: 5px;
+    }
+    .alert-table, .feedback-table {
+        border-collapse: collapse;
+        width: 100%;
+    }
+    .alert-table th, .alert-table td, .feedback-table th, .feedback-table td {
+        border: 1px solid #ddd;
+        padding: 8px;
+    }
+    .alert-table th, .feedback-table th {
+        background-color: #2196F3;
+        color: white;
+    }
+    .alert-table tr:nth-child(even), .feedback-table tr:nth-child(even) {
+        background-color: #f2f2f2;
+    }
+    .alert-table tr:hover, .feedback-table tr:hover {
+        background-color: #ddd;
+    }
+    div[data-testid="stMetricValue"] {
+        font-size: 24px;
+        color: #e153b5;
+    }
+    div.stMetricLabel {
+        font-size: 16px;
+        color: #666666;
+    }
+    div[data-testid="metric-container"] {
+        background-color: #ffffff;
+        border: 1px solid #e6e6e6;
+        border-radius: 8px;
+        padding: 15px;
+        box-shadow: 0 2px 4px rgba(0,0,0,0.05);
+    }
+"""
+
+_images = {}
+_images_lock = threading.Lock()
+
+
+def image(path):
+    """Contents of the image at `path`, read from disk the first time only."""
+    with _images_lock:
+        data = _images.get(path)
+        if data is None:
+            with open(path, "rb") as handle:
+                data = _images[path] = handle.read()
+    return data
@@ -0,0 +1,216 @@
+"""Customer cohort retention for the Customer Insights section.
+
+Customers are identified by the order data's "Customer ID" and grouped into
+cohorts by the period (week or month) of their first order. The retention
+matrix counts, for every cohort and every period since, the customers of
+the cohort who ordered in that period.
+
+The matrix is built incrementally, without a per-customer loop. IDs map to
+dense codes, and two arrays indexed by code hold each customer's first and
+last active period. A batch of new order rows is reduced to its distinct
+(customer, period) pairs. Pairs in a period after the customer's last one
+are new activity, and one bincount adds them to the matrix. The same pass
+counts customers who were also active in the previous period, which gives
+period-over-period retention. Appending days costs time in proportion to the
+new rows, whatever the history.
+
+Matrices are kept per dataset and grain in a registry; see `cohorts_for`.
+"""
+import threading
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from stelle import perf
+from stelle.data import DATASETS_KEPT, dataset_key
+
+CUSTOMER_COLUMN = "Customer ID"
+GRAINS = ("Weekly", "Monthly")
+
+
+def period_numbers(dates, grain):
+    """Integer period of each date: months or Monday-based weeks since the epoch."""
+    days = np.asarray(dates, dtype="datetime64[D]")
+    if grain == "Monthly":
+        return days.astype("datetime64[M]").astype(np.int64)
+    # 1970-01-01 was a Thursday; shift so weeks start on Monday
+    return (days.astype(np.int64) + 3) // 7
+
+
+def period_starts(numbers, grain):
+    """First day of each integer period from `period_numbers`."""
+    numbers = np.asarray(numbers, dtype=np.int64)
+    if grain == "Monthly":
+        return pd.DatetimeIndex(numbers.astype("datetime64[M]").astype("datetime64[ns]"))
+    return pd.DatetimeIndex((numbers * 7 - 3).astype("datetime64[D]").astype("datetime64[ns]"))
+
+
+class CohortMatrix:
+    """Cohort x period retention counts, extended as order rows arrive in date order."""
+
+    def __init__(self, grain="Monthly"):
+        if grain not in GRAINS:
+            raise ValueError(f"Unknown cohort grain {grain!r}; expected one of {', '.join(GRAINS)}")
+        self.grain = grain
+        self.rows = 0
+        self.last_date = None
+        self.origin = None
+        self.counts = np.zeros((0, 0), dtype=np.int64)
+        self.active = np.zeros(0, dtype=np.int64)
+        self.returning = np.zeros(0, dtype=np.int64)
+        self._sorted = None
+        self._sorted_codes = np.zeros(0, dtype=np.int64)
+        self._first = np.zeros(0, dtype=np.int64)
+        self._last = np.zeros(0, dtype=np.int64)
+        self._views = {}
+        self._lock = threading.Lock()
+
+    @property
+    def customers(self):
+        return len(self._sorted_codes)
+
+    def _codes(self, ids):
+        """Dense codes for customer IDs, assigning new codes to IDs not seen before."""
+        if self._sorted is None:
+            self._sorted = np.empty(0, dtype=ids.dtype)
+        at = np.searchsorted(self._sorted, ids)
+        found = np.zeros(len(ids), dtype=bool)
+        if len(self._sorted):
+            clipped = np.minimum(at, len(self._sorted) - 1)
+            found = (at < len(self._sorted)) & (self._sorted[clipped] == ids)
+        codes = np.empty(len(ids), dtype=np.int64)
+        codes[found] = self._sorted_codes[np.minimum(at, len(self._sorted) - 1)[found]]
+        if not found.all():
+            new, inverse = np.unique(ids[~found], return_inverse=True)
+            new_codes = np.arange(self.customers, self.customers + len(new), dtype=np.int64)
+            codes[~found] = new_codes[inverse]
+            # Inserting into the sorted IDs copies them once per batch, not per customer
+            where = np.searchsorted(self._sorted, new)
+            self._sorted = np.insert(self._sorted, where, new)
+            self._sorted_codes = np.insert(self._sorted_codes, where, new_codes)
+            self._first = np.concatenate([self._first, np.full(len(new), -1, dtype=np.int64)])
+            self._last = np.concatenate([self._last, np.full(len(new), -1, dtype=np.int64)])
+        return codes
+
+    def _grow(self, periods):
+        if periods > len(self.active):
+            extra = periods - len(self.active)
+            self.counts = np.pad(self.counts, ((0, extra), (0, extra)))
+            self.active = np.pad(self.active, (0, extra))
+            self.returning = np.pad(self.returning, (0, extra))
+
+    @perf.timed("cohorts.append")
+    def append(self, frame):
+        """Fold order rows dated on or after every row seen so far into the matrix."""
+        self.rows += len(frame)
+        if frame.empty:
+            return self
+        self.last_date = frame["Date"].max()
+        ids = frame[CUSTOMER_COLUMN].to_numpy()
+        dates = frame["Date"].to_numpy()
+        known = pd.notna(ids)
+        if not known.all():
+            ids, dates = ids[known], dates[known]
+        if not len(ids):
+            return self
+        numbers = period_numbers(dates, self.grain)
+        if self.origin is None:
+            self.origin = int(numbers.min())
+        periods = numbers - self.origin
+        codes = self._codes(ids)
+        # Distinct (customer, period) pairs, ordered by customer then period
+        pairs = np.sort(pd.unique(codes * (int(periods.max()) + 1) + periods))
+        customer, period = np.divmod(pairs, int(periods.max()) + 1)
+        fresh = period > self._last[customer]
+        customer, period = customer[fresh], period[fresh]
+        # Each customer's previous active period: the earlier pair in this
+        # batch, else the last one before it
+        previous = np.where(np.r_[False, customer[1:] == customer[:-1]], np.r_[-1, period[:-1]], self._last[customer])
+        starts = np.r_[True, customer[1:] != customer[:-1]]
+        ends = np.r_[starts[1:], True]
+        new = starts & (self._first[customer] < 0)
+        self._first[customer[new]] = period[new]
+        self._last[customer[ends]] = period[ends]
+        first = self._first[customer]
+
+        self._grow(int(period.max()) + 1)
+        size = len(self.active)
+        self.counts += np.bincount(first * size + (period - first), minlength=size * size).reshape(size, size)
+        self.active += np.bincount(period, minlength=size)
+        self.returning += np.bincount(period[(previous >= 0) & (previous == period - 1)], minlength=size)
+        with self._lock:
+            self._views.clear()
+        return self
+
+    def _memo(self, key, compute):
+        with self._lock:
+            result = self._views.get(key)
+        if result is None:
+            result = compute()
+            with self._lock:
+                self._views[key] = result
+        return result
+
+    def complete_periods(self):
+        """Number of periods whose last day is covered by the data."""
+        if self.last_date is None or self.origin is None:
+            return 0
+        following = period_numbers([self.last_date + pd.Timedelta(days=1)], self.grain)[0] - self.origin
+        return int(min(following, len(self.active)))
+
+    def retention(self, share=True):
+        """Cohort x periods-since-first-order matrix, as shares of the cohort or customer counts."""
+        def compute():
+            labels = period_starts(self.origin + np.arange(len(self.active)), self.grain) if self.origin is not None else []
+            table = pd.DataFrame(self.counts, index=pd.Index(labels, name="Cohort"),
+                                 columns=pd.RangeIndex(self.counts.shape[1], name="Periods Since"))
+            # Offsets past the newest period have not happened yet
+            horizon = len(self.active) - np.arange(len(self.active))[:, None]
+            table = table.where(np.arange(self.counts.shape[1]) < horizon)
+            if share:
+                table = table.div(table[0].where(table[0] > 0), axis=0)
+            return table
+        return self._memo(("retention", share), compute)
+
+    def rates(self):
+        """Active customers per period, the previous period's, those active in both, and that share of the previous."""
+        def compute():
+            labels = period_starts(self.origin + np.arange(len(self.active)), self.grain) if self.origin is not None else []
+            previous = np.r_[0, self.active[:-1]]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                rate = np.where(previous > 0, self.returning / previous, np.nan)
+            return pd.DataFrame({"Active": self.active, "Previous": previous, "Returning": self.returning, "Retention": rate},
+                                index=pd.Index(labels, name="Period"))
+        return self._memo(("rates",), compute)
+
+
+_matrices = OrderedDict()
+_matrices_lock = threading.Lock()
+
+
+def cohorts_for(frame, name="default", grain="Monthly"):
+    """Return the cohort matrix for `frame`, extending the previous one when possible.
+
+    As with stelle.rollup.cube_for, a frame that is the previous one plus
+    newer days only has its new rows folded in; anything else rebuilds.
+    """
+    key = dataset_key(frame, name) + (grain,)
+    with _matrices_lock:
+        ref, matrix = _matrices.get(key, (None, None))
+        if ref is not None and ref() is frame:
+            return matrix
+        if matrix is not None and matrix.last_date is not None:
+            known = int(frame["Date"].searchsorted(matrix.last_date, side="right"))
+            if known == matrix.rows:
+                matrix.append(frame.iloc[known:])
+            else:
+                matrix = None
+        if matrix is None:
+            matrix = CohortMatrix(grain).append(frame)
+        _matrices[key] = (weakref.ref(frame), matrix)
+        _matrices.move_to_end(key)
+        while len(_matrices) > DATASETS_KEPT:
+            _matrices.popitem(last=False)
+        return matrix
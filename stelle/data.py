@@ -0,0 +1,286 @@
+"""Data access layer for the dashboard.
+
+Order exports are read from Parquet, Arrow IPC/Feather or CSV, normalised to the
+dashboard's column layout and kept in a process-wide cache keyed by the source's
+fingerprint (path, mtime and size). Streamlit reruns the script on every widget
+interaction, but modules stay imported, so a rerun only costs a cache lookup.
+
+Loads take an optional inclusive day range. Datasets partitioned by location
+and month (see stelle/storage.py) read only the files overlapping it; other
+sources are read whole once and sliced, the slice cached alongside.
+
+Every loaded frame records the source and day range it was read for in
+attrs["stelle.source"]. The per-dataset caches downstream (shards, cubes,
+indexes, traffic) key on it through `dataset_key`, so switching between
+sources or date ranges keeps each one's entry instead of rebuilding.
+"""
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from stelle import perf
+from stelle.importtime import timed_import
+
+MENU_ITEMS = ["Burger", "Pizza", "Pasta", "Salad"]
+SERVICE_TYPES = ["Dine-in", "Takeaway", "Delivery"]
+SAMPLE_LOCATIONS = ["Downtown", "Harbourfront", "Midtown"]
+# Exports without a Location column are treated as a single restaurant
+DEFAULT_LOCATION = "Main"
+# Locations have no fixed vocabulary; their categories are whatever appears
+CATEGORICAL_COLUMNS = {"Top Item": MENU_ITEMS, "Service Type": SERVICE_TYPES, "Location": []}
+
+PARQUET_SUFFIXES = (".parquet", ".pq")
+ARROW_SUFFIXES = (".arrow", ".feather", ".ipc")
+CSV_SUFFIXES = (".csv", ".csv.gz")
+
+SOURCE_ATTR = "stelle.source"
+# Entries, one per name, source and date range, each per-dataset cache keeps
+DATASETS_KEPT = 16
+
+# Relative customer arrivals per hour of day (open 6:00-23:00), peaking at
+# lunch and dinner
+HOURLY_PROFILE = np.zeros(24)
+HOURLY_PROFILE[6:23] = [1, 2, 3, 3, 4, 8, 10, 7, 4, 3, 4, 7, 10, 9, 6, 3, 2]
+HOURLY_PROFILE /= HOURLY_PROFILE.sum()
+
+
+def fingerprint(path):
+    """Identify a source by absolute path, modification time and size.
+
+    Directories (partitioned Parquet datasets) use the newest mtime and the
+    total size of the files below them.
+    """
+    path = os.path.abspath(path)
+    if not os.path.isdir(path):
+        stat = os.stat(path)
+        return (path, stat.st_mtime_ns, stat.st_size)
+    mtime, size = 0, 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            stat = os.stat(os.path.join(root, name))
+            mtime = max(mtime, stat.st_mtime_ns)
+            size += stat.st_size
+    return (path, mtime, size)
+
+
+class FrameCache:
+    """Thread-safe LRU cache of DataFrames bounded by their memory footprint."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._frames = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._frames.get(key)
+            if entry is None:
+                return None
+            self._frames.move_to_end(key)
+            return entry[0]
+
+    def put(self, key, frame):
+        size = int(frame.memory_usage(deep=True).sum())
+        with self._lock:
+            if key in self._frames:
+                self.nbytes -= self._frames.pop(key)[1]
+            self._frames[key] = (frame, size)
+            self.nbytes += size
+            # Always keep the newest entry, even if it alone exceeds the budget
+            while self.nbytes > self.max_bytes and len(self._frames) > 1:
+                _, (_, evicted) = self._frames.popitem(last=False)
+                self.nbytes -= evicted
+        return frame
+
+    def clear(self):
+        with self._lock:
+            self._frames.clear()
+            self.nbytes = 0
+
+    def __len__(self):
+        return len(self._frames)
+
+
+cache = FrameCache(max_bytes=int(os.environ.get("STELLE_CACHE_MB", "512")) * 2**20)
+
+
+def read_orders(path, start=None, end=None):
+    """Read an order export into a DataFrame, choosing the reader by suffix.
+
+    Only partitioned datasets honour `start` and `end`; everything else is read whole.
+    """
+    lower = path.lower()
+    if os.path.isdir(path):
+        storage = timed_import("stelle.storage")
+        if storage.is_partitioned(path):
+            return storage.read_partitions(path, start, end)
+        return pd.read_parquet(path)
+    if lower.endswith(PARQUET_SUFFIXES):
+        return pd.read_parquet(path)
+    if lower.endswith(ARROW_SUFFIXES):
+        return pd.read_feather(path)
+    if lower.endswith(CSV_SUFFIXES):
+        return pd.read_csv(path, parse_dates=["Date"])
+    raise ValueError(f"Unsupported order export format: {path}")
+
+
+def normalize(frame):
+    """Coerce an order frame to the dtypes and ordering the dashboard expects."""
+    frame = frame.copy()
+    frame["Date"] = pd.to_datetime(frame["Date"])
+    if "Location" not in frame:
+        frame["Location"] = DEFAULT_LOCATION
+    for column, categories in CATEGORICAL_COLUMNS.items():
+        if column in frame:
+            extra = sorted(set(frame[column].dropna().unique()) - set(categories))
+            frame[column] = pd.Categorical(frame[column], categories=categories + extra)
+    return frame.sort_values("Date", kind="stable").reset_index(drop=True)
+
+
+def date_slice(frame, start=None, end=None):
+    """Rows of a Date-sorted frame dated within the days [start, end]."""
+    dates = frame["Date"].to_numpy()
+    lo = 0 if start is None else int(np.searchsorted(dates, np.datetime64(pd.Timestamp(start).normalize()), "left"))
+    hi = len(frame) if end is None else int(
+        np.searchsorted(dates, np.datetime64(pd.Timestamp(end).normalize() + pd.Timedelta(days=1)), "left"))
+    return frame.iloc[lo:max(lo, hi)].reset_index(drop=True)
+
+
+def _tagged(frame, source, start, end):
+    # ISO day strings: Streamlit serialises attrs as JSON with every frame it shows
+    frame.attrs[SOURCE_ATTR] = (source, *(None if day is None else day.date().isoformat() for day in (start, end)))
+    return frame
+
+
+def dataset_key(frame, name):
+    """Key of `frame` under `name` in the per-dataset caches.
+
+    That is the name plus the source path and day range the frame was loaded
+    for. The path rather than the fingerprint: a refreshed export should find
+    its previous entry, which the caches then extend instead of rebuilding.
+    """
+    return (name, frame.attrs.get(SOURCE_ATTR))
+
+
+def _in_range(key, frame, start, end):
+    """`frame` restricted to [start, end], cached under `key` so reruns get the same object."""
+    if start is None and end is None:
+        return _tagged(frame, key[0], None, None)
+    sliced = cache.get(key + ("range", start, end))
+    if sliced is None:
+        sliced = cache.put(key + ("range", start, end), _tagged(date_slice(frame, start, end), key[0], start, end))
+    return sliced
+
+
+def _day(value):
+    return None if value is None else pd.Timestamp(value).normalize()
+
+
+def load_orders(path, start=None, end=None):
+    """Load an order export, served from the cache while the file is unchanged."""
+    key = fingerprint(path)
+    start, end = _day(start), _day(end)
+    if os.path.isdir(path) and timed_import("stelle.storage").is_partitioned(path):
+        key = key + (start, end)
+        frame = cache.get(key)
+        if frame is None:
+            read = read_orders(path, start, end)
+            frame = normalize(read)
+            frame.attrs.update(read.attrs)
+            frame = cache.put(key, _tagged(frame, key[0], start, end))
+        return frame
+    frame = cache.get(key)
+    if frame is None:
+        frame = cache.put(key, normalize(read_orders(path)))
+    return _in_range(key, frame, start, end)
+
+
+def load_sample_data(seed=0, days=365, locations=tuple(SAMPLE_LOCATIONS)):
+    """Deterministic stand-in for real order data: one row per day and location."""
+    key = ("sample", seed, days, tuple(locations))
+    frame = cache.get(key)
+    if frame is not None:
+        return frame
+    rng = np.random.default_rng(seed)
+    n = days * len(locations)
+    frame = pd.DataFrame({
+        "Date": np.repeat(pd.date_range(start="2023-01-01", periods=days, freq="D"), len(locations)),
+        "Location": np.tile(list(locations), days),
+        "Sales": rng.integers(500, 2000, n),
+        "Customers": rng.integers(50, 200, n),
+        "Service Time": rng.uniform(5, 15, n),
+        "Top Item": rng.choice(MENU_ITEMS, n),
+        "Staff Present": rng.integers(4, 10, n),
+        "Service Type": rng.choice(SERVICE_TYPES, n)
+    })
+    return cache.put(key, normalize(frame))
+
+
+def synthetic_orders(rows, days=365, locations=tuple(SAMPLE_LOCATIONS), seed=0, start="2023-01-01"):
+    """Seeded order lines at any volume: `rows` orders spread over `days` days.
+
+    Unlike load_sample_data (one aggregate row per day and location), each row
+    is a single order, so the frame scales to benchmark volumes. It is built
+    already normalised: sorted by Date with categorical dimensions.
+    """
+    rng = np.random.default_rng(seed)
+    day = np.sort(rng.integers(0, days, rows))
+    locations = sorted(locations)
+    return pd.DataFrame({
+        "Date": np.datetime64(start, "ns") + day.astype("timedelta64[D]"),
+        "Location": pd.Categorical.from_codes(rng.integers(0, len(locations), rows), categories=locations),
+        "Sales": rng.uniform(8, 120, rows).round(2),
+        "Customers": rng.integers(1, 7, rows, dtype=np.int16),
+        "Service Time": rng.uniform(5, 15, rows),
+        "Top Item": pd.Categorical.from_codes(rng.integers(0, len(MENU_ITEMS), rows), categories=MENU_ITEMS),
+        "Staff Present": rng.integers(4, 10, rows, dtype=np.int16),
+        "Service Type": pd.Categorical.from_codes(rng.integers(0, len(SERVICE_TYPES), rows), categories=SERVICE_TYPES),
+    })
+
+
+def order_timestamps(frame, seed=0):
+    """Expand daily rows into one arrival timestamp per customer.
+
+    Sample data and daily exports carry no transaction times, so each day's
+    Customers are spread over the opening hours following HOURLY_PROFILE.
+    Returns the timestamps and the frame row each one belongs to.
+    """
+    rows = np.repeat(np.arange(len(frame)), frame["Customers"].to_numpy())
+    rng = np.random.default_rng(seed)
+    seconds = rng.choice(24, size=len(rows), p=HOURLY_PROFILE) * 3600 + rng.integers(0, 3600, len(rows))
+    days = frame["Date"].dt.normalize().to_numpy()[rows]
+    return days + seconds.astype("timedelta64[s]"), rows
+
+
+@perf.timed("load_data")
+def load_data(source=None, start=None, end=None):
+    """Load the dashboard dataset from `source` or $STELLE_DATA, else sample data.
+
+    `start` and `end` limit it to those days, inclusive.
+    """
+    source = source or os.environ.get("STELLE_DATA")
+    if source:
+        return load_orders(source, start, end)
+    return _in_range(("sample", 0, 365, tuple(SAMPLE_LOCATIONS)), load_sample_data(), _day(start), _day(end))
+
+
+def data_extent(source=None):
+    """(first day, last day, locations) of the dashboard dataset.
+
+    Partitioned datasets answer from their manifest without reading any rows.
+    """
+    source = source or os.environ.get("STELLE_DATA")
+    if source and os.path.isdir(source):
+        storage = timed_import("stelle.storage")
+        if storage.is_partitioned(source):
+            index = storage.partition_index(source)
+            first, last = index.bounds
+            return first.normalize(), last.normalize(), index.locations
+    frame = load_data(source)
+    if frame.empty:
+        return None, None, []
+    return frame["Date"].iloc[0].normalize(), frame["Date"].iloc[-1].normalize(), sorted(frame["Location"].dropna().unique())
@@ -0,0 +1,124 @@
+"""Server-side downsampling for long time-series charts.
+
+Line charts only need a couple of points per horizontal pixel, so series are
+reduced before they reach Plotly: LTTB (largest triangle three buckets) keeps
+the visual shape, min/max bucketing keeps every extreme. Large inputs are
+drawn with WebGL traces, and reduced series are cached per source frame,
+column set, zoom window and target size.
+"""
+import threading
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+import plotly.express as px
+
+from stelle import perf
+
+POINTS_PER_PIXEL = 2
+FULL_WIDTH = 1200
+HALF_WIDTH = 600
+WEBGL_THRESHOLD = 5000
+CACHE_ENTRIES = 256
+
+
+def points_for_width(width):
+    """Number of points worth sending for a chart `width` pixels wide."""
+    return max(3, int(width * POINTS_PER_PIXEL))
+
+
+def _as_float(values):
+    values = np.asarray(values)
+    if np.issubdtype(values.dtype, np.datetime64):
+        return values.astype("datetime64[ns]").astype(np.int64).astype(np.float64)
+    return values.astype(np.float64)
+
+
+def lttb(x, y, n_out):
+    """Positions of the `n_out` points LTTB keeps from the series (x, y)."""
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x, y = _as_float(x), _as_float(y)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    keep = np.empty(n_out, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_lo = hi
+        next_hi = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[next_lo:next_hi].mean()
+        avg_y = y[next_lo:next_hi].mean()
+        # Twice the triangle area between the last kept point, each candidate
+        # in this bucket and the average of the next bucket
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        keep[i + 1] = a
+    return keep
+
+
+def minmax(x, y, n_out):
+    """Positions of both endpoints and the minimum and maximum of `y` in each of (n_out - 2)/2 buckets."""
+    n = len(x)
+    if n_out >= n or n_out < 4:
+        return np.arange(n)
+    y = _as_float(y)
+    size = -(-n // ((n_out - 2) // 2))
+    n_buckets = -(-n // size)
+    base = np.arange(n_buckets) * size
+    # Pad the tail bucket so every bucket is a row of one (n_buckets, size) grid
+    low = np.full(n_buckets * size, np.inf)
+    low[:n] = y
+    high = np.full(n_buckets * size, -np.inf)
+    high[:n] = y
+    mins = base + np.argmin(low.reshape(n_buckets, size), axis=1)
+    maxs = base + np.argmax(high.reshape(n_buckets, size), axis=1)
+    # The endpoints too, so the line spans the whole x range
+    return np.unique(np.concatenate([[0, n - 1], mins, maxs]))
+
+
+METHODS = {"lttb": lttb, "minmax": minmax}
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def downsample(frame, x, y, width=FULL_WIDTH, window=None, method="lttb"):
+    """Rows of `frame` needed to draw columns `y` against `x` at `width` pixels.
+
+    `window` is an optional (start, end) zoom range on `x`; the result is
+    cached per frame, columns, window, width and method.
+    """
+    columns = tuple([y] if isinstance(y, str) else y)
+    n_out = points_for_width(width)
+    key = (id(frame), x, columns, window, n_out, method)
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry is not None and entry[0]() is frame:
+            _cache.move_to_end(key)
+            return entry[1]
+    view = frame
+    if window is not None:
+        values = frame[x]
+        view = frame[(values >= window[0]) & (values <= window[1])]
+    if len(view) <= n_out:
+        result = view
+    else:
+        reduce = METHODS[method]
+        # Each column keeps its own shape-defining points; plot their union
+        keep = np.unique(np.concatenate([reduce(view[x].to_numpy(), view[c].to_numpy(), n_out) for c in columns]))
+        result = view.iloc[keep]
+    with _cache_lock:
+        _cache[key] = (weakref.ref(frame), result)
+        while len(_cache) > CACHE_ENTRIES:
+            _cache.popitem(last=False)
+    return result
+
+
+@perf.timed("line_chart")
+def line_chart(frame, x, y, width=FULL_WIDTH, window=None, method="lttb", **kwargs):
+    """`px.line` over the downsampled series, using WebGL for large inputs."""
+    points = downsample(frame, x, y, width=width, window=window, method=method)
+    render_mode = "webgl" if len(frame) > WEBGL_THRESHOLD else "svg"
+    return px.line(points, x=x, y=y, render_mode=render_mode, **kwargs)
@@ -0,0 +1,135 @@
+"""Process-wide cache of built Plotly figures.
+
+Streamlit reruns a section's script on every widget interaction, and
+building a Plotly Express figure (validation, trace construction) often
+costs more than the aggregation feeding it. A figure is fully determined by
+its builder, the data passed in, the builder's arguments and the theme, so
+that is the cache key: the data enters as a content hash, which is how
+filters and the time period, having selected the data, reach the key. The
+cache is LRU with a memory cap, estimated from the figures' data arrays.
+
+Cached figures are shared between sessions and reruns and must not be
+modified after they are returned; layout tweaks go through `layout=`.
+"""
+import hashlib
+import os
+import threading
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from stelle import perf
+
+THEME_TEMPLATES = {"Light Mode": "plotly", "Dark Mode": "plotly_dark"}
+# Per-figure overhead beyond its data arrays (layout, trace metadata)
+FIGURE_OVERHEAD_BYTES = 8 * 1024
+TRACE_ARRAYS = ("x", "y", "z", "values", "labels", "text", "customdata", "ids")
+
+_digests = {}
+_digests_lock = threading.Lock()
+
+
+def _digest(frame):
+    # Cube views and other memoised inputs come back as the same object, so
+    # their hash is computed once per object
+    key = id(frame)
+    with _digests_lock:
+        ref, digest = _digests.get(key, (None, None))
+        if ref is not None and ref() is frame:
+            return digest
+    hashed = pd.util.hash_pandas_object(frame, index=True).to_numpy()
+    columns = repr(list(frame.columns)) if isinstance(frame, pd.DataFrame) else repr(frame.name)
+    digest = hashlib.blake2b(hashed.tobytes() + columns.encode(), digest_size=16).hexdigest()
+    with _digests_lock:
+        for stale in [k for k, (r, _) in _digests.items() if r() is None]:
+            del _digests[stale]
+        _digests[key] = (weakref.ref(frame), digest)
+    return digest
+
+
+def fingerprint(value):
+    """Hashable stand-in for a builder argument, hashing data by content."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return ("frame", _digest(value))
+    if isinstance(value, pd.Index):
+        return ("index", _digest(value.to_series()))
+    if isinstance(value, np.ndarray):
+        return ("array", value.dtype.str, value.shape, hashlib.blake2b(value.tobytes(), digest_size=16).hexdigest())
+    if isinstance(value, dict):
+        return ("dict", tuple(sorted((key, fingerprint(item)) for key, item in value.items())))
+    if isinstance(value, (list, tuple)):
+        return (type(value).__name__, tuple(fingerprint(item) for item in value))
+    return repr(value)
+
+
+def figure_bytes(figure):
+    """Approximate memory held by `figure`: its trace data arrays plus overhead."""
+    total = FIGURE_OVERHEAD_BYTES
+    for trace in figure.data:
+        for name in TRACE_ARRAYS:
+            array = getattr(trace, name, None) if name in trace else None
+            if isinstance(array, np.ndarray):
+                total += array.nbytes
+            elif isinstance(array, (list, tuple)):
+                total += 8 * len(array)
+    return total
+
+
+class FigureCache:
+    """Thread-safe LRU cache of figures bounded by their estimated size."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._figures = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._figures.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._figures.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, figure):
+        size = figure_bytes(figure)
+        with self._lock:
+            if key in self._figures:
+                self.nbytes -= self._figures.pop(key)[1]
+            self._figures[key] = (figure, size)
+            self.nbytes += size
+            while self.nbytes > self.max_bytes and len(self._figures) > 1:
+                _, (_, evicted) = self._figures.popitem(last=False)
+                self.nbytes -= evicted
+        return figure
+
+    def clear(self):
+        with self._lock:
+            self._figures.clear()
+            self.nbytes = 0
+
+    def __len__(self):
+        return len(self._figures)
+
+
+cache = FigureCache(max_bytes=int(os.environ.get("STELLE_FIGURE_CACHE_MB", "64")) * 2**20)
+
+
+@perf.timed("figure cache")
+def cached_figure(build, data, theme="Light Mode", layout=None, **kwargs):
+    """`build(data, **kwargs)` with `layout` and the theme's template applied, cached."""
+    key = (f"{build.__module__}.{build.__qualname__}", fingerprint(data), fingerprint(kwargs),
+           fingerprint(layout), theme)
+    figure = cache.get(key)
+    if figure is None:
+        figure = build(data, **kwargs)
+        figure.update_layout(template=THEME_TEMPLATES.get(theme, "plotly"), **(layout or {}))
+        figure = cache.put(key, figure)
+    return figure
@@ -0,0 +1,169 @@
+"""Indexed filtering over the order frame.
+
+A FilterIndex precomputes, for every value of the indexed columns and every
+month partition, the sorted row positions holding that value (a posting list).
+Filter expressions combine those lists with AND/OR set operations and hand
+back row positions, so downstream aggregations can gather only the rows they
+need instead of materialising a boolean mask over the whole frame.
+"""
+import threading
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from stelle import perf
+from stelle.data import DATASETS_KEPT, dataset_key
+
+INDEXED_COLUMNS = ["Top Item", "Service Type", "Location"]
+PARTITION_COLUMN = "Month"
+# Selected frames kept per index for reruns with unchanged filters
+SELECTIONS_KEPT = 4
+
+
+@dataclass(frozen=True)
+class Eq:
+    """Rows where `column` equals `value` ("Month" matches "YYYY-MM" partitions)."""
+    column: str
+    value: object
+
+    def evaluate(self, index):
+        return index.postings(self.column).get(self.value, index.empty)
+
+
+@dataclass(frozen=True)
+class In:
+    """Rows where `column` takes any of `values`."""
+    column: str
+    values: tuple
+
+    def evaluate(self, index):
+        return Or(*(Eq(self.column, value) for value in self.values)).evaluate(index)
+
+
+@dataclass(frozen=True)
+class Between:
+    """Rows dated within [start, end], using the frame's Date ordering."""
+    start: object
+    end: object
+
+    def evaluate(self, index):
+        lo = int(np.searchsorted(index.dates, np.datetime64(pd.Timestamp(self.start)), side="left"))
+        hi = int(np.searchsorted(index.dates, np.datetime64(pd.Timestamp(self.end)), side="right"))
+        return np.arange(lo, max(lo, hi), dtype=np.int64)
+
+
+@dataclass(frozen=True, init=False)
+class And:
+    """Rows matching every term."""
+    terms: tuple
+
+    def __init__(self, *terms):
+        object.__setattr__(self, "terms", terms)
+
+    def evaluate(self, index):
+        # Intersect smallest-first so each step shrinks the working set
+        results = sorted((term.evaluate(index) for term in self.terms), key=len)
+        positions = results[0] if results else np.arange(index.n, dtype=np.int64)
+        for other in results[1:]:
+            positions = np.intersect1d(positions, other, assume_unique=True)
+        return positions
+
+
+@dataclass(frozen=True, init=False)
+class Or(And):
+    """Rows matching any term."""
+
+    def evaluate(self, index):
+        results = [term.evaluate(index) for term in self.terms]
+        if not results:
+            return index.empty
+        return np.unique(np.concatenate(results))
+
+
+class FilterIndex:
+    """Posting lists of row positions per categorical value and month partition."""
+
+    def __init__(self, frame, columns=INDEXED_COLUMNS):
+        self.n = len(frame)
+        self.empty = np.empty(0, dtype=np.int64)
+        self.dates = frame["Date"].to_numpy()
+        self._postings = {}
+        for column in columns:
+            if column in frame:
+                self._postings[column] = self._build(frame[column])
+        # Month numbers rather than formatted strings: strftime over every row
+        # cost more than the rest of the index put together
+        months = self._build(self.dates.astype("datetime64[M]").astype(np.int64))
+        self._postings[PARTITION_COLUMN] = {str(np.datetime64(int(month), "M")): rows for month, rows in months.items()}
+        self._results = {}
+        self._selections = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _build(values):
+        codes, uniques = pd.factorize(values, sort=True)
+        order = np.argsort(codes, kind="stable").astype(np.int64)
+        counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+        # Rows with missing values (code -1) sort first; skip past them
+        bounds = np.cumsum(counts) + np.count_nonzero(codes < 0)
+        starts = bounds - counts
+        return {value: order[start:stop] for value, start, stop in zip(uniques, starts, bounds)}
+
+    def postings(self, column):
+        return self._postings[column]
+
+    def positions(self, expr):
+        """Sorted row positions matching `expr`, memoised per expression."""
+        with self._lock:
+            result = self._results.get(expr)
+        if result is None:
+            result = expr.evaluate(self)
+            result.flags.writeable = False
+            with self._lock:
+                self._results[expr] = result
+        return result
+
+    @perf.timed("filter.select")
+    def select(self, frame, expr):
+        """Rows of `frame` matching `expr`; a contiguous match is sliced, not gathered.
+
+        The last few selections are kept, so a rerun with the same filters gets
+        the same frame object back and id-keyed caches downstream (figure
+        digests, table sort orders) stay warm.
+        """
+        with self._lock:
+            ref, selected = self._selections.get(expr, (None, None))
+            if ref is not None and ref() is frame:
+                self._selections.move_to_end(expr)
+                return selected
+        positions = self.positions(expr)
+        if len(positions) and positions[-1] - positions[0] + 1 == len(positions):
+            selected = frame.iloc[positions[0]:positions[-1] + 1]
+        else:
+            selected = frame.take(positions)
+        with self._lock:
+            self._selections[expr] = (weakref.ref(frame), selected)
+            while len(self._selections) > SELECTIONS_KEPT:
+                self._selections.popitem(last=False)
+        return selected
+
+
+_indexes = OrderedDict()
+_indexes_lock = threading.Lock()
+
+
+def index_for(frame, name="default"):
+    """Return the FilterIndex for `frame`, rebuilding it when the frame changes."""
+    key = dataset_key(frame, name)
+    with _indexes_lock:
+        ref, index = _indexes.get(key, (None, None))
+        if ref is None or ref() is not frame:
+            index = FilterIndex(frame)
+            _indexes[key] = (weakref.ref(frame), index)
+        _indexes.move_to_end(key)
+        while len(_indexes) > DATASETS_KEPT:
+            _indexes.popitem(last=False)
+        return index
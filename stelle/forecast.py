@@ -0,0 +1,235 @@
+"""Batched demand forecasting for the Demand Prediction section.
+
+Daily sales are arranged as a (series x day) matrix with one row per
+(Top Item, Service Type) pair, and every model is fitted on all rows at once
+with NumPy:
+
+- SeasonalNaive repeats the last observed week.
+- HoltWinters is additive Holt-Winters with a damped trend, run as a single
+  recursion over days that updates every series per step.
+- DayOfWeekRegression is least squares on intercept, trend, day-of-week and
+  holiday regressors, kept as running normal equations.
+
+All three carry their state forward, so new days are an incremental update
+rather than a refit. Forecasts for aggregates (one item, or the whole
+restaurant) are bottom-up sums of the per-series forecasts.
+"""
+import threading
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from stelle import perf
+from stelle.data import DATASETS_KEPT, dataset_key
+
+SEASON = 7
+SERIES_KEYS = ["Top Item", "Service Type"]
+# Fixed-date holidays that move restaurant demand (month, day)
+HOLIDAYS = {(1, 1), (2, 14), (7, 4), (10, 31), (12, 24), (12, 25), (12, 31)}
+
+
+def daily_matrix(cube, after=None, keys=None):
+    """Series keys, dates and the (series x day) Sales matrix from the cube.
+
+    Days without sales are filled with zeros; `after` restricts the matrix
+    to days later than the given date. Rows are aligned to `keys` when the
+    data holds no series outside them.
+    """
+    if cube.last_date is None:
+        return pd.MultiIndex.from_arrays([[], []], names=SERIES_KEYS), pd.DatetimeIndex([]), np.empty((0, 0))
+    daily = cube.view("Daily", by=SERIES_KEYS)
+    if after is not None:
+        daily = daily[daily["Date"] > after]
+    table = daily.pivot_table(index=SERIES_KEYS, columns="Date", values="Sales",
+                              aggfunc="sum", fill_value=0, observed=True)
+    if keys is not None and table.index.difference(keys).empty:
+        table = table.reindex(index=keys, fill_value=0)
+    if table.empty:
+        return table.index, pd.DatetimeIndex([]), np.empty((len(table.index), 0))
+    dates = pd.date_range(table.columns.min(), table.columns.max(), freq="D")
+    table = table.reindex(columns=dates, fill_value=0)
+    return table.index, dates, table.to_numpy(dtype=np.float64)
+
+
+class SeasonalNaive:
+    def __init__(self, season=SEASON):
+        self.season = season
+        self.last = None
+
+    def update(self, Y):
+        block = Y if self.last is None else np.concatenate([self.last, Y], axis=1)
+        self.last = block[:, -self.season:]
+
+    def predict(self, steps):
+        width = self.last.shape[1]
+        return self.last[:, (steps - 1) % width]
+
+
+class HoltWinters:
+    def __init__(self, alpha=0.3, beta=0.05, gamma=0.2, phi=0.98, season=SEASON):
+        self.alpha, self.beta, self.gamma, self.phi = alpha, beta, gamma, phi
+        self.season = season
+        self.t = 0
+        self.level = self.trend = self.seasonal = None
+
+    def update(self, Y):
+        if self.level is None:
+            head = Y[:, :self.season]
+            self.level = head.mean(axis=1)
+            self.trend = np.zeros(len(Y))
+            self.seasonal = np.zeros((len(Y), self.season))
+            self.seasonal[:, :head.shape[1]] = head - self.level[:, None]
+            self.t = head.shape[1]
+            Y = Y[:, self.season:]
+        a, b, g, phi = self.alpha, self.beta, self.gamma, self.phi
+        for column in Y.T:
+            slot = self.t % self.season
+            s = self.seasonal[:, slot]
+            previous = self.level
+            self.level = a * (column - s) + (1 - a) * (previous + phi * self.trend)
+            self.trend = b * (self.level - previous) + (1 - b) * phi * self.trend
+            self.seasonal[:, slot] = g * (column - self.level) + (1 - g) * s
+            self.t += 1
+
+    def predict(self, steps):
+        phi = self.phi
+        damping = phi * (1 - phi ** steps) / (1 - phi) if phi != 1 else steps.astype(np.float64)
+        slots = (self.t + steps - 1) % self.season
+        return self.level[:, None] + self.trend[:, None] * damping[None, :] + self.seasonal[:, slots]
+
+
+class DayOfWeekRegression:
+    def __init__(self, start, holidays=HOLIDAYS):
+        self.start = start
+        self.holidays = holidays
+        self.xtx = None
+        self.xty = None
+        self.coef = None
+
+    def features(self, dates):
+        dates = pd.DatetimeIndex(dates)
+        X = np.zeros((len(dates), 9))
+        X[:, 0] = 1.0
+        X[:, 1] = (dates - self.start).days / 365.0
+        weekday = dates.weekday.to_numpy()
+        # Monday is the baseline; columns 2-7 flag Tuesday..Sunday
+        rows = np.flatnonzero(weekday > 0)
+        X[rows, weekday[rows] + 1] = 1.0
+        X[:, 8] = [(d.month, d.day) in self.holidays for d in dates]
+        return X
+
+    def update(self, Y, dates):
+        X = self.features(dates)
+        xtx, xty = X.T @ X, X.T @ Y.T
+        self.xtx = xtx if self.xtx is None else self.xtx + xtx
+        self.xty = xty if self.xty is None else self.xty + xty
+        # Pseudo-inverse copes with regressors that never vary yet (e.g. no holidays seen)
+        self.coef = np.linalg.pinv(self.xtx) @ self.xty
+
+    def predict(self, dates):
+        return (self.features(dates) @ self.coef).T
+
+
+class ForecastEngine:
+    """Fitted models for every series, extended in place as new days arrive."""
+
+    MODELS = ["Holt-Winters", "Seasonal Naive", "Day-of-Week Regression"]
+
+    def __init__(self, keys, dates, Y):
+        self.keys = keys
+        # An empty cube leaves the engine unfitted (last_day None) until days arrive
+        self.start = dates[0] if len(dates) else None
+        self.last_day = None
+        self.models = {
+            "Holt-Winters": HoltWinters(),
+            "Seasonal Naive": SeasonalNaive(),
+            "Day-of-Week Regression": DayOfWeekRegression(self.start),
+        }
+        self._forecasts = {}
+        self._lock = threading.Lock()
+        self.extend(dates, Y)
+
+    def extend(self, dates, Y):
+        if not len(dates):
+            return
+        if self.last_day is not None:
+            # Days with no sales at all are absent from the cube; fill the gap
+            gap = pd.date_range(self.last_day + pd.Timedelta(days=1), dates[-1], freq="D")
+            Y = pd.DataFrame(Y, columns=dates).reindex(columns=gap, fill_value=0).to_numpy()
+            dates = gap
+        with self._lock:
+            if self.start is None:
+                self.start = self.models["Day-of-Week Regression"].start = dates[0]
+            self.models["Holt-Winters"].update(Y)
+            self.models["Seasonal Naive"].update(Y)
+            self.models["Day-of-Week Regression"].update(Y, dates)
+            self.last_day = dates[-1]
+            self._forecasts.clear()
+
+    @perf.timed("forecast")
+    def forecast(self, model, start, periods=7, top_item=None):
+        """Predicted Sales per day from `start` (after the last observed day)."""
+        key = (model, pd.Timestamp(start), periods, top_item)
+        with self._lock:
+            cached = self._forecasts.get(key)
+            if cached is not None:
+                return cached
+            dates = pd.date_range(start, periods=periods, freq="D")
+            steps = np.asarray((dates - self.last_day).days, dtype=np.int64)
+            if model == "Day-of-Week Regression":
+                values = self.models[model].predict(dates)
+            else:
+                values = self.models[model].predict(steps)
+            rows = np.ones(len(self.keys), dtype=bool)
+            if top_item is not None:
+                rows = self.keys.get_level_values("Top Item") == top_item
+            result = pd.DataFrame({"Date": dates, "Predicted Sales": np.clip(values[rows].sum(axis=0), 0, None).round(2)})
+            self._forecasts[key] = result
+            return result
+
+
+_engines = OrderedDict()
+_engines_lock = threading.Lock()
+
+
+def _extends(cube, rows, last_date):
+    """Whether `cube` holds the `rows` rows up to `last_date` plus only newer days."""
+    if last_date is None or cube.last_date is None or cube.rows < rows or cube.last_date < last_date:
+        return False
+    daily = cube.view("Daily")
+    return int(daily.loc[daily["Date"] <= last_date, "Rows"].sum()) == rows
+
+
+@perf.timed("forecaster_for")
+def forecaster_for(cube, name="default", dataset=None):
+    """Return the engine for `cube`, refitting only the days added since last call.
+
+    Engines are kept per `name` (the location) and per source and date range
+    of `dataset`, the frame the cube was built from (see
+    stelle.data.dataset_key), not per cube object: a shard refresh hands All
+    Locations a newly merged cube, which is still only an extension of the
+    one the engine was fitted on.
+    """
+    key = (name, None) if dataset is None else dataset_key(dataset, name)
+    with _engines_lock:
+        ref, fitted, engine = _engines.get(key, (None, None, None))
+        if engine is not None and ref() is cube and fitted == (cube.rows, cube.last_date):
+            return engine
+        if engine is not None and _extends(cube, *fitted):
+            keys, dates, Y = daily_matrix(cube, after=engine.last_day, keys=engine.keys)
+            if keys.equals(engine.keys) or not len(dates):
+                engine.extend(dates, Y)
+            else:
+                # A new item or service type appeared; refit from scratch
+                engine = None
+        else:
+            engine = None
+        if engine is None:
+            engine = ForecastEngine(*daily_matrix(cube))
+        _engines[key] = (weakref.ref(cube), (cube.rows, cube.last_date), engine)
+        _engines.move_to_end(key)
+        while len(_engines) > DATASETS_KEPT:
+            _engines.popitem(last=False)
+        return engine
@@ -0,0 +1,296 @@
+"""Deterministic synthetic restaurant data at load-testing scale.
+
+`python -m stelle generate --rows 1e8 --out fixtures` writes:
+
+    <out>/orders/Location=<name>/Month=<YYYY-MM>/part-*.parquet   order lines
+    <out>/orders/_manifest.json         Date range per file      (see stelle.storage)
+    <out>/reviews.parquet               review text              ($STELLE_REVIEWS)
+    <out>/rosters.csv                   staff availability       ($STELLE_ROSTER)
+    <out>/recipes.csv, <out>/stock.csv  bill of materials, stock per location ($STELLE_RECIPES, $STELLE_STOCK)
+    <out>/inventory_movements.parquet   daily deliveries and usage per location
+
+Order volume follows a growth trend, yearly and weekly seasonality, holidays
+and a per-location size; within a day, arrivals follow HOURLY_PROFILE and
+the menu-item and service-type mix shift with the hour. Staffing follows
+hourly load and service time rises with utilisation. Customer IDs repeat
+within a location, skewed towards regulars.
+
+Every day draws from its own generator seeded with (seed, day), so output
+does not depend on the chunk size and any day can be regenerated alone. Days
+are generated vectorised and written out in chunks of about `chunk_rows`
+order lines, which bounds memory regardless of the total.
+"""
+import os
+import shutil
+import time
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from stelle.data import HOURLY_PROFILE, MENU_ITEMS, SERVICE_TYPES
+from stelle.inventory import SAMPLE_RECIPES, BillOfMaterials
+from stelle.sentiment import SAMPLE_PHRASES
+from stelle.storage import write_manifest
+from stelle.staffing import sample_roster
+
+LOCATION_NAMES = [
+    "Downtown", "Harbourfront", "Midtown", "Old Town", "Riverside", "University", "Airport", "Westfield",
+    "Lakeside", "Northgate", "Eastside", "Station", "Market Square", "Hillcrest", "Parkview", "Southbank",
+]
+PRICES = np.array([12.5, 14.0, 13.0, 9.5])  # per portion, aligned to MENU_ITEMS
+WEEKLY = np.array([0.85, 0.9, 0.95, 1.0, 1.2, 1.35, 1.15])  # Monday first
+HOLIDAY_LIFT = {(2, 14): 1.4, (10, 31): 1.2, (12, 24): 0.7, (12, 25): 0.3, (12, 31): 1.3, (1, 1): 0.6}
+ANNUAL_GROWTH = 0.08
+ORDERS_PER_STAFF_HOUR = 12
+REVIEW_RATE = 0.02
+# Mean extra party members and base service minutes per service type
+PARTY_EXTRA = np.array([1.6, 0.4, 0.8])
+BASE_SERVICE_MINUTES = np.array([9.0, 5.0, 7.0])
+REVIEW_SCHEMA = pa.schema([
+    ("Review ID", pa.int64()), ("Date", pa.timestamp("ns")), ("Location", pa.string()), ("Text", pa.string()),
+])
+
+
+def _mix_by_hour(lunch, dinner, other):
+    """(24 x k) cumulative choice probabilities shifting between meal periods."""
+    table = np.tile(np.asarray(other, dtype=np.float64), (24, 1))
+    table[11:15] = lunch
+    table[17:22] = dinner
+    table /= table.sum(axis=1, keepdims=True)
+    return np.cumsum(table, axis=1)
+
+
+ITEM_CDF = _mix_by_hour(lunch=[3, 2, 2, 3], dinner=[3, 4, 3, 1], other=[3, 3, 2, 2])
+SERVICE_CDF = _mix_by_hour(lunch=[4, 4, 2], dinner=[5, 2, 3], other=[3, 4, 3])
+
+
+def _draw(rng, cdf, hours):
+    """Category per row from the per-hour cumulative probabilities in `cdf`."""
+    u = rng.random(len(hours))
+    return (u[:, None] > cdf[hours]).sum(axis=1).astype(np.int8)
+
+
+@dataclass
+class GeneratorConfig:
+    rows: int
+    start: str = "2022-01-01"
+    years: int = 3
+    locations: int = 8
+    seed: int = 0
+    chunk_rows: int = 2_000_000
+    review_rate: float = REVIEW_RATE
+
+    @property
+    def location_names(self):
+        names = LOCATION_NAMES[:self.locations]
+        return names + [f"Store {n + 1}" for n in range(len(names), self.locations)]
+
+
+def expected_orders(config):
+    """(days x locations) expected order counts summing to config.rows."""
+    dates = pd.date_range(config.start, periods=365 * config.years, freq="D")
+    t = np.arange(len(dates)) / 365.0
+    yearly = 1 + 0.1 * np.sin(2 * np.pi * (dates.dayofyear.to_numpy() - 80) / 365)
+    day_weight = WEEKLY[dates.weekday] * (1 + ANNUAL_GROWTH) ** t * yearly
+    lift = np.array([HOLIDAY_LIFT.get((m, d), 1.0) for m, d in zip(dates.month, dates.day)])
+    size = np.random.default_rng([config.seed, 0]).lognormal(0.0, 0.35, config.locations)
+    weights = (day_weight * lift)[:, None] * size[None, :]
+    return dates, weights * (config.rows / weights.sum())
+
+
+def orders_for_day(config, day, date, expected):
+    """Order lines and reviews for one day across all locations, from the day's own generator.
+
+    Both come back as dicts of arrays, categorical columns as codes; the
+    order lines are sorted by location, then time.
+    """
+    rng = np.random.default_rng([config.seed, 1, day])
+    counts = rng.poisson(expected)
+    n = int(counts.sum())
+    location = np.repeat(np.arange(config.locations, dtype=np.int32), counts)
+    hour = rng.choice(24, n, p=HOURLY_PROFILE)
+    item = _draw(rng, ITEM_CDF, hour)
+    service = _draw(rng, SERVICE_CDF, hour)
+    customers = np.clip(1 + rng.poisson(PARTY_EXTRA[service]), 1, 8).astype(np.int16)
+    # Sides and drinks on top of the main item
+    sales = (customers * PRICES[item] * rng.uniform(0.95, 1.4, n)).round(2)
+
+    # Staff per (location, hour) follow the load; service slows as they saturate
+    slot = location * 24 + hour
+    load = np.bincount(slot, minlength=config.locations * 24)
+    staff = np.maximum(2, np.ceil(load / ORDERS_PER_STAFF_HOUR)).astype(np.int16)
+    utilisation = load / (staff * ORDERS_PER_STAFF_HOUR)
+    service_time = (BASE_SERVICE_MINUTES[service] * (1 + 0.6 * utilisation[slot]) + rng.gamma(2.0, 0.8, n)).round(2)
+
+    # Repeat customers: a per-location pool, skewed towards regulars
+    pool = np.maximum(50, (expected * 365 / 6).astype(np.int64))
+    customer_id = location.astype(np.int64) * 10**9 + (pool[location] * rng.random(n) ** 2).astype(np.int64)
+
+    seconds = hour * 3600 + rng.integers(0, 3600, n)
+    order = np.argsort(location.astype(np.int64) * 86400 + seconds, kind="stable")
+    midnight = np.datetime64(date, "ns")
+    orders = {
+        "Date": np.full(n, midnight),
+        "Timestamp": midnight + seconds[order].astype("timedelta64[s]"),
+        "Location": location[order],
+        "Customer ID": customer_id[order],
+        "Sales": sales[order],
+        "Customers": customers[order],
+        "Service Time": service_time[order],
+        "Top Item": item[order],
+        "Staff Present": staff[slot][order],
+        "Service Type": service[order],
+    }
+    return orders, _reviews_for_day(rng, orders, day, config.review_rate)
+
+
+def _reviews_for_day(rng, orders, day, rate):
+    picked = np.flatnonzero(rng.random(len(orders["Date"])) < rate)
+    # Slow service makes a negative review likelier
+    negative = np.clip((orders["Service Time"][picked] - 10) / 15, 0.05, 0.6)
+    u = rng.random(len(picked))
+    kind = np.where(u < negative, 2, np.where(u < negative + 0.25, 1, 0))
+    text = np.empty(len(picked), dtype=object)
+    for code, name in enumerate(["Positive", "Neutral", "Negative"]):
+        phrases = np.array(SAMPLE_PHRASES[name], dtype=object)
+        mask = kind == code
+        first = rng.integers(0, len(phrases), mask.sum())
+        second = (first + rng.integers(1, len(phrases), mask.sum())) % len(phrases)
+        text[mask] = phrases[first] + np.where(rng.random(mask.sum()) < 0.5, " " + phrases[second], "")
+    return {
+        "Review ID": day * 10**7 + np.arange(len(picked), dtype=np.int64),
+        "Date": orders["Date"][picked],
+        "Location": orders["Location"][picked],
+        "Text": text,
+    }
+
+
+def _concat(days):
+    return {name: np.concatenate([day[name] for day in days]) for name in days[0]}
+
+
+def _dictionary(codes, values):
+    return pa.DictionaryArray.from_arrays(pa.array(codes, type=pa.int32()), pa.array(values))
+
+
+def orders_table(days, config, months, month_codes):
+    """One Arrow table of order lines from `orders_for_day` outputs, categoricals dictionary-encoded.
+
+    `months` names the "YYYY-MM" partitions and `month_codes` gives each
+    day's position in it.
+    """
+    columns = _concat(days)
+    rows_per_day = [len(day["Date"]) for day in days]
+    columns["Location"] = _dictionary(columns["Location"], config.location_names)
+    columns["Month"] = _dictionary(np.repeat(month_codes, rows_per_day), months)
+    columns["Top Item"] = _dictionary(columns["Top Item"], MENU_ITEMS)
+    columns["Service Type"] = _dictionary(columns["Service Type"], SERVICE_TYPES)
+    return pa.table(columns)
+
+
+def reviews_table(days, config):
+    columns = _concat(days)
+    columns["Location"] = np.asarray(config.location_names, dtype=object)[columns["Location"]]
+    return pa.table(columns, schema=REVIEW_SCHEMA)
+
+
+def inventory_movements(dates, portions, names, recipes=SAMPLE_RECIPES, cover_days=7, reorder_days=3):
+    """Daily opening, delivered, used and closing stock per location and ingredient.
+
+    `portions` is (days x locations x items in MENU_ITEMS order). Stock is
+    topped up to `cover_days` of average usage the day after it closes below
+    `reorder_days` of it. Returns the movements and the (locations x
+    ingredients) reorder points.
+    """
+    bom = BillOfMaterials(recipes)
+    columns = [MENU_ITEMS.index(item) for item in bom.items]
+    usage = bom.consumption(portions[..., columns].reshape(-1, len(columns)))
+    usage = usage.reshape(portions.shape[:2] + (len(bom.ingredients),))
+    average = usage.mean(axis=0)
+    target, reorder = average * cover_days, average * reorder_days
+    records = np.empty((4,) + usage.shape)
+    stock, delivery = target, np.zeros_like(target)
+    for day in range(len(dates)):
+        opening = stock + delivery
+        closing = np.maximum(opening - usage[day], 0)
+        records[:, day] = opening, delivery, usage[day], closing
+        delivery = np.where(closing < reorder, target - closing, 0)
+        stock = closing
+    day, location, ingredient = np.indices(usage.shape).reshape(3, -1)
+    movements = pd.DataFrame({
+        "Date": dates[day],
+        "Location": pd.Categorical.from_codes(location, categories=names),
+        "Ingredient": pd.Categorical.from_codes(ingredient, categories=bom.ingredients),
+        **{name: records[i].reshape(-1).round(3) for i, name in enumerate(["Opening", "Delivered", "Used", "Closing"])},
+    })
+    return movements, pd.DataFrame(reorder, index=names, columns=bom.ingredients)
+
+
+def rosters(config, expected):
+    """A seeded roster per location, sized for its busiest expected hour."""
+    peak_staff = np.ceil(expected.max(axis=0) * HOURLY_PROFILE.max() / ORDERS_PER_STAFF_HOUR)
+    return pd.concat([
+        sample_roster(size=int(max(8, 2.5 * staff)), location=name, seed=config.seed * 1000 + n)
+        for n, (name, staff) in enumerate(zip(config.location_names, peak_staff))
+    ], ignore_index=True)
+
+
+def generate(config, out, overwrite=False, log=print):
+    """Write order lines, reviews, rosters and inventory for `config` under `out`.
+
+    Days are buffered until about `config.chunk_rows` order lines, then
+    written out; only the buffer and small per-day aggregates stay in memory.
+    Returns the paths written, keyed by the environment variable that reads them.
+    """
+    orders_dir = os.path.join(out, "orders")
+    if os.path.exists(orders_dir) and not overwrite:
+        raise FileExistsError(f"{orders_dir} exists; pass overwrite=True to replace it")
+    shutil.rmtree(orders_dir, ignore_errors=True)
+    os.makedirs(orders_dir)
+    paths = {
+        "STELLE_DATA": orders_dir,
+        "STELLE_REVIEWS": os.path.join(out, "reviews.parquet"),
+        "STELLE_ROSTER": os.path.join(out, "rosters.csv"),
+        "STELLE_RECIPES": os.path.join(out, "recipes.csv"),
+        "STELLE_STOCK": os.path.join(out, "stock.csv"),
+        "movements": os.path.join(out, "inventory_movements.parquet"),
+    }
+
+    start = time.perf_counter()
+    dates, expected = expected_orders(config)
+    month_codes, months = pd.factorize(dates.strftime("%Y-%m"))
+    portions = np.zeros((len(dates), config.locations, len(MENU_ITEMS)))
+    written, buffered, first_day, orders, reviews = 0, 0, 0, [], []
+    with pq.ParquetWriter(paths["STELLE_REVIEWS"], REVIEW_SCHEMA) as review_writer:
+        for day, date in enumerate(dates):
+            day_orders, day_reviews = orders_for_day(config, day, date, expected[day])
+            cell = day_orders["Location"] * len(MENU_ITEMS) + day_orders["Top Item"]
+            portions[day] = np.bincount(cell, weights=day_orders["Customers"],
+                                        minlength=portions[day].size).reshape(portions.shape[1:])
+            orders.append(day_orders)
+            reviews.append(day_reviews)
+            buffered += len(day_orders["Date"])
+            if buffered >= config.chunk_rows or day == len(dates) - 1:
+                table = orders_table(orders, config, list(months), month_codes[first_day:day + 1])
+                pq.write_to_dataset(table, orders_dir, partition_cols=["Location", "Month"],
+                                    basename_template=f"part-{first_day:05d}-{{i}}.parquet")
+                review_writer.write_table(reviews_table(reviews, config))
+                written += buffered
+                log(f"{date:%Y-%m-%d}: {written:,} order lines ({time.perf_counter() - start:.0f}s)")
+                first_day, buffered, orders, reviews = day + 1, 0, [], []
+    write_manifest(orders_dir)
+
+    movements, reorder = inventory_movements(dates, portions, config.location_names)
+    movements.to_parquet(paths["movements"], index=False)
+    closing = movements[movements["Date"] == dates[-1]]
+    pd.DataFrame({"Location": closing["Location"].astype(str).to_numpy(),
+                  "Ingredient": closing["Ingredient"].astype(str).to_numpy(),
+                  "Stock Level": closing["Closing"].round(1).to_numpy(),
+                  "Threshold": reorder.to_numpy().round(1).reshape(-1)}).to_csv(paths["STELLE_STOCK"], index=False)
+    SAMPLE_RECIPES.to_csv(paths["STELLE_RECIPES"], index=False)
+    rosters(config, expected).to_csv(paths["STELLE_ROSTER"], index=False)
+    return paths
+
@@ -0,0 +1,53 @@
+"""The widget and layout half of a stand-in for the `streamlit` module.
+
+Sections only ever call `st.<element>(...)`, so an object with the same
+methods can drive them outside a Streamlit server. HeadlessStreamlit answers
+every widget with its default value, as on a first page load, and treats
+layout containers as no-ops; subclasses decide what happens to the elements
+(stelle.reports renders them to HTML, benchmarks/headless.py measures their
+payloads). A widget a section starts using is added here, once, for both.
+"""
+
+
+class HeadlessStreamlit:
+    """Widgets at their defaults and pass-through layout; elements are left to subclasses."""
+
+    # Layout
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def columns(self, spec, **kwargs):
+        return [self] * (spec if isinstance(spec, int) else len(spec))
+
+    def expander(self, *args, **kwargs):
+        return self
+
+    def fragment(self, func=None, **kwargs):
+        return func if func is not None else (lambda f: f)
+
+    @property
+    def sidebar(self):
+        return self
+
+    # Widgets return their defaults
+    def selectbox(self, label, options, index=0, **kwargs):
+        return list(options)[index]
+
+    radio = selectbox
+
+    def slider(self, label, min_value=None, max_value=None, value=None, *args, **kwargs):
+        return min_value if value is None else value
+
+    def date_input(self, label, value=None, **kwargs):
+        return value
+
+    def number_input(self, label, min_value=None, max_value=None, value=None, *args, **kwargs):
+        return min_value if value is None else value
+
+    def checkbox(self, label, value=False, **kwargs):
+        return value
+
+    toggle = checkbox
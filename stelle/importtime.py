@@ -0,0 +1,62 @@
+"""Import cost accounting for dashboard cold starts.
+
+`timed_import` records how long each first import takes inside the running
+app (including any dependencies it pulls in first). For a full breakdown of a
+cold start, run the module as a script; it wraps `python -X importtime` and
+prints the most expensive modules:
+
+    python -m stelle.importtime stelle.sections.overview --top 20
+"""
+import argparse
+import importlib
+import subprocess
+import sys
+import time
+from collections import OrderedDict
+
+timings = OrderedDict()
+
+
+def timed_import(name):
+    """Import module `name`, recording its cost the first time it is loaded."""
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    start = time.perf_counter()
+    module = importlib.import_module(name)
+    timings[name] = time.perf_counter() - start
+    return module
+
+
+def report():
+    """Recorded import costs as (module, seconds) rows, slowest first."""
+    return sorted(timings.items(), key=lambda row: row[1], reverse=True)
+
+
+def profile(modules, python=sys.executable):
+    """Cumulative cold-import cost per module from `python -X importtime`."""
+    code = "; ".join(f"import {name}" for name in modules)
+    result = subprocess.run([python, "-X", "importtime", "-c", code],
+                            capture_output=True, text=True, check=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        if self_us.strip().isdigit():
+            rows.append((name.strip(), int(self_us) / 1e6, int(cumulative_us) / 1e6))
+    return sorted(rows, key=lambda row: row[2], reverse=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report cold-import cost per module.")
+    parser.add_argument("modules", nargs="+", help="modules to import, e.g. stelle.sections.overview")
+    parser.add_argument("--top", type=int, default=25, help="number of modules to show")
+    args = parser.parse_args(argv)
+    print(f"{'cumulative':>11} {'self':>9}  module")
+    for name, self_s, cumulative_s in profile(args.modules)[:args.top]:
+        print(f"{cumulative_s * 1000:9.1f}ms {self_s * 1000:7.1f}ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""Recipe-based ingredient depletion for the Inventory Management section.
+
+A bill of materials maps menu items to ingredient quantities per portion and
+is held as a sparse (item x ingredient) matrix in coordinate form. Portions
+sold per period (periods x items) are multiplied through it in one batched
+product to get ingredient consumption for every ingredient and period, from
+which projected stock and days until stockout follow. Results are cached per
+dataset version and grain.
+"""
+import os
+import threading
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from stelle import perf
+from stelle.data import DATASETS_KEPT, SAMPLE_LOCATIONS
+from stelle.shards import ALL_LOCATIONS
+
+# Each order row's Customers are counted as portions of its Top Item
+PORTIONS_MEASURE = "Customers"
+USAGE_WINDOW_DAYS = 28
+PROJECTION_DAYS = 14
+
+# Quantities in kg per portion
+SAMPLE_RECIPES = pd.DataFrame([
+    ("Burger", "Beef", 0.15), ("Burger", "Cheese", 0.03), ("Burger", "Lettuce", 0.02),
+    ("Burger", "Tomatoes", 0.03), ("Burger", "Bread", 0.08),
+    ("Pizza", "Dough", 0.25), ("Pizza", "Cheese", 0.12), ("Pizza", "Tomatoes", 0.10),
+    ("Pasta", "Pasta", 0.12), ("Pasta", "Tomatoes", 0.08), ("Pasta", "Cheese", 0.02),
+    ("Pasta", "Chicken", 0.05),
+    ("Salad", "Lettuce", 0.10), ("Salad", "Tomatoes", 0.05), ("Salad", "Chicken", 0.08),
+], columns=["Item", "Ingredient", "Quantity"])
+
+# Stock on hand and reorder thresholds in kg, the same at every sample location
+SAMPLE_STOCK = pd.DataFrame({
+    "Location": np.repeat(SAMPLE_LOCATIONS, 8),
+    "Ingredient": ["Tomatoes", "Cheese", "Lettuce", "Chicken", "Beef", "Bread", "Dough", "Pasta"] * len(SAMPLE_LOCATIONS),
+    "Stock Level": [50, 20, 10, 30, 40, 25, 60, 35] * len(SAMPLE_LOCATIONS),
+    "Threshold": [40, 30, 15, 25, 20, 10, 30, 15] * len(SAMPLE_LOCATIONS),
+})
+STOCK_COLUMNS = ["Location", "Ingredient", "Stock Level", "Threshold"]
+
+
+class BillOfMaterials:
+    """Sparse (item x ingredient) quantity matrix in coordinate form."""
+
+    def __init__(self, recipes):
+        self.items = list(pd.unique(recipes["Item"]))
+        self.ingredients = list(pd.unique(recipes["Ingredient"]))
+        rows = pd.Categorical(recipes["Item"], categories=self.items).codes
+        cols = pd.Categorical(recipes["Ingredient"], categories=self.ingredients).codes
+        # Entries sorted by ingredient so each ingredient is one contiguous run
+        order = np.argsort(cols, kind="stable")
+        self.rows = rows[order].astype(np.int64)
+        self.cols = cols[order].astype(np.int64)
+        self.values = recipes["Quantity"].to_numpy(dtype=np.float64)[order]
+        self._starts = np.flatnonzero(np.r_[True, self.cols[1:] != self.cols[:-1]])
+
+    def consumption(self, portions):
+        """(periods x ingredients) usage for (periods x items) portions sold."""
+        portions = np.atleast_2d(portions)
+        usage = np.zeros((portions.shape[0], len(self.ingredients)))
+        if len(self.values):
+            contributions = portions[:, self.rows] * self.values
+            usage[:, self.cols[self._starts]] = np.add.reduceat(contributions, self._starts, axis=1)
+        return usage
+
+
+class InventoryEngine:
+    """Ingredient usage, projected stock and days until stockout from sales."""
+
+    def __init__(self, recipes=SAMPLE_RECIPES, stock=SAMPLE_STOCK):
+        missing = [column for column in STOCK_COLUMNS if column not in stock.columns]
+        if missing:
+            raise ValueError(f"Stock table lacks {', '.join(missing)}; expected columns {', '.join(STOCK_COLUMNS)}")
+        self.bom = BillOfMaterials(recipes)
+        self.stock = stock[STOCK_COLUMNS].groupby(["Location", "Ingredient"], sort=False)[["Stock Level", "Threshold"]].sum()
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _memo(self, cube, key, compute):
+        # Results are kept per cube (location, source and date range), for the
+        # cube's current rows only: cubes grow in place as data arrives
+        version = (cube.rows, cube.last_date)
+        with self._lock:
+            ref, known, results = self._results.get(id(cube), (None, None, None))
+            if ref is None or ref() is not cube or known != version:
+                results = {}
+                self._results[id(cube)] = (weakref.ref(cube), version, results)
+            self._results.move_to_end(id(cube))
+            while len(self._results) > DATASETS_KEPT:
+                self._results.popitem(last=False)
+            result = results.get(key)
+        if result is None:
+            result = compute()
+            with self._lock:
+                results[key] = result
+        return result
+
+    def stock_for(self, location=ALL_LOCATIONS):
+        """Stock Level and Threshold per ingredient at `location`, summed over all for ALL_LOCATIONS."""
+        if location == ALL_LOCATIONS:
+            stock = self.stock.groupby(level="Ingredient", sort=False).sum()
+        elif location in self.stock.index.get_level_values("Location"):
+            stock = self.stock.xs(location, level="Location")
+        else:
+            stock = self.stock.iloc[:0].droplevel("Location")
+        return stock.reindex(self.bom.ingredients, fill_value=0).rename_axis("Ingredient")
+
+    def portions(self, cube, grain):
+        """(periods x items) portions sold at `grain`, aligned to the recipes."""
+        view = cube.view(grain, by=["Top Item"])
+        table = view.pivot_table(index="Date", columns="Top Item", values=PORTIONS_MEASURE,
+                                 aggfunc="sum", fill_value=0, observed=True)
+        return table.reindex(columns=self.bom.items, fill_value=0)
+
+    @perf.timed("inventory.usage")
+    def usage(self, cube, grain="Daily"):
+        """Ingredient consumption per period at `grain`, cached per dataset version."""
+        def compute():
+            portions = self.portions(cube, grain)
+            return pd.DataFrame(self.bom.consumption(portions.to_numpy(dtype=np.float64)),
+                                index=portions.index, columns=self.bom.ingredients)
+        return self._memo(cube, ("usage", grain), compute)
+
+    @perf.timed("inventory.ledger")
+    def ledger(self, cube, grain="Daily"):
+        """Usage in long form, one row per period and ingredient."""
+        return self._memo(cube, ("ledger", grain), lambda: self.usage(cube, grain).reset_index().melt(
+            id_vars="Date", var_name="Ingredient", value_name="Usage"))
+
+    @perf.timed("inventory.status")
+    def status(self, cube, location=ALL_LOCATIONS, window=USAGE_WINDOW_DAYS):
+        """Stock, threshold, average daily usage and days until stockout at `location`.
+
+        `cube` holds the orders of `location` (of every location for ALL_LOCATIONS).
+        """
+        def compute():
+            usage = self.usage(cube, "Daily")
+            days = pd.date_range(end=usage.index.max(), periods=window, freq="D")
+            daily = usage.reindex(days, fill_value=0).mean()
+            status = self.stock_for(location)
+            status["Daily Usage"] = daily.round(2)
+            with np.errstate(divide="ignore"):
+                status["Days Until Stockout"] = np.where(daily > 0, status["Stock Level"] / daily, np.inf).round(1)
+            status["Below Threshold"] = status["Stock Level"] < status["Threshold"]
+            return status.reset_index()
+        return self._memo(cube, ("status", location, window), compute)
+
+    @perf.timed("inventory.projection")
+    def projection(self, cube, location=ALL_LOCATIONS, days=PROJECTION_DAYS):
+        """Projected stock per ingredient at `location` for the next `days` days at current usage."""
+        def compute():
+            status = self.status(cube, location).set_index("Ingredient")
+            steps = np.arange(1, days + 1)[:, None]
+            levels = np.clip(status["Stock Level"].to_numpy() - steps * status["Daily Usage"].to_numpy(), 0, None)
+            start = cube.last_date + pd.Timedelta(days=1)
+            return pd.DataFrame(levels, columns=status.index,
+                                index=pd.date_range(start, periods=days, freq="D").rename("Date")).reset_index()
+        return self._memo(cube, ("projection", location, days), compute)
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def inventory_engine():
+    """Process-wide engine from $STELLE_RECIPES / $STELLE_STOCK CSVs, else samples."""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            recipes = os.environ.get("STELLE_RECIPES")
+            stock = os.environ.get("STELLE_STOCK")
+            _engine = InventoryEngine(
+                pd.read_csv(recipes) if recipes else SAMPLE_RECIPES,
+                pd.read_csv(stock) if stock else SAMPLE_STOCK,
+            )
+        return _engine
@@ -0,0 +1,215 @@
+"""Live POS event ingestion for the Overview metrics.
+
+Transactions arrive as newline-delimited JSON, either appended to a local
+event file or written to a local TCP socket:
+
+    {"ts": "2026-10-16T19:02:11", "amount": 23.50, "orders": 1}
+
+A LiveFeed keeps the most recent events in a fixed-size columnar ring buffer
+and maintains running totals for the current business day, so a refresh only
+parses the bytes appended since the previous one and adds them to the totals.
+The buffer backs the Overview's per-minute view of the last hour; its
+capacity only needs to cover that hour at peak, not a whole day.
+"""
+import json
+import os
+import socketserver
+import threading
+
+import numpy as np
+import pandas as pd
+
+COLUMNS = {"ts": "datetime64[ns]", "amount": "float64", "orders": "int64"}
+# About 2.4 MB per feed; far more events than a location takes in an hour
+DEFAULT_CAPACITY = 100_000
+RECENT_MINUTES = 60
+
+
+def parse_events(lines):
+    """Turn JSON event lines into a columnar batch, skipping malformed lines."""
+    ts, amount, orders = [], [], []
+    for line in lines:
+        try:
+            event = json.loads(line)
+            ts.append(np.datetime64(event["ts"], "ns"))
+            amount.append(float(event["amount"]))
+            orders.append(int(event.get("orders", 1)))
+        except (ValueError, KeyError, TypeError):
+            continue
+    return {
+        "ts": np.array(ts, dtype=COLUMNS["ts"]),
+        "amount": np.array(amount, dtype=COLUMNS["amount"]),
+        "orders": np.array(orders, dtype=COLUMNS["orders"]),
+    }
+
+
+class RingBuffer:
+    """Fixed-capacity columnar buffer that overwrites its oldest rows."""
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, columns=COLUMNS):
+        self.capacity = capacity
+        self.columns = {name: np.empty(capacity, dtype=dtype) for name, dtype in columns.items()}
+        self.size = 0
+        self.head = 0
+
+    def extend(self, batch):
+        n = len(next(iter(batch.values())))
+        if n == 0:
+            return
+        if n > self.capacity:
+            batch = {name: values[-self.capacity:] for name, values in batch.items()}
+            n = self.capacity
+        first = min(n, self.capacity - self.head)
+        for name, values in batch.items():
+            column = self.columns[name]
+            column[self.head:self.head + first] = values[:first]
+            column[:n - first] = values[first:]
+        self.head = (self.head + n) % self.capacity
+        self.size = min(self.size + n, self.capacity)
+
+    def snapshot(self):
+        """Copy of the buffered rows, oldest first."""
+        start = (self.head - self.size) % self.capacity
+        if start + self.size <= self.capacity:
+            return {name: column[start:start + self.size].copy() for name, column in self.columns.items()}
+        return {name: np.concatenate([column[start:], column[:self.head]]) for name, column in self.columns.items()}
+
+
+class RunningTotals:
+    """Revenue and order count for the newest business day seen in the feed."""
+
+    def __init__(self):
+        self.day = None
+        self.revenue = 0.0
+        self.orders = 0
+
+    def update(self, batch):
+        if not len(batch["ts"]):
+            return
+        days = batch["ts"].astype("datetime64[D]")
+        newest = days.max()
+        if self.day is None or newest > self.day:
+            self.day, self.revenue, self.orders = newest, 0.0, 0
+        today = days == self.day
+        self.revenue += float(batch["amount"][today].sum())
+        self.orders += int(batch["orders"][today].sum())
+
+
+class FileTailer:
+    """Reads complete lines appended to a file since the previous poll."""
+
+    def __init__(self, path):
+        self.path = path
+        self.offset = 0
+        self.file_id = None
+        self._partial = b""
+
+    def poll(self):
+        try:
+            with open(self.path, "rb") as handle:
+                stat = os.fstat(handle.fileno())
+                file_id = (stat.st_dev, stat.st_ino)
+                if file_id != self.file_id or stat.st_size < self.offset:
+                    # A new file (rotated, even if it has already grown past
+                    # the old offset) or a truncated one: start from the top
+                    self.offset, self._partial = 0, b""
+                    self.file_id = file_id
+                if stat.st_size == self.offset:
+                    return []
+                handle.seek(self.offset)
+                chunk = handle.read(stat.st_size - self.offset)
+        except OSError:
+            return []
+        self.offset += len(chunk)
+        *lines, self._partial = (self._partial + chunk).split(b"\n")
+        return lines
+
+
+class SocketListener(socketserver.ThreadingTCPServer):
+    """Background TCP server that hands received event lines to a LiveFeed."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, feed):
+        self.feed = feed
+        super().__init__(address, _EventHandler)
+        self.thread = threading.Thread(target=self.serve_forever, name="stelle-pos-socket", daemon=True)
+        self.thread.start()
+
+
+class _EventHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            self.server.feed.ingest([line])
+
+
+class LiveFeed:
+    """Ring buffer plus running totals fed by a file tailer and/or a socket."""
+
+    def __init__(self, path=None, address=None, capacity=DEFAULT_CAPACITY):
+        self.buffer = RingBuffer(capacity)
+        self.totals = RunningTotals()
+        self.tailer = FileTailer(path) if path else None
+        self.listener = SocketListener(address, self) if address else None
+        self._lock = threading.Lock()
+
+    def ingest(self, lines):
+        batch = parse_events(lines)
+        with self._lock:
+            self.buffer.extend(batch)
+            self.totals.update(batch)
+
+    def poll(self):
+        """Pull newly appended file events; returns (day, revenue, orders).
+
+        The lock is held from reading the file to adding its events, so
+        sessions polling at the same moment cannot both ingest one chunk.
+        """
+        with self._lock:
+            if self.tailer is not None:
+                lines = self.tailer.poll()
+                if lines:
+                    batch = parse_events(lines)
+                    self.buffer.extend(batch)
+                    self.totals.update(batch)
+            return self.totals.day, self.totals.revenue, self.totals.orders
+
+    def per_minute(self, minutes=RECENT_MINUTES):
+        """Revenue and orders per minute over the `minutes` up to the newest buffered event."""
+        with self._lock:
+            rows = self.buffer.snapshot()
+        if not len(rows["ts"]):
+            return pd.DataFrame({"Minute": pd.Series(dtype="datetime64[ns]"), "Revenue": [], "Orders": []})
+        minute = rows["ts"].astype("datetime64[m]")
+        first = minute.max() - (minutes - 1)
+        recent = minute >= first
+        slots = (minute[recent] - first).astype(np.int64)
+        return pd.DataFrame({
+            "Minute": (first + np.arange(minutes)).astype("datetime64[ns]"),
+            "Revenue": np.bincount(slots, weights=rows["amount"][recent], minlength=minutes),
+            "Orders": np.bincount(slots, weights=rows["orders"][recent], minlength=minutes).astype(np.int64),
+        })
+
+
+_feeds = {}
+_feeds_lock = threading.Lock()
+
+
+def parse_address(value):
+    host, _, port = value.rpartition(":")
+    return (host or "127.0.0.1", int(port))
+
+
+def feed_from_env():
+    """Process-wide LiveFeed for $STELLE_POS_EVENTS / $STELLE_POS_SOCKET, if set."""
+    path = os.environ.get("STELLE_POS_EVENTS")
+    socket = os.environ.get("STELLE_POS_SOCKET")
+    if not path and not socket:
+        return None
+    key = (path, socket)
+    with _feeds_lock:
+        feed = _feeds.get(key)
+        if feed is None:
+            feed = _feeds[key] = LiveFeed(path=path, address=parse_address(socket) if socket else None)
+        return feed
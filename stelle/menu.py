@@ -0,0 +1,156 @@
+"""Menu engineering (Kasavana-Smith) for the Menu Performance section.
+
+Each menu item is scored on popularity and contribution margin:
+
+    Portions        portions sold (each order row's Customers, as in stelle.inventory)
+    Mix             the item's share of portions
+    Food Cost       portions x recipe cost, from the bill of materials and
+                    ingredient costs per kg; items without a recipe are
+                    costed at DEFAULT_FOOD_COST_RATIO of their revenue
+    Margin          contribution (revenue - food cost) per portion
+
+Items selling at least 70% of an even share (0.7 / number of items) are
+popular. Items whose margin is at least the menu's portion-weighted average
+margin are profitable. The two tests give the Star, Plowhorse, Puzzle and
+Dog quadrants.
+
+Inputs come from the rollup cube, so the order lines are aggregated once
+(and incrementally) there. Classifications per period are cached per cube,
+grain and service type. When the cube is extended, only periods from the
+previous last day onwards are recomputed; closed periods are kept.
+"""
+import os
+import threading
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from stelle import perf
+from stelle.inventory import PORTIONS_MEASURE, inventory_engine
+from stelle.query import period_start
+
+POPULARITY_FACTOR = 0.7
+DEFAULT_FOOD_COST_RATIO = 0.3
+CLASSES = ["Star", "Plowhorse", "Puzzle", "Dog"]
+RESULTS_KEPT = 32
+
+# Ingredient costs in $ per kg
+SAMPLE_INGREDIENT_COSTS = pd.DataFrame({
+    "Ingredient": ["Tomatoes", "Cheese", "Lettuce", "Chicken", "Beef", "Bread", "Dough", "Pasta"],
+    "Cost": [3.5, 9.0, 3.0, 8.0, 12.0, 4.0, 2.0, 2.5],
+})
+
+
+def classify(cells, unit_costs, by=()):
+    """Add cost, margin and quadrant columns to per-item `cells`, ranked within each `by` group.
+
+    `cells` has Top Item, Portions and Revenue columns; `unit_costs` maps items
+    to food cost per portion (NaN where there is no recipe).
+    """
+    table = cells[cells["Portions"] > 0].copy()
+    unit = table["Top Item"].astype(object).map(unit_costs).to_numpy(dtype=np.float64)
+    costed = ~np.isnan(unit)
+    table["Food Cost"] = np.where(costed, unit * table["Portions"], DEFAULT_FOOD_COST_RATIO * table["Revenue"])
+    table["Costed"] = np.where(costed, "Recipe", "Estimated")
+    table["Contribution"] = table["Revenue"] - table["Food Cost"]
+    table["Margin"] = table["Contribution"] / table["Portions"]
+    if by:
+        groups = table.groupby(list(by), observed=True, sort=False)
+        portions = groups["Portions"].transform("sum")
+        contribution = groups["Contribution"].transform("sum")
+        items = groups["Portions"].transform("size")
+    else:
+        portions, contribution, items = table["Portions"].sum(), table["Contribution"].sum(), len(table)
+    table["Mix"] = table["Portions"] / portions
+    popular = table["Mix"] >= POPULARITY_FACTOR / items
+    profitable = table["Margin"] >= contribution / portions
+    table["Class"] = pd.Categorical(np.select([popular & profitable, popular, profitable], CLASSES[:3], CLASSES[3]),
+                                    categories=CLASSES)
+    return table.reset_index(drop=True)
+
+
+def thresholds(matrix):
+    """(popularity, margin) cut-offs behind the quadrants of a one-period `matrix`."""
+    return POPULARITY_FACTOR / len(matrix), matrix["Contribution"].sum() / matrix["Portions"].sum()
+
+
+class MenuEngine:
+    """Per-item popularity, contribution margin and quadrant from a rollup cube."""
+
+    def __init__(self, bom, ingredient_costs=SAMPLE_INGREDIENT_COSTS):
+        costs = ingredient_costs.set_index("Ingredient")["Cost"].reindex(bom.ingredients).to_numpy(dtype=np.float64)
+        per_item = np.bincount(bom.rows, weights=bom.values * np.nan_to_num(costs[bom.cols]), minlength=len(bom.items))
+        self.unit_costs = pd.Series(per_item, index=bom.items)
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _cells(self, table, keys, service_type):
+        if service_type is not None:
+            table = table[table["Service Type"] == service_type]
+        cells = table.groupby(keys, observed=True)[["Sales", PORTIONS_MEASURE]].sum().reset_index()
+        return cells.rename(columns={"Sales": "Revenue", PORTIONS_MEASURE: "Portions"}).astype({"Revenue": float})
+
+    def _cached(self, key, cube):
+        # Results are keyed by id(cube); the weak reference tells a later cube
+        # that reused the id apart from the one the result was computed for
+        with self._lock:
+            ref, value = self._results.get(key, (None, None))
+        return value if ref is not None and ref() is cube else None
+
+    def _remember(self, key, cube, value):
+        with self._lock:
+            self._results[key] = (weakref.ref(cube), value)
+            self._results.move_to_end(key)
+            while len(self._results) > RESULTS_KEPT:
+                self._results.popitem(last=False)
+
+    @perf.timed("menu.matrix")
+    def matrix(self, cube, service_type=None):
+        """Classification over everything in the cube, one row per item."""
+        key = ("matrix", id(cube), service_type)
+        version = (cube.rows, cube.last_date)
+        cached = self._cached(key, cube)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        cells = self._cells(cube.totals(["Top Item", "Service Type"]), ["Top Item"], service_type)
+        result = classify(cells, self.unit_costs).sort_values("Contribution", ascending=False, ignore_index=True)
+        self._remember(key, cube, (version, result))
+        return result
+
+    @perf.timed("menu.periods")
+    def periods(self, cube, grain="Monthly", service_type=None):
+        """Classification within each period at `grain`, one row per period and item."""
+        key = ("periods", id(cube), grain, service_type)
+        version = (cube.rows, cube.last_date)
+        cached = self._cached(key, cube)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        view = cube.view(grain, by=["Top Item", "Service Type"])
+        if cached is not None and cached[0][0] < cube.rows and cached[0][1] is not None:
+            # The cube was extended: periods before the one holding the previous
+            # last day are closed, so only the rest are classified again
+            boundary = period_start(pd.Series([cached[0][1]]), grain).iloc[0]
+            kept = cached[1][cached[1]["Date"] < boundary]
+            fresh = classify(self._cells(view[view["Date"] >= boundary], ["Date", "Top Item"], service_type),
+                             self.unit_costs, by=("Date",))
+            result = pd.concat([kept, fresh], ignore_index=True)
+        else:
+            result = classify(self._cells(view, ["Date", "Top Item"], service_type), self.unit_costs, by=("Date",))
+        self._remember(key, cube, (version, result))
+        return result
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def menu_engine():
+    """Process-wide engine over the inventory recipes and $STELLE_INGREDIENT_COSTS, else sample costs."""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            costs = os.environ.get("STELLE_INGREDIENT_COSTS")
+            _engine = MenuEngine(inventory_engine().bom, pd.read_csv(costs) if costs else SAMPLE_INGREDIENT_COSTS)
+        return _engine
@@ -0,0 +1,203 @@
+"""Timing spans for the dashboard's hot paths.
+
+Set $STELLE_PERF=1 to record how long each data step, figure construction
+and chart/table element takes, per dashboard section. The dashboard then
+shows a sidebar "Performance" panel with p50/p95 per span, and exports:
+
+- $STELLE_PERF_LOG: one JSON line per span, appended at the end of each run.
+- $STELLE_PERF_PROM: a Prometheus text file with a summary per section and
+  span, rewritten at the end of each run (for the node exporter's textfile
+  collector, say).
+
+Setting either path also enables recording. When recording is off, `span`
+and `section` hand back a shared no-op context manager, `timed` returns the
+function it decorates unchanged and `instrument` returns `st` itself, so the
+instrumentation costs a flag check at most.
+"""
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+
+LOG_PATH = os.environ.get("STELLE_PERF_LOG")
+PROM_PATH = os.environ.get("STELLE_PERF_PROM")
+ENABLED = bool(os.environ.get("STELLE_PERF") or LOG_PATH or PROM_PATH)
+# Durations kept per (section, span) for the quantiles
+SAMPLES = 512
+QUANTILES = (0.5, 0.95)
+# Elements whose Styler rendering and serialisation Streamlit does in the call
+TIMED_ELEMENTS = ("plotly_chart", "dataframe", "table")
+TIMED_FIGURES = ("line", "bar", "pie", "imshow", "scatter", "area", "histogram")
+
+_section = contextvars.ContextVar("stelle_perf_section", default="(app)")
+_samples = defaultdict(lambda: deque(maxlen=SAMPLES))
+# Lifetime [count, total seconds]; Prometheus expects these to only grow
+_totals = defaultdict(lambda: [0, 0.0])
+_pending = []
+_lock = threading.Lock()
+
+
+class _Noop:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NOOP = _Noop()
+
+
+class _Span:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class _Section(_Span):
+    __slots__ = ("token",)
+
+    def __enter__(self):
+        self.token = _section.set(self.name)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record("(total)", time.perf_counter() - self.start)
+        _section.reset(self.token)
+        return False
+
+
+def span(name):
+    """Time the enclosed block as `name` within the current section."""
+    return _Span(name) if ENABLED else NOOP
+
+
+def section(name):
+    """Attribute enclosed spans to dashboard section `name` and time the whole of it."""
+    return _Section(name) if ENABLED else NOOP
+
+
+def timed(name):
+    """Decorator form of `span`; a no-op when recording is off."""
+    def decorate(func):
+        if not ENABLED:
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with _Span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def record(name, seconds):
+    current = _section.get()
+    with _lock:
+        _samples[(current, name)].append(seconds)
+        totals = _totals[(current, name)]
+        totals[0] += 1
+        totals[1] += seconds
+        if LOG_PATH:
+            _pending.append({"ts": time.time(), "section": current, "span": name, "seconds": seconds})
+
+
+class InstrumentedStreamlit:
+    """Proxy for the `st` module that times chart and table elements."""
+
+    def __init__(self, st):
+        self._st = st
+
+    def __getattr__(self, name):
+        attr = getattr(self._st, name)
+        if name in TIMED_ELEMENTS:
+            return timed(f"st.{name}")(attr)
+        return attr
+
+
+def instrument(st):
+    """`st` with timed elements when recording, else `st` itself."""
+    return InstrumentedStreamlit(st) if ENABLED else st
+
+
+_plotly_patched = False
+
+
+def instrument_plotly():
+    """Time Plotly Express figure construction (px.line, px.bar, ...) when recording."""
+    global _plotly_patched
+    if not ENABLED or _plotly_patched:
+        return
+    import plotly.express as px
+    for name in TIMED_FIGURES:
+        setattr(px, name, timed(f"px.{name}")(getattr(px, name)))
+    _plotly_patched = True
+
+
+def _quantile(ordered, q):
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def summary(sections=None):
+    """Count, p50 and p95 per span of `sections` (default all), slowest total first."""
+    with _lock:
+        items = [(key, sorted(values)) for key, values in _samples.items()
+                 if sections is None or key[0] in sections]
+    rows = sorted(((key, ordered) for key, ordered in items if ordered),
+                  key=lambda item: -sum(item[1]))
+    return {
+        "Section": [key[0] for key, _ in rows],
+        "Span": [key[1] for key, _ in rows],
+        "Count": [len(ordered) for _, ordered in rows],
+        "p50 ms": [round(_quantile(ordered, 0.5) * 1000, 1) for _, ordered in rows],
+        "p95 ms": [round(_quantile(ordered, 0.95) * 1000, 1) for _, ordered in rows],
+    }
+
+
+def prometheus():
+    """All recorded spans as a Prometheus text-format summary."""
+    lines = ["# HELP stelle_span_seconds Dashboard hot-path span durations.",
+             "# TYPE stelle_span_seconds summary"]
+    with _lock:
+        items = [(key, sorted(values), tuple(_totals[key])) for key, values in _samples.items() if values]
+    for (current, name), ordered, (count, total) in sorted(items):
+        labels = 'section="{}",span="{}"'.format(current.replace('"', '\\"'), name.replace('"', '\\"'))
+        for q in QUANTILES:
+            lines.append(f'stelle_span_seconds{{{labels},quantile="{q}"}} {_quantile(ordered, q):.6f}')
+        lines.append(f"stelle_span_seconds_sum{{{labels}}} {total:.6f}")
+        lines.append(f"stelle_span_seconds_count{{{labels}}} {count}")
+    return "\n".join(lines) + "\n"
+
+
+def flush():
+    """Append pending spans to $STELLE_PERF_LOG and rewrite $STELLE_PERF_PROM."""
+    if not ENABLED:
+        return
+    if LOG_PATH:
+        with _lock:
+            pending = _pending[:]
+            del _pending[:]
+        if pending:
+            with open(LOG_PATH, "a") as handle:
+                handle.writelines(json.dumps(entry) + "\n" for entry in pending)
+    if PROM_PATH:
+        # Write then rename, so a scraper never reads a half-written file
+        staging = PROM_PATH + ".tmp"
+        with open(staging, "w") as handle:
+            handle.write(prometheus())
+        os.replace(staging, PROM_PATH)
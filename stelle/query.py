@@ -0,0 +1,344 @@
+"""Filters and group-bys as data, run by interchangeable engines.
+
+A Query names its aggregates, group keys (Date optionally bucketed to a
+grain), a filter written with the stelle.filters expressions, and optionally
+an ordering and row limit. Engines execute it:
+
+- PandasEngine runs over an in-memory frame, filtering through its
+  FilterIndex posting lists.
+- DuckDBEngine compiles it to SQL over the order files on disk (Parquet,
+  including hive-partitioned directories, or CSV).
+- PolarsEngine builds a lazy scan over the same files, with the filter and
+  projection pushed into the scan.
+
+The on-disk engines aggregate out of core and multi-threaded, and only the
+result comes back as a DataFrame. Date and "Month" filters become Date range
+predicates that Parquet row-group statistics can skip on. DuckDB and Polars
+are optional: set $STELLE_QUERY_ENGINE to "duckdb" or "polars" to query a
+Parquet or CSV $STELLE_DATA with them.
+
+Every engine returns the same shape: group keys then aggregates, categorical
+keys with the dashboard's categories, Date as datetime64[ns], sorted by the
+keys unless the query orders otherwise.
+"""
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from stelle import perf
+from stelle.data import ARROW_SUFFIXES, CATEGORICAL_COLUMNS, CSV_SUFFIXES, PARQUET_SUFFIXES
+from stelle.filters import PARTITION_COLUMN, And, Between, Eq, In, Or, index_for
+from stelle.importtime import timed_import
+
+ENGINES = ("pandas", "duckdb", "polars")
+# Period codes for pandas and truncation units for DuckDB and Polars per grain
+PERIODS = {"Daily": "D", "Weekly": "W", "Monthly": "M"}
+SQL_UNITS = {"Daily": "day", "Weekly": "week", "Monthly": "month"}
+POLARS_UNITS = {"Daily": "1d", "Weekly": "1w", "Monthly": "1mo"}
+ROW_MARKER = "\0rows"
+# On-disk engines kept open, per source, location and date range
+ENGINES_KEPT = 8
+SQL_FUNCS = {"sum": "SUM", "mean": "AVG", "min": "MIN", "max": "MAX", "count": "COUNT"}
+
+
+def period_start(dates, grain):
+    """Map timestamps to the first day of their period at `grain`."""
+    if grain == "Daily":
+        return dates.dt.normalize()
+    return dates.dt.to_period(PERIODS[grain]).dt.start_time
+
+
+@dataclass(frozen=True)
+class Agg:
+    """`func` ("sum", "mean", "min", "max" or "count") of `column`, output as `name`."""
+    column: str
+    func: str = "sum"
+    name: str = None
+
+    @property
+    def label(self):
+        return self.name or self.column
+
+
+ROWS = Agg("*", "count", "Rows")
+
+
+@dataclass(frozen=True)
+class Query:
+    """Aggregates `measures` of the rows matching `where`, per combination of `by`."""
+    measures: tuple
+    by: tuple = ()
+    where: object = None
+    grain: str = None
+    order_by: str = None
+    descending: bool = False
+    limit: int = None
+
+    def columns(self):
+        """Source columns the query reads."""
+        named = [agg.column for agg in self.measures if agg.column != "*"]
+        return list(dict.fromkeys([*self.by, *named]))
+
+
+def _both(first, second):
+    if first is None or second is None:
+        return second if first is None else first
+    return And(first, second)
+
+
+def _month_range(month):
+    start = pd.Timestamp(f"{month}-01")
+    return start, start + pd.offsets.MonthBegin(1)
+
+
+def _conform(frame, query):
+    """Bring an engine's result to the common column types and order."""
+    for key in query.by:
+        if key in CATEGORICAL_COLUMNS:
+            known = CATEGORICAL_COLUMNS[key]
+            dtype = frame[key].dtype
+            # Frames loaded by stelle.data already list the known categories first
+            if isinstance(dtype, pd.CategoricalDtype) and list(dtype.categories[:len(known)]) == known:
+                continue
+            extra = sorted(set(frame[key].dropna().astype(str)) - set(known))
+            frame[key] = pd.Categorical(frame[key].astype(object), categories=known + extra)
+        elif key == "Date":
+            frame[key] = pd.to_datetime(frame[key]).astype("datetime64[ns]")
+    for agg in query.measures:
+        if agg.func == "count":
+            frame[agg.label] = frame[agg.label].astype(np.int64)
+    if query.order_by is None and query.by:
+        frame = frame.sort_values(list(query.by), kind="stable")
+    return frame.reset_index(drop=True)
+
+
+class PandasEngine:
+    """Runs queries over an in-memory order frame (sorted by Date, as loaded)."""
+
+    def __init__(self, frame, name="default"):
+        self.frame = frame
+        self.name = name
+
+    @property
+    def columns(self):
+        return list(self.frame.columns)
+
+    @perf.timed("query.pandas")
+    def execute(self, query):
+        frame = self.frame[query.columns()]
+        if query.where is not None:
+            frame = frame.take(index_for(self.frame, self.name).positions(query.where))
+        if query.by:
+            keys = [period_start(frame[key], query.grain).rename(key) if key == "Date" and query.grain else frame[key]
+                    for key in query.by]
+            # Row counts are sums of a column of ones, so that each function
+            # is one grouped reduction over all of its columns
+            frame = frame.assign(**{ROW_MARKER: np.ones(len(frame), dtype=np.int64)})
+            grouped = frame.groupby(keys, observed=True, sort=False)
+            funcs = {}
+            for agg in query.measures:
+                funcs.setdefault("sum" if agg.column == "*" else agg.func, []).append(agg)
+            parts = []
+            for func, aggs in funcs.items():
+                part = grouped[[ROW_MARKER if agg.column == "*" else agg.column for agg in aggs]].agg(func)
+                parts.append(part.set_axis([agg.label for agg in aggs], axis=1))
+            result = parts[0] if len(parts) == 1 else pd.concat(parts, axis=1)[[agg.label for agg in query.measures]]
+            result = result.reset_index()
+        else:
+            result = pd.DataFrame({agg.label: [len(frame) if agg.column == "*" else frame[agg.column].agg(agg.func)]
+                                   for agg in query.measures})
+        if query.order_by is not None:
+            result = result.sort_values(query.order_by, ascending=not query.descending, kind="stable")
+        if query.limit is not None:
+            result = result.head(query.limit)
+        return _conform(result, query)
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _literal(path):
+    return "'" + path.replace("'", "''") + "'"
+
+
+def _sql(expr, params):
+    """SQL predicate for a filter expression, appending its parameters to `params`."""
+    if isinstance(expr, Eq) and expr.column == PARTITION_COLUMN:
+        start, stop = _month_range(expr.value)
+        params.extend([start.to_pydatetime(), stop.to_pydatetime()])
+        return '("Date" >= ? AND "Date" < ?)'
+    if isinstance(expr, Eq):
+        params.append(expr.value)
+        return f"{_quote(expr.column)} = ?"
+    if isinstance(expr, In):
+        return "(" + " OR ".join(_sql(Eq(expr.column, value), params) for value in expr.values) + ")" if expr.values else "FALSE"
+    if isinstance(expr, Between):
+        params.extend([pd.Timestamp(expr.start).to_pydatetime(), pd.Timestamp(expr.end).to_pydatetime()])
+        return '("Date" >= ? AND "Date" <= ?)'
+    if isinstance(expr, (And, Or)):
+        joiner, empty = (" OR ", "FALSE") if isinstance(expr, Or) else (" AND ", "TRUE")
+        return "(" + joiner.join(_sql(term, params) for term in expr.terms) + ")" if expr.terms else empty
+    raise TypeError(f"Unsupported filter expression: {expr!r}")
+
+
+class DuckDBEngine:
+    """Compiles queries to DuckDB SQL over order files; `where` scopes every query."""
+
+    def __init__(self, source, where=None):
+        self.source = source
+        self.where = where
+        self._connection = timed_import("duckdb").connect()
+        lower = source.lower()
+        if os.path.isdir(source):
+            pattern = os.path.join(source, "**", "*.parquet")
+            self._relation = f"read_parquet({_literal(pattern)}, hive_partitioning = true, union_by_name = true)"
+        elif lower.endswith(PARQUET_SUFFIXES):
+            self._relation = f"read_parquet({_literal(source)})"
+        elif lower.endswith(CSV_SUFFIXES):
+            self._relation = f"read_csv_auto({_literal(source)})"
+        else:
+            raise ValueError(f"DuckDB cannot query {source}")
+
+    @property
+    def columns(self):
+        return [row[0] for row in self._connection.cursor().execute(f"DESCRIBE SELECT * FROM {self._relation}").fetchall()]
+
+    def _key(self, key, grain):
+        if key == "Date" and grain:
+            return f"CAST(date_trunc('{SQL_UNITS[grain]}', \"Date\") AS TIMESTAMP)"
+        return _quote(key)
+
+    @perf.timed("query.duckdb")
+    def execute(self, query):
+        params = []
+        keys = [f"{self._key(key, query.grain)} AS {_quote(key)}" for key in query.by]
+        measures = [f"{SQL_FUNCS[agg.func]}({'*' if agg.column == '*' else _quote(agg.column)}) AS {_quote(agg.label)}"
+                    for agg in query.measures]
+        sql = f"SELECT {', '.join(keys + measures)} FROM {self._relation}"
+        where = _both(self.where, query.where)
+        if where is not None:
+            sql += " WHERE " + _sql(where, params)
+        if keys:
+            sql += " GROUP BY " + ", ".join(str(n + 1) for n in range(len(keys)))
+        if query.order_by is not None:
+            sql += f" ORDER BY {_quote(query.order_by)} {'DESC' if query.descending else 'ASC'}"
+        if query.limit is not None:
+            sql += f" LIMIT {int(query.limit)}"
+        # A cursor per call: DuckDB connections are not shared between threads
+        return _conform(self._connection.cursor().execute(sql, params).df(), query)
+
+
+class PolarsEngine:
+    """Runs queries as lazy Polars scans over order files; `where` scopes every query."""
+
+    def __init__(self, source, where=None):
+        self.source = source
+        self.where = where
+        self._pl = timed_import("polars")
+        if not (os.path.isdir(source) or source.lower().endswith(PARQUET_SUFFIXES + ARROW_SUFFIXES + CSV_SUFFIXES)):
+            raise ValueError(f"Polars cannot query {source}")
+
+    def _scan(self):
+        pl, lower = self._pl, self.source.lower()
+        if os.path.isdir(self.source):
+            return pl.scan_parquet(os.path.join(self.source, "**", "*.parquet"), hive_partitioning=True)
+        if lower.endswith(PARQUET_SUFFIXES):
+            return pl.scan_parquet(self.source)
+        if lower.endswith(ARROW_SUFFIXES):
+            return pl.scan_ipc(self.source)
+        return pl.scan_csv(self.source, try_parse_dates=True).with_columns(pl.col("Date").cast(pl.Datetime("ns")))
+
+    @property
+    def columns(self):
+        return list(self._scan().collect_schema().names())
+
+    def _filter(self, expr):
+        pl = self._pl
+        if isinstance(expr, Eq) and expr.column == PARTITION_COLUMN:
+            start, stop = _month_range(expr.value)
+            return (pl.col("Date") >= start.to_pydatetime()) & (pl.col("Date") < stop.to_pydatetime())
+        if isinstance(expr, Eq):
+            return pl.col(expr.column).cast(pl.String) == str(expr.value)
+        if isinstance(expr, In):
+            return pl.col(expr.column).cast(pl.String).is_in([str(value) for value in expr.values])
+        if isinstance(expr, Between):
+            return pl.col("Date").is_between(pd.Timestamp(expr.start).to_pydatetime(), pd.Timestamp(expr.end).to_pydatetime())
+        if isinstance(expr, (And, Or)):
+            if not expr.terms:
+                return pl.lit(not isinstance(expr, Or))
+            combined = self._filter(expr.terms[0])
+            for term in expr.terms[1:]:
+                combined = combined | self._filter(term) if isinstance(expr, Or) else combined & self._filter(term)
+            return combined
+        raise TypeError(f"Unsupported filter expression: {expr!r}")
+
+    def _measure(self, agg):
+        pl = self._pl
+        if agg.column == "*":
+            return pl.len().alias(agg.label)
+        return getattr(pl.col(agg.column), agg.func)().alias(agg.label)
+
+    @perf.timed("query.polars")
+    def execute(self, query):
+        pl = self._pl
+        lazy = self._scan()
+        where = _both(self.where, query.where)
+        if where is not None:
+            lazy = lazy.filter(self._filter(where))
+        keys = [pl.col(key).dt.truncate(POLARS_UNITS[query.grain]).alias(key) if key == "Date" and query.grain
+                else pl.col(key) for key in query.by]
+        measures = [self._measure(agg) for agg in query.measures]
+        lazy = lazy.group_by(keys).agg(measures) if keys else lazy.select(measures)
+        if query.order_by is not None:
+            lazy = lazy.sort(query.order_by, descending=query.descending)
+        if query.limit is not None:
+            lazy = lazy.head(query.limit)
+        return _conform(lazy.collect().to_pandas(), query)
+
+
+_engines = OrderedDict()
+_engines_lock = threading.Lock()
+
+
+def query_engine(frame, name="default", location=None, kind=None, source=None, dates=None):
+    """Engine for the order data of `location` (None for all of it).
+
+    `kind` defaults to $STELLE_QUERY_ENGINE and `source` to $STELLE_DATA. The
+    on-disk engines need a Parquet or CSV source, scoped to `location` and to
+    the (first, last) day pair `dates` with a filter; otherwise `frame`,
+    already those rows, is queried in memory through the FilterIndex
+    registered as `name`.
+    """
+    engine = disk_engine(location, kind, source, dates)
+    return PandasEngine(frame, name) if engine is None else engine
+
+
+def disk_engine(location=None, kind=None, source=None, dates=None):
+    """The on-disk engine query_engine picks for these arguments, or None when queries run in pandas."""
+    kind = kind or os.environ.get("STELLE_QUERY_ENGINE", "pandas")
+    source = source or os.environ.get("STELLE_DATA")
+    if kind not in ENGINES:
+        raise ValueError(f"Unknown query engine {kind!r}; expected one of {', '.join(ENGINES)}")
+    if kind == "pandas" or not source:
+        return None
+    dates = None if dates is None else tuple(pd.Timestamp(day) for day in dates)
+    key = (kind, os.path.abspath(source), location, dates)
+    with _engines_lock:
+        engine = _engines.get(key)
+        if engine is not None:
+            _engines.move_to_end(key)
+        else:
+            engine = (DuckDBEngine if kind == "duckdb" else PolarsEngine)(source)
+            if location is not None and "Location" in engine.columns:
+                engine.where = Eq("Location", location)
+            if dates is not None:
+                engine.where = _both(engine.where, Between(*dates))
+            _engines[key] = engine
+            while len(_engines) > ENGINES_KEPT:
+                _engines.popitem(last=False)
+        return engine
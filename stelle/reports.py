@@ -0,0 +1,333 @@
+"""Static HTML reports of every dashboard section, built without a Streamlit server.
+
+    python -m stelle report --out reports
+
+Sections only call `st.<element>(...)` (see stelle/headless.py), so
+HtmlStreamlit stands in for `streamlit` and turns each element into HTML:
+Plotly figures into <div>s drawn by plotly.js, tables into the first page
+styled as in the dashboard (stelle.tables), and metrics and text into plain
+markup. Widgets take their default values, as on a first page load.
+
+A report is one page per location holding every section, plus an index
+page. plotly.js is written once next to the pages and shared by all of them,
+so the directory opens offline and each page carries only its own figures.
+
+Every (location, section) pair is a task for a process pool. Workers load
+and shard the dataset once, when they start; with the fork start method
+that is a copy of what the parent already loaded. The alerts shown by the
+Overview and Staff sections come from each worker's AlertMonitor, which
+finishes its first scan of the history before the worker takes a task.
+"""
+import html
+import os
+import re
+import textwrap
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timezone
+
+import pandas as pd
+from pandas.io.formats.style import Styler
+from plotly.offline import get_plotlyjs
+
+from stelle.alerts import alert_monitor
+from stelle.assets import SECTION_CSS
+from stelle.data import load_data
+from stelle.headless import HeadlessStreamlit
+from stelle.query import disk_engine, query_engine
+from stelle.sections import SECTIONS, SectionContext, render
+from stelle.shards import ALL_LOCATIONS, shards_for
+
+PLOTLY_JS = "plotly.min.js"
+INDEX = "index.html"
+# Streamlit shows floats to a few decimals where Styler defaults to six
+TABLE_PRECISION = 2
+
+REPORT_CSS = """
+body { font-family: -apple-system, "Segoe UI", Roboto, sans-serif; margin: 0 auto; max-width: 1200px;
+       padding: 0 24px 48px; color: #262730; background: #ffffff; }
+body.dark { color: #fafafa; background: #0e1117; }
+nav { position: sticky; top: 0; padding: 12px 0; background: inherit; border-bottom: 1px solid #e6e6e6; }
+nav a { margin-right: 16px; }
+section { padding-top: 24px; border-bottom: 1px solid #e6e6e6; }
+.columns { display: flex; gap: 24px; }
+.column { min-width: 0; }
+.caption, .generated { color: #808495; font-size: 0.9em; }
+.text { font-family: monospace; white-space: pre-wrap; margin: 4px 0; }
+.metric-label { font-size: 0.9em; }
+.metric-value { font-size: 2em; }
+.delta-up { color: #09ab3b; }
+.delta-down { color: #ff2b2b; }
+.note { border-radius: 6px; padding: 12px 16px; margin: 8px 0; }
+.note.info { background: #e7f3fe; }
+.note.success { background: #e8f5e9; }
+.note.warning { background: #fff8e1; }
+.note.error { background: #ffebee; }
+.table { border-collapse: collapse; margin: 8px 0; font-size: 0.9em; }
+.table th, .table td { border: 1px solid #e6e6e6; padding: 4px 8px; }
+details { margin: 8px 0; }
+"""
+
+PAGE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<script src="{script}"></script>
+<style>{css}</style>
+</head>
+<body class="{body_class}">
+<h1>{title}</h1>
+<p class="generated">{generated}</p>
+<nav>{nav}</nav>
+{body}
+</body>
+</html>
+"""
+
+_INLINE = [
+    (re.compile(r"\*\*(.+?)\*\*"), r"<strong>\1</strong>"),
+    (re.compile(r"\*(.+?)\*"), r"<em>\1</em>"),
+    (re.compile(r"`(.+?)`"), r"<code>\1</code>"),
+]
+
+
+def slug(name):
+    """File-name and anchor form of a location or section name."""
+    return re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-") or "report"
+
+
+def markdown_html(text):
+    """HTML for the Markdown the sections write: headings, emphasis, code, rules and paragraphs."""
+    blocks = []
+    for block in re.split(r"\n\s*\n", textwrap.dedent(str(text)).strip()):
+        block = html.escape(block.strip(), quote=False)
+        for pattern, replacement in _INLINE:
+            block = pattern.sub(replacement, block)
+        heading = re.match(r"(#{1,6})\s+(.*)", block, re.S)
+        if heading:
+            level = len(heading.group(1))
+            blocks.append(f"<h{level}>{heading.group(2)}</h{level}>")
+        elif block == "---":
+            blocks.append("<hr>")
+        elif block:
+            blocks.append(f"<p>{block}</p>")
+    return "\n".join(blocks)
+
+
+class HtmlStreamlit(HeadlessStreamlit):
+    """Collects the HTML of the elements a section emits, in order.
+
+    Containers (columns, expanders) are HtmlStreamlit instances too. As in
+    Streamlit, `st.<element>` inside `with container:` lands in that
+    container, and `container.<element>` always does.
+    """
+
+    def __init__(self, root=None, opening="", closing=""):
+        self.parts = []
+        self.opening = opening
+        self.closing = closing
+        self._root = root or self
+        self._active = [self]
+
+    def _add(self, fragment):
+        target = self._root._active[-1] if self is self._root else self
+        target.parts.append(fragment)
+
+    def html(self):
+        inner = "\n".join(part.html() if isinstance(part, HtmlStreamlit) else part for part in self.parts)
+        return f"{self.opening}{inner}{self.closing}"
+
+    # Layout
+    def __enter__(self):
+        self._root._active.append(self)
+        return self
+
+    def __exit__(self, *exc):
+        self._root._active.pop()
+        return False
+
+    def columns(self, spec, **kwargs):
+        widths = [1] * spec if isinstance(spec, int) else list(spec)
+        row = HtmlStreamlit(self._root, "<div class='columns'>", "</div>")
+        row.parts = [HtmlStreamlit(self._root, f"<div class='column' style='flex: {width}'>", "</div>")
+                     for width in widths]
+        self._add(row)
+        return row.parts
+
+    def expander(self, label, expanded=False, **kwargs):
+        opening = f"<details{' open' if expanded else ''}><summary>{html.escape(label)}</summary>"
+        container = HtmlStreamlit(self._root, opening, "</details>")
+        self._add(container)
+        return container
+
+    # Elements
+    def plotly_chart(self, figure, **kwargs):
+        self._add(figure.to_html(full_html=False, include_plotlyjs=False, config={"displaylogo": False}))
+
+    def dataframe(self, data, hide_index=False, **kwargs):
+        styler = data if isinstance(data, Styler) else pd.DataFrame(data).style
+        if hide_index:
+            styler = styler.hide(axis="index")
+        self._add(styler.to_html(table_attributes='class="table"'))
+
+    table = dataframe
+
+    def metric(self, label, value, delta=None, delta_color="normal", **kwargs):
+        parts = [f"<div class='metric-label'>{html.escape(str(label))}</div>",
+                 f"<div class='metric-value'>{html.escape(str(value))}</div>"]
+        if delta is not None and delta_color != "off":
+            rising = not str(delta).lstrip().startswith("-")
+            good = rising if delta_color == "normal" else not rising
+            parts.append(f"<div class='{'delta-up' if good else 'delta-down'}'>{html.escape(str(delta))}</div>")
+        self._add(f"<div class='metric'>{''.join(parts)}</div>")
+
+    def markdown(self, body, unsafe_allow_html=False, **kwargs):
+        # Raw HTML from the sections is their own styling and card markup
+        self._add(body if unsafe_allow_html and body.lstrip().startswith("<") else markdown_html(body))
+
+    write = markdown
+
+    def title(self, body, **kwargs):
+        self._add(f"<h1>{html.escape(body)}</h1>")
+
+    def header(self, body, **kwargs):
+        self._add(f"<h2>{html.escape(body)}</h2>")
+
+    def subheader(self, body, **kwargs):
+        self._add(f"<h3>{html.escape(body)}</h3>")
+
+    def caption(self, body, **kwargs):
+        self._add(f"<div class='caption'>{markdown_html(body)}</div>")
+
+    def text(self, body, **kwargs):
+        self._add(f"<div class='text'>{html.escape(str(body))}</div>")
+
+    def _note(self, kind, body):
+        self._add(f"<div class='note {kind}'>{markdown_html(body)}</div>")
+
+    def info(self, body, **kwargs):
+        self._note("info", body)
+
+    def success(self, body, **kwargs):
+        self._note("success", body)
+
+    def warning(self, body, **kwargs):
+        self._note("warning", body)
+
+    def error(self, body, **kwargs):
+        self._note("error", body)
+
+
+_worker = {}
+
+
+def _start_worker(source, start, end, dates):
+    pd.set_option("styler.format.precision", TABLE_PRECISION)
+    # Cache hits when the worker was forked from a parent that loaded them
+    _worker["shards"] = shards_for(load_data(source, start, end), engine=disk_engine(source=source, dates=dates))
+    _worker["source"] = source
+    _worker["dates"] = dates
+    alert_monitor().wait()
+
+
+def _render_section(location, name, time_period, theme):
+    """HTML of section `name` for `location`, and the error it raised if any."""
+    shards = _worker["shards"]
+    dataset = shards.frame(location)
+    engine = query_engine(dataset, location, None if location == ALL_LOCATIONS else location,
+                          source=_worker["source"], dates=_worker["dates"])
+    ctx = SectionContext(data=dataset, dataset=dataset, cube=shards.cube(location), shards=shards,
+                         location=location, time_period=time_period, theme=theme, engine=engine)
+    st = HtmlStreamlit()
+    failure = None
+    try:
+        render(name, st, ctx)
+    except Exception as exc:  # one broken section should not cost the rest of the report
+        failure = f"{type(exc).__name__}: {exc}"
+        st.error(f"This section could not be rendered: {failure}")
+    return st.html(), failure
+
+
+def page(title, sections, generated, theme="Light Mode"):
+    """A report page of `sections` ({name: section HTML}) that loads the shared plotly.js."""
+    nav = "".join(f"<a href='#{slug(name)}'>{html.escape(name)}</a>" for name in sections)
+    body = "\n".join(f"<section id='{slug(name)}'>\n{content}\n</section>" for name, content in sections.items())
+    return PAGE.format(title=html.escape(title), script=PLOTLY_JS, css=REPORT_CSS + SECTION_CSS,
+                       body_class="dark" if theme == "Dark Mode" else "", generated=html.escape(generated),
+                       nav=nav, body=body)
+
+
+def _write(path, text):
+    with open(path, "w", encoding="utf-8") as handle:
+        handle.write(text)
+
+
+def _check(kind, names, known):
+    unknown = [name for name in names if name not in known]
+    if unknown:
+        raise ValueError(f"Unknown {kind} {unknown[0]!r}; expected one of {', '.join(known)}")
+
+
+def build_reports(out, source=None, locations=None, sections=None, start=None, end=None,
+                  time_period="Daily", theme="Light Mode", workers=None):
+    """Write a report page per location into `out`, rendering sections across a process pool.
+
+    `locations` defaults to every location in the data (ALL_LOCATIONS is
+    accepted too) and `sections` to every registered section; `start` and
+    `end` limit the data as the dashboard's date range does. Returns the
+    page path per location and the (location, section, error) of every
+    section that failed.
+    """
+    sections = list(sections or SECTIONS)
+    _check("section", sections, list(SECTIONS))
+    data = load_data(source, start, end)
+    if data.empty:
+        raise ValueError(f"No orders between {start} and {end}")
+    dates = None
+    if start is not None or end is not None:
+        dates = (start or data["Date"].iloc[0].normalize(), end or data["Date"].iloc[-1].normalize())
+    shards = shards_for(data, engine=disk_engine(source=source, dates=dates))
+    locations = list(locations or shards.locations)
+    _check("location", locations, [ALL_LOCATIONS] + shards.locations)
+
+    os.makedirs(out, exist_ok=True)
+    _write(os.path.join(out, PLOTLY_JS), get_plotlyjs())
+
+    generated = datetime.now(timezone.utc).strftime("Generated %Y-%m-%d %H:%M UTC")
+    if dates is not None:
+        generated += f" for {pd.Timestamp(dates[0]):%Y-%m-%d} to {pd.Timestamp(dates[1]):%Y-%m-%d}"
+    tasks = [(location, name) for location in locations for name in sections]
+    results = {location: {} for location in locations}
+    pages, failures = {}, []
+
+    def finish(location, name, result):
+        content, failure = result
+        results[location][name] = content
+        if failure is not None:
+            failures.append((location, name, failure))
+        if len(results[location]) == len(sections):
+            done = {section: results[location].pop(section) for section in sections}
+            pages[location] = os.path.join(out, f"{slug(location)}.html")
+            _write(pages[location], page(f"{location} Report", done, generated, theme))
+
+    workers = min(workers or os.cpu_count() or 1, len(tasks))
+    initargs = (source, start, end, dates)
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_start_worker, initargs=initargs) as pool:
+            futures = {pool.submit(_render_section, location, name, time_period, theme): (location, name)
+                       for location, name in tasks}
+            for future in as_completed(futures):
+                finish(*futures[future], future.result())
+    else:
+        _start_worker(*initargs)
+        for location, name in tasks:
+            finish(location, name, _render_section(location, name, time_period, theme))
+
+    links = "".join(f"<li><a href='{os.path.basename(path)}'>{html.escape(location)}</a></li>"
+                    for location, path in pages.items())
+    problems = "".join(f"<li>{html.escape(location)}: {html.escape(name)} ({html.escape(failure)})</li>"
+                       for location, name, failure in failures)
+    index = f"<h2>Locations</h2><ul>{links}</ul>" + (f"<h2>Failed Sections</h2><ul>{problems}</ul>" if problems else "")
+    _write(os.path.join(out, INDEX), PAGE.format(title="Stelle Reports", script=PLOTLY_JS, css=REPORT_CSS + SECTION_CSS,
+                                                 body_class="", generated=html.escape(generated), nav="", body=index))
+    return pages, failures
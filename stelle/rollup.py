@@ -0,0 +1,189 @@
+"""Materialised Daily/Weekly/Monthly rollups of the order data.
+
+The cube holds additive measures keyed by (period, Top Item, Service Type) for
+each grain. Raw rows are aggregated once into the daily table; the weekly and
+monthly tables are rolled up from the daily cells, and new days are folded in
+by adding their partial aggregates to the existing cells. Chart views are sums
+over cube cells and are memoised until the next append. Because every measure
+is additive, cubes built over disjoint rows (e.g. one per location) merge into
+the cube of their union by summing cells.
+
+The raw rows are aggregated by a stelle.query Query, so `from_engine` can
+build the daily table with any engine, e.g. DuckDB over Parquet files that
+are never loaded into pandas; `split_from_engine` builds one cube per
+location from a single pass.
+"""
+import threading
+import weakref
+from collections import OrderedDict
+
+import pandas as pd
+
+from stelle import perf
+from stelle.data import DATASETS_KEPT, dataset_key
+from stelle.filters import In
+from stelle.query import ROWS, Agg, PandasEngine, Query, period_start
+
+GRAINS = {"Daily": "D", "Weekly": "W", "Monthly": "M"}
+DIMENSIONS = ["Top Item", "Service Type"]
+MEASURES = ["Sales", "Customers", "Service Time", "Staff Present"]
+
+
+def rollup_query(grain, columns, where=None, keys=()):
+    """Sums of MEASURES present in `columns` per `keys`, period and DIMENSIONS.
+
+    Raw rows are counted into "Rows"; tables that already have a "Rows"
+    column (rolled-up cells) sum it instead.
+    """
+    measures = tuple(Agg(m) for m in MEASURES if m in columns) + (Agg("Rows") if "Rows" in columns else ROWS,)
+    return Query(measures, by=(*keys, "Date", *DIMENSIONS), where=where, grain=grain)
+
+
+def _rollup(engine, grain, where=None):
+    table = engine.execute(rollup_query(grain, engine.columns, where))
+    return table.set_index(["Date", *DIMENSIONS])
+
+
+class RollupCube:
+    """Additive rollups of the order data at every grain in GRAINS."""
+
+    def __init__(self, frame=None):
+        self.tables = {}
+        self.rows = 0
+        self.last_date = None
+        self._views = {}
+        self._lock = threading.Lock()
+        if frame is not None:
+            self.append(frame)
+
+    def append(self, frame):
+        """Fold new order rows into every grain without touching history."""
+        if frame.empty:
+            return self
+        return self._fold(_rollup(PandasEngine(frame), "Daily"), frame["Date"].max())
+
+    def _fold(self, daily, newest):
+        partials = {"Daily": daily}
+        flat = PandasEngine(daily.reset_index())
+        for grain in GRAINS:
+            if grain != "Daily":
+                partials[grain] = _rollup(flat, grain)
+        with self._lock:
+            for grain, partial in partials.items():
+                table = self.tables.get(grain)
+                self.tables[grain] = partial if table is None else table.add(partial, fill_value=0)
+            self.rows += int(daily["Rows"].sum())
+            self.last_date = newest if self.last_date is None else max(self.last_date, newest)
+            self._views.clear()
+        return self
+
+    @classmethod
+    def from_engine(cls, engine, where=None):
+        """Build a cube from the rows matching `where`, aggregated by a stelle.query engine."""
+        daily = _rollup(engine, "Daily", where)
+        newest = engine.execute(Query((Agg("Date", "max"),), where=where))["Date"].iloc[0]
+        return cls()._fold(daily, pd.Timestamp(newest)) if len(daily) else cls()
+
+    @classmethod
+    def split_from_engine(cls, engine, column, values):
+        """One cube per value of `column` in `values`, all aggregated by a single pass of `engine`."""
+        where = In(column, tuple(values))
+        daily = engine.execute(rollup_query("Daily", engine.columns, where, keys=(column,)))
+        newest = engine.execute(Query((Agg("Date", "max"),), by=(column,), where=where)).set_index(column)["Date"]
+        keys = daily[column].astype(str)
+        cubes = {}
+        for value in values:
+            rows = daily[(keys == str(value)).to_numpy()].drop(columns=column).set_index(["Date", *DIMENSIONS])
+            cubes[value] = cls()._fold(rows, pd.Timestamp(newest[value])) if len(rows) else cls()
+        return cubes
+
+    @classmethod
+    def from_tables(cls, tables, rows, last_date):
+        """Rebuild a cube from its per-grain tables, e.g. loaded from a snapshot."""
+        cube = cls()
+        cube.tables, cube.rows, cube.last_date = dict(tables), rows, last_date
+        return cube
+
+    @classmethod
+    def merge(cls, cubes):
+        """Combine cubes built over disjoint rows into one cube of all their rows."""
+        cubes = [cube for cube in cubes if cube.rows]
+        merged = cls()
+        for grain in GRAINS:
+            tables = [cube.tables[grain] for cube in cubes]
+            if tables:
+                combined = pd.concat(tables)
+                merged.tables[grain] = combined.groupby(level=combined.index.names, observed=True, sort=False).sum()
+        merged.rows = sum(cube.rows for cube in cubes)
+        merged.last_date = max((cube.last_date for cube in cubes), default=None)
+        return merged
+
+    def __getstate__(self):
+        # Locks and memoised views stay behind when a cube crosses processes
+        return {"tables": self.tables, "rows": self.rows, "last_date": self.last_date}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._views = {}
+        self._lock = threading.Lock()
+
+    @perf.timed("cube.view")
+    def view(self, grain, by=(), top_item=None):
+        """Measures per period at `grain`, optionally split by dimensions in `by`."""
+        return self._memo(("view", grain, tuple(by), top_item),
+                          lambda: self._aggregate(self.tables[grain], ["Date", *by], top_item))
+
+    @perf.timed("cube.totals")
+    def totals(self, by, top_item=None):
+        """Measures over the whole history, grouped by the dimensions in `by`."""
+        # The monthly table has the fewest cells and sums to the same totals
+        return self._memo(("totals", tuple(by), top_item),
+                          lambda: self._aggregate(self.tables["Monthly"], list(by), top_item))
+
+    def _memo(self, key, compute):
+        with self._lock:
+            result = self._views.get(key)
+        if result is None:
+            result = compute()
+            with self._lock:
+                self._views[key] = result
+        return result
+
+    @staticmethod
+    def _aggregate(table, levels, top_item):
+        if top_item is not None:
+            table = table[table.index.get_level_values("Top Item") == top_item]
+        return table.groupby(level=levels, observed=True).sum().reset_index()
+
+
+_cubes = OrderedDict()
+_cubes_lock = threading.Lock()
+
+
+def cube_for(frame, name="default"):
+    """Return the cube for `frame`, extending the previous cube when possible.
+
+    A frame that is the previous one plus newer days (the usual shape of a
+    refreshed export) only has its new rows folded in; anything else triggers
+    a rebuild. Frames must be sorted by Date, as `stelle.data` returns them.
+    Cubes are kept per name and per source and date range (see
+    stelle.data.dataset_key).
+    """
+    key = dataset_key(frame, name)
+    with _cubes_lock:
+        ref, cube = _cubes.get(key, (None, None))
+        if ref is not None and ref() is frame:
+            return cube
+        if cube is not None and cube.last_date is not None:
+            known = int(frame["Date"].searchsorted(cube.last_date, side="right"))
+            if known == cube.rows:
+                cube.append(frame.iloc[known:])
+            else:
+                cube = None
+        if cube is None:
+            cube = RollupCube(frame)
+        _cubes[key] = (weakref.ref(frame), cube)
+        _cubes.move_to_end(key)
+        while len(_cubes) > DATASETS_KEPT:
+            _cubes.popitem(last=False)
+        return cube
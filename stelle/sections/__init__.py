@@ -0,0 +1,76 @@
+"""Registry of dashboard sections.
+
+Each section lives in its own module exposing `render(st, ctx)`. Modules are
+imported the first time their section is selected, so a cold start only pays
+for the libraries the visible page needs.
+"""
+from dataclasses import dataclass
+
+from stelle import perf
+from stelle.figures import cached_figure
+from stelle.filters import Eq
+from stelle.query import PandasEngine
+from stelle.importtime import timed_import
+from stelle.shards import ALL_LOCATIONS
+
+SECTIONS = {
+    "Overview": "stelle.sections.overview",
+    "Demand Prediction": "stelle.sections.demand",
+    "Customer Insights": "stelle.sections.customers",
+    "Menu Performance": "stelle.sections.menu",
+    "Inventory Management": "stelle.sections.inventory",
+    "Staff Optimization": "stelle.sections.staff",
+    "Customer Feedback": "stelle.sections.feedback",
+    "Location Comparison": "stelle.sections.locations",
+}
+
+
+@dataclass
+class SectionContext:
+    """Dataset and sidebar selections shared by every section.
+
+    `data` has the sidebar filters applied; `dataset` is the unfiltered frame
+    of the selected location that the cube and other per-dataset caches are
+    built from, and `location` names those caches. `shards` holds every
+    location's frame and cube. `engine` runs stelle.query Queries over the
+    selected location's rows, in memory or on the files behind them.
+    """
+    data: object
+    dataset: object
+    cube: object
+    shards: object = None
+    location: str = ALL_LOCATIONS
+    time_period: str = "Daily"
+    menu_item_filter: str = "All"
+    theme: str = "Light Mode"
+    engine: object = None
+
+    @property
+    def cube_item(self):
+        return None if self.menu_item_filter == "All" else self.menu_item_filter
+
+    @property
+    def item_filter(self):
+        """The menu item filter as a stelle.filters expression, or None for all items."""
+        return None if self.menu_item_filter == "All" else Eq("Top Item", self.menu_item_filter)
+
+    def query(self, query):
+        """Run a stelle.query Query over the selected location's rows."""
+        engine = self.engine or PandasEngine(self.dataset, self.location)
+        return engine.execute(query)
+
+    def figure(self, build, data, **kwargs):
+        """`build(data, **kwargs)` from the figure cache, themed for this session."""
+        return cached_figure(build, data, theme=self.theme, **kwargs)
+
+    @property
+    def locations(self):
+        """Locations in view: every shard, or just the selected one."""
+        return self.shards.locations if self.location == ALL_LOCATIONS else [self.location]
+
+
+def render(name, st, ctx):
+    """Import the section registered as `name` on first use and render it."""
+    module = timed_import(SECTIONS[name])
+    with perf.section(name):
+        module.render(perf.instrument(st), ctx)
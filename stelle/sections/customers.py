@@ -0,0 +1,78 @@
+"""The "Customer Insights" dashboard section."""
+import plotly.express as px
+
+from stelle.cohorts import CUSTOMER_COLUMN, cohorts_for
+from stelle.sentiment import scored_reviews
+from stelle.traffic import traffic_for
+
+# Most recent cohorts, and periods since their first order, in the heatmap
+COHORTS_SHOWN = 24
+
+
+def render(st, ctx):
+    # Customer Traffic by Hour
+    st.markdown("<div class='card'>", unsafe_allow_html=True)
+    st.markdown("### Customer Traffic by Hour")
+    traffic = traffic_for(ctx.dataset, ctx.location)
+    hourly_traffic = traffic.by_hour(top_item=ctx.cube_item)
+    fig_customer_traffic = ctx.figure(px.bar, hourly_traffic, x="Hour", y="Customers", title="Customer Traffic by Hour", labels={"Customers": "Customer Count", "Hour": "Hour of Day"})
+    st.plotly_chart(fig_customer_traffic, use_container_width=True)
+    fig_weekly_traffic = ctx.figure(px.imshow, traffic.by_weekday(top_item=ctx.cube_item), title="Customer Traffic by Weekday and Hour", labels={"x": "Hour of Day", "y": "Weekday", "color": "Customers"}, aspect="auto", color_continuous_scale="Blues")
+    st.plotly_chart(fig_weekly_traffic, use_container_width=True)
+    st.markdown("</div>", unsafe_allow_html=True)
+
+    # Most Ordered Items
+    st.markdown("<div class='card'>", unsafe_allow_html=True)
+    st.markdown("### Most Ordered Items")
+    top_items = ctx.cube.totals(["Top Item"], top_item=ctx.cube_item).set_index("Top Item")["Rows"].nlargest(5)
+    fig_top_items = ctx.figure(px.bar, top_items, x=top_items.index, y=top_items.values, title="Top 5 Most Ordered Items", labels={"x": "Menu Item", "y": "Order Count"})
+    st.plotly_chart(fig_top_items, use_container_width=True)
+    st.markdown("</div>", unsafe_allow_html=True)
+
+    # Cohorts are weekly for the daily and weekly views, monthly otherwise
+    cohorts = None
+    if CUSTOMER_COLUMN in ctx.dataset:
+        grain = "Monthly" if ctx.time_period == "Monthly" else "Weekly"
+        cohorts = cohorts_for(ctx.dataset, ctx.location, grain)
+        # Retention of the newest complete period: customers of the period
+        # before who ordered again
+        rates = cohorts.rates().iloc[:cohorts.complete_periods()].dropna(subset=["Retention"])
+    busiest_day = traffic.by_weekday(top_item=ctx.cube_item).sum(axis=1).idxmax()
+
+    # Insights and Recommendations
+    st.markdown("<div class='card'>", unsafe_allow_html=True)
+    st.markdown("### Insights and Recommendations")
+    if len(top_items):
+        st.text(f"- Most ordered item: {top_items.index[0]}")
+    if cohorts is not None and len(rates):
+        st.text(f"- Customer retention rate: {rates['Retention'].iloc[-1]:.0%}")
+    st.text(f"- Busiest day: {busiest_day}")
+    st.markdown("</div>", unsafe_allow_html=True)
+
+    # Customer Retention Rate
+    st.markdown("<div class='card'>", unsafe_allow_html=True)
+    st.markdown("### Customer Retention Rate")
+    if cohorts is None:
+        st.info(f"Retention needs a {CUSTOMER_COLUMN} column in the order data, as written by `python -m stelle generate`.")
+    elif not len(rates):
+        st.info("Not enough complete periods for a retention rate yet.")
+    else:
+        latest = rates.iloc[-1]
+        delta = f"{(latest['Retention'] - rates['Retention'].iloc[-2]) * 100:+.1f} pts" if len(rates) > 1 else None
+        period = f"{latest.name:%b %Y}" if grain == "Monthly" else f"week of {latest.name:%Y-%m-%d}"
+        st.metric(label=f"Customer Retention Rate ({period})", value=f"{latest['Retention']:.0%}", delta=delta, delta_color="normal")
+        st.caption(f"{int(latest['Returning']):,} of {int(latest['Previous']):,} customers from the previous "
+                   f"{grain.lower()[:-2]} ordered again; {cohorts.customers:,} customers in view.")
+        retention = cohorts.retention().iloc[-COHORTS_SHOWN:, :COHORTS_SHOWN]
+        retention.index = retention.index.strftime("%Y-%m" if grain == "Monthly" else "%Y-%m-%d")
+        fig_cohorts = ctx.figure(px.imshow, retention, title=f"{grain} Cohort Retention", labels={"x": "Periods Since First Order", "y": "Cohort", "color": "Retained"}, aspect="auto", color_continuous_scale="Blues", text_auto=".0%", layout=dict(coloraxis_colorbar_tickformat=".0%"))
+        st.plotly_chart(fig_cohorts, use_container_width=True)
+    st.markdown("</div>", unsafe_allow_html=True)
+
+    # Customer Feedback Sentiment Analysis
+    st.markdown("<div class='card'>", unsafe_allow_html=True)
+    st.markdown("### Customer Feedback Sentiment Analysis")
+    sentiment_data = scored_reviews().counts(ctx.location)
+    fig_sentiment = ctx.figure(px.pie, sentiment_data, names="Sentiment", values="Count", title="Customer Sentiment Distribution", hole=0.4)
+    st.plotly_chart(fig_sentiment, use_container_width=True)
+    st.markdown("</div>", unsafe_allow_html=True)
@@ -0,0 +1,60 @@
+"""The "Demand Prediction" dashboard section."""
+from datetime import datetime
+
+import pandas as pd
+import plotly.express as px
+
+from stelle.downsample import FULL_WIDTH, line_chart
+from stelle.forecast import ForecastEngine, forecaster_for
+from stelle.tables import paged_table
+
+
+def render(st, ctx):
+    st.header("Demand Prediction Dashboard")
+    if ctx.cube.last_date is None:
+        st.info("No sales in the selected range to forecast from.")
+        return
+    # A narrower zoom window is downsampled afresh from the points inside it
+    trend = ctx.cube.view(ctx.time_period, top_item=ctx.cube_item)
+    first, last = trend["Date"].min().date(), trend["Date"].max().date()
+    zoom = st.slider("Zoom", min_value=first, max_value=last, value=(first, last), key="demand-zoom") if first < last else (first, last)
+    window = None if tuple(zoom) == (first, last) else (pd.Timestamp(zoom[0]), pd.Timestamp(zoom[1]))
+    fig = ctx.figure(line_chart, trend, x="Date", y="Sales", width=FULL_WIDTH, window=window, title=f"{ctx.time_period} Sales Over Time")
+    st.plotly_chart(fig)
+
+    # Models are fitted once per dataset and extended as new days arrive
+    engine = forecaster_for(ctx.cube, ctx.location, ctx.dataset)
+    first_day = (engine.last_day + pd.Timedelta(days=1)).date()
+
+    # Input for selecting prediction date
+    st.markdown("<div class='card'>", unsafe_allow_html=True)
+    st.markdown("### Select Prediction Date")
+    prediction_date = st.date_input("Choose a date for prediction", value=max(datetime.today().date(), first_day), min_value=first_day)
+    model = st.selectbox("Forecast model", ForecastEngine.MODELS)
+    st.markdown("</div>", unsafe_allow_html=True)
+
+    # Generate predictions based on the selected date
+    st.markdown("<div class='card'>", unsafe_allow_html=True)
+    st.markdown("### Predicted Sales for Next 7 Days")
+
+    # Forecasts are served from the engine's cache for repeated dates
+    future_df = engine.forecast(model, prediction_date, periods=7, top_item=ctx.cube_item)
+
+    # Display the predictions in a table
+    paged_table(st, future_df, "forecast")
+    st.markdown("</div>", unsafe_allow_html=True)
+
+    # Visualization of predicted sales
+    st.markdown("<div class='card'>", unsafe_allow_html=True)
+    st.markdown("### Predicted Sales Line Chart")
+    fig_predicted_sales = ctx.figure(px.line, future_df, x="Date", y="Predicted Sales", title="Predicted Sales Over Next 7 Days", labels={"Predicted Sales": "Sales ($)", "Date": "Date"})
+    st.plotly_chart(fig_predicted_sales, use_container_width=True)
+    st.markdown("</div>", unsafe_allow_html=True)
+
+    # Additional Insights
+    st.markdown("<div class='card'>", unsafe_allow_html=True)
+    st.markdown("### Insights and Recommendations")
+    st.text("- Consider increasing staff during predicted peak sales days.")
+    st.text("- Monitor inventory levels to meet expected demand.")
+    st.text("- Analyze historical data for similar patterns.")
+    st.markdown("</div>", unsafe_allow_html=True)
@@ -0,0 +1,48 @@
+"""The "Customer Feedback" dashboard section."""
+import plotly.express as px
+
+from stelle.downsample import line_chart
+from stelle.sentiment import scored_reviews
+from stelle.tables import paged_table
+
+
+def render(st, ctx):
+    st.header("Customer Feedback Analysis Dashboard")
+
+    # Sentiment Analysis
+    st.markdown("<div class='card'>", unsafe_allow_html=True)
+    st.markdown("### Customer Sentiment Analysis")
+    reviews = scored_reviews()
+    sentiment_data = reviews.counts(ctx.location)
+    fig_sentiment = ctx.figure(px.pie, sentiment_data, names="Sentiment", values="Count", title="Customer Sentiment Distribution", hole=0.4)
+    st.plotly_chart(fig_sentiment, use_container_width=True)
+    st.markdown("</div>", unsafe_allow_html=True)
+
+    # Common Feedback
+    st.markdown("<div class='card'>", unsafe_allow_html=True)
+    st.markdown("### Most Common Feedback")
+    common_feedback = reviews.top_phrases(5, ctx.location)
+    paged_table(st, common_feedback, "common-feedback")
+    st.markdown("</div>", unsafe_allow_html=True)
+
+    # Feedback Trends Over Time
+    st.markdown("<div class='card'>", unsafe_allow_html=True)
+    st.markdown("### Feedback Trends Over Time")
+    feedback_trends = reviews.trends("W", ctx.location)
+    fig_feedback_trends = ctx.figure(line_chart, feedback_trends, x="Date", y=["Positive", "Neutral", "Negative"], title="Customer Feedback Trends Over Time", labels={"value": "Number of Feedbacks", "Date": "Date"})
+    st.plotly_chart(fig_feedback_trends, use_container_width=True)
+    st.markdown("</div>", unsafe_allow_html=True)
+
+    # AI Insights and Recommendations
+    st.markdown("<div class='card ai-bot'>", unsafe_allow_html=True)
+    st.markdown("### AI Insights and Recommendations")
+
+    # Simulated AI-generated insights
+    st.markdown("🤖 **AI Assistant:** Based on the customer feedback data, here are some insights:")
+
+    # Example insights based on data
+    st.text("- It seems that customers appreciate the service but have concerns about wait times.")
+    st.text("- The most common positive feedback is about the pizza, indicating it is a popular item.")
+    st.text("- Consider addressing the wait time issue to improve overall customer satisfaction.")
+    st.text("- Regularly monitor feedback trends to identify any emerging issues.")
+    st.markdown("</div>", unsafe_allow_html=True)
@@ -0,0 +1,66 @@
+"""The "Inventory Management" dashboard section."""
+import plotly.express as px
+
+from stelle.downsample import line_chart
+from stelle.inventory import inventory_engine
+from stelle.tables import paged_table
+
+STOCKOUT_WARNING_DAYS = 7
+
+
+def render(st, ctx):
+    st.header("Inventory Management Dashboard")
+
+    # Critical Stock Alerts
+    st.markdown("<div class='card'>", unsafe_allow_html=True)
+    st.markdown("### Critical Stock Alerts")
+    # Usage, projections and stock status are derived once per dataset version
+    engine = inventory_engine()
+    inventory_data = engine.status(ctx.cube, ctx.location)
+    low_stock_alerts = inventory_data.loc[inventory_data["Below Threshold"], ["Ingredient", "Stock Level", "Threshold", "Days Until Stockout"]]
+    if not low_stock_alerts.empty:
+        st.warning("Low inventory items detected.")
+        paged_table(st, low_stock_alerts, "low-stock")
+    else:
+        st.success("All inventory levels are sufficient.")
+    st.markdown("</div>", unsafe_allow_html=True)
+
+    # Inventory Levels Visualization
+    st.markdown("<div class='card'>", unsafe_allow_html=True)
+    st.markdown("### Inventory Levels Visualization")
+    fig_inventory_levels = ctx.figure(px.bar, inventory_data, x="Ingredient", y="Stock Level", title="Current Inventory Levels", labels={"Stock Level": "Quantity", "Ingredient": "Ingredient"})
+    st.plotly_chart(fig_inventory_levels, use_container_width=True)
+    st.markdown("</div>", unsafe_allow_html=True)
+
+    # Historical Ingredient Usage
+    st.markdown("<div class='card'>", unsafe_allow_html=True)
+    st.markdown("### Historical Ingredient Usage")
+    historical_data = engine.usage(ctx.cube, ctx.time_period).reset_index()
+    fig_historical_trends = ctx.figure(line_chart, historical_data, x="Date", y=engine.bom.ingredients, title=f"{ctx.time_period} Ingredient Usage", labels={"value": "Usage (kg)", "Date": "Date"})
+    st.plotly_chart(fig_historical_trends, use_container_width=True)
+    with st.expander("Ingredient Usage Ledger"):
+        paged_table(st, engine.ledger(ctx.cube, ctx.time_period), "usage-ledger", formats={"Usage": "{:.2f} kg"})
+    st.markdown("</div>", unsafe_allow_html=True)
+
+    # Projected Stock Levels
+    st.markdown("<div class='card'>", unsafe_allow_html=True)
+    st.markdown("### Projected Stock Levels")
+    projected_stock = engine.projection(ctx.cube, ctx.location)
+    fig_projected_stock = ctx.figure(line_chart, projected_stock, x="Date", y=engine.bom.ingredients, title="Projected Stock at Current Usage", labels={"value": "Stock Level (kg)", "Date": "Date"})
+    st.plotly_chart(fig_projected_stock, use_container_width=True)
+    st.markdown("</div>", unsafe_allow_html=True)
+
+    # Insights and Recommendations
+    st.markdown("<div class='card'>", unsafe_allow_html=True)
+    st.markdown("### Insights and Recommendations")
+    st.text("- Monitor stock levels regularly to avoid shortages.")
+    st.text("- Consider automating inventory alerts for low stock items.")
+    st.text("- Analyze usage trends to optimize ordering schedules.")
+    st.markdown("</div>", unsafe_allow_html=True)
+
+    # Alert Section
+    st.markdown("### Alerts")
+    stockout_alerts = inventory_data.loc[inventory_data["Days Until Stockout"] < STOCKOUT_WARNING_DAYS, ["Ingredient", "Stock Level", "Daily Usage", "Days Until Stockout"]]
+    if not stockout_alerts.empty:
+        st.warning(f"Ingredients projected to run out within {STOCKOUT_WARNING_DAYS} days.")
+        paged_table(st, stockout_alerts, "stockout")
@@ -0,0 +1,39 @@
+"""The "Location Comparison" dashboard section."""
+import plotly.express as px
+
+from stelle.downsample import FULL_WIDTH, line_chart
+from stelle.shards import ALL_LOCATIONS
+from stelle.tables import paged_table
+
+
+def render(st, ctx):
+    st.header("Location Comparison Dashboard")
+    shards = ctx.shards
+    comparison = shards.comparison()
+    if ctx.location != ALL_LOCATIONS:
+        st.caption(f"Selected location: {ctx.location}")
+
+    # Key figures per location
+    st.markdown("### Location Summary")
+    shares = [column for column in comparison if column.endswith(" Share")]
+    paged_table(st, comparison, "location-summary", formats={
+        "Revenue": "${:,.0f}",
+        "Orders": "{:,.0f}",
+        "Customers": "{:,.0f}",
+        "Avg Service Time": "{:.1f} min",
+        "Avg Staff Present": "{:.1f}",
+        **{column: "{:.0%}" for column in shares},
+    })
+
+    # Revenue trend per location
+    trend = shards.trend(ctx.time_period)
+    fig_trend = ctx.figure(line_chart, trend, x="Date", y=shards.locations, width=FULL_WIDTH, title=f"{ctx.time_period} Revenue by Location", labels={"value": "Revenue ($)", "variable": "Location"})
+    st.plotly_chart(fig_trend, use_container_width=True)
+
+    col1, col2 = st.columns(2)
+    with col1:
+        fig_mix = ctx.figure(px.bar, comparison, x="Location", y=shares, title="Service Type Mix", labels={"value": "Share of Orders", "variable": "Service Type"}, layout=dict(yaxis_tickformat=".0%"))
+        st.plotly_chart(fig_mix, use_container_width=True)
+    with col2:
+        fig_staff = ctx.figure(px.bar, comparison, x="Location", y="Avg Staff Present", color="Top Item", title="Average Staff Present and Top Item")
+        st.plotly_chart(fig_staff, use_container_width=True)
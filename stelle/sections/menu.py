@@ -0,0 +1,90 @@
+"""The "Menu Performance" dashboard section."""
+import plotly.express as px
+
+from stelle.data import SERVICE_TYPES
+from stelle.menu import CLASSES, menu_engine, thresholds
+from stelle.tables import Gradient, paged_table
+
+CLASS_COLORS = {"Star": "#2ca02c", "Plowhorse": "#1f77b4", "Puzzle": "#ff7f0e", "Dog": "#d62728"}
+# Bar charts show the leading items; the table below lists every item
+CHART_ITEMS = 25
+ADVICE = {
+    "Star": "Keep {items} prominent and consistent; they sell well and earn above-average margins.",
+    "Plowhorse": "Reprice or re-cost {items}; they sell well but earn below-average margins.",
+    "Puzzle": "Promote or reposition {items}; their margins are good but few are sold.",
+    "Dog": "Consider replacing {items}; they sell little at below-average margins.",
+}
+
+
+def render(st, ctx):
+    st.header("Menu Performance Dashboard")
+
+    # Menu engineering over the selected location and dates, from the cube
+    engine = menu_engine()
+    service = st.selectbox("Service Type", ["All"] + SERVICE_TYPES, key="menu-service-type")
+    service_type = None if service == "All" else service
+    matrix = engine.matrix(ctx.cube, service_type)
+    if matrix.empty:
+        st.info("No menu items sold for this selection.")
+        return
+
+    # Menu Engineering Matrix
+    st.markdown("<div class='card'>", unsafe_allow_html=True)
+    st.markdown("### Menu Engineering Matrix")
+    popularity, margin = thresholds(matrix)
+    fig_matrix = ctx.figure(px.scatter, matrix, x="Mix", y="Margin", color="Class", size="Portions", hover_name="Top Item", title="Popularity vs. Contribution Margin", labels={"Mix": "Menu Mix", "Margin": "Contribution Margin ($)"}, category_orders={"Class": CLASSES}, color_discrete_map=CLASS_COLORS, layout=dict(
+        xaxis_tickformat=".0%",
+        shapes=[
+            dict(type="line", xref="x", yref="paper", x0=popularity, x1=popularity, y0=0, y1=1, line=dict(dash="dash", color="grey")),
+            dict(type="line", xref="paper", yref="y", x0=0, x1=1, y0=margin, y1=margin, line=dict(dash="dash", color="grey")),
+        ]))
+    st.plotly_chart(fig_matrix, use_container_width=True)
+    if ctx.cube_item is not None:
+        selected = matrix[matrix["Top Item"] == ctx.cube_item]
+        if not selected.empty:
+            row = selected.iloc[0]
+            st.caption(f"{ctx.cube_item} is a {row['Class']}: {row['Mix']:.1%} of portions at ${row['Margin']:,.2f} per portion.")
+    st.markdown("</div>", unsafe_allow_html=True)
+
+    # Menu Profitability
+    st.markdown("<div class='card'>", unsafe_allow_html=True)
+    st.markdown("### Menu Profitability")
+    fig_menu_profitability = ctx.figure(px.bar, matrix.head(CHART_ITEMS), x="Top Item", y="Contribution", color="Class", title="Contribution by Menu Item", labels={"Contribution": "Contribution ($)", "Top Item": "Menu Item"}, category_orders={"Class": CLASSES}, color_discrete_map=CLASS_COLORS)
+    st.plotly_chart(fig_menu_profitability, use_container_width=True)
+    st.markdown("</div>", unsafe_allow_html=True)
+
+    # Sales Frequency
+    st.markdown("<div class='card'>", unsafe_allow_html=True)
+    st.markdown("### Sales Frequency")
+    frequent = matrix.nlargest(CHART_ITEMS, "Portions")
+    fig_sales_frequency = ctx.figure(px.bar, frequent, x="Top Item", y="Portions", color="Class", title="Portions Sold by Menu Item", labels={"Portions": "Portions Sold", "Top Item": "Menu Item"}, category_orders={"Class": CLASSES}, color_discrete_map=CLASS_COLORS)
+    st.plotly_chart(fig_sales_frequency, use_container_width=True)
+    if len(matrix) > CHART_ITEMS:
+        st.caption(f"Charts show the leading {CHART_ITEMS} of {len(matrix)} items; the table lists them all.")
+    st.markdown("</div>", unsafe_allow_html=True)
+
+    # Performance Comparison: how the quadrants shift from period to period
+    st.markdown("<div class='card'>", unsafe_allow_html=True)
+    st.markdown("### Performance Comparison")
+    periods = engine.periods(ctx.cube, ctx.time_period, service_type)
+    mix = periods.groupby(["Date", "Class"], observed=False).size().rename("Items").reset_index()
+    fig_performance_comparison = ctx.figure(px.bar, mix, x="Date", y="Items", color="Class", title=f"Menu Items per Quadrant, {ctx.time_period}", labels={"Items": "Menu Items", "Date": "Period"}, category_orders={"Class": CLASSES}, color_discrete_map=CLASS_COLORS)
+    st.plotly_chart(fig_performance_comparison, use_container_width=True)
+    paged_table(st, matrix, "menu-matrix", rules=[Gradient(("Contribution",), "Blues")], formats={
+        "Revenue": "${:,.0f}",
+        "Portions": "{:,.0f}",
+        "Food Cost": "${:,.0f}",
+        "Contribution": "${:,.0f}",
+        "Margin": "${:,.2f}",
+        "Mix": "{:.1%}",
+    })
+    st.markdown("</div>", unsafe_allow_html=True)
+
+    # Insights and Recommendations, from the quadrants
+    st.markdown("<div class='card'>", unsafe_allow_html=True)
+    st.markdown("### Insights and Recommendations")
+    for name in CLASSES:
+        items = matrix.loc[matrix["Class"] == name].nlargest(3, "Portions")["Top Item"]
+        if len(items):
+            st.text(f"- {ADVICE[name].format(items=', '.join(map(str, items)))}")
+    st.markdown("</div>", unsafe_allow_html=True)
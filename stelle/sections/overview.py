@@ -0,0 +1,179 @@
+"""The "Overview" dashboard section."""
+import os
+
+import pandas as pd
+import plotly.express as px
+
+from stelle.alerts import alert_monitor, period_label
+from stelle.downsample import HALF_WIDTH, line_chart
+from stelle.inventory import inventory_engine
+from stelle.live import feed_from_env
+from stelle.menu import menu_engine
+from stelle.query import Agg, Query
+from stelle.tables import Gradient, Highlight, paged_table
+from stelle.traffic import traffic_for
+
+LIVE_REFRESH_SECONDS = float(os.environ.get("STELLE_LIVE_REFRESH", "2"))
+
+
+def render(st, ctx):
+    st.header("Overview Dashboard")
+
+    # Top metrics; with a live POS feed configured the cards refresh on a
+    # timer as a fragment, without rerunning the rest of the page
+    feed = feed_from_env()
+    # Service time does not come from the feed, so the timer's reruns reuse it
+    service = ctx.query(Query((Agg("Service Time", "mean"),), where=ctx.item_filter))['Service Time']
+    avg_service_time = service.iloc[0] if len(service) else float("nan")
+    if feed is None:
+        _top_metrics(st, ctx, None, avg_service_time)
+    else:
+        st.fragment(run_every=LIVE_REFRESH_SECONDS)(_top_metrics)(st, ctx, feed, avg_service_time)
+
+    # Performance charts section - 2 columns
+    st.subheader("Performance Analytics")
+    chart_col1, chart_col2 = st.columns(2)
+
+    with chart_col1:
+        # Revenue trend at the selected grain, read from the rollup cube
+        fig_revenue = ctx.figure(
+            line_chart,
+            ctx.cube.view(ctx.time_period, top_item=ctx.cube_item),
+            x="Date",
+            y="Sales",
+            width=HALF_WIDTH,
+            title=f"{ctx.time_period} Revenue Trend",
+            labels={"Sales": "Revenue ($)", "Date": "Date"},
+            layout=dict(margin=dict(t=30))
+        )
+        st.plotly_chart(fig_revenue, use_container_width=True)
+
+    with chart_col2:
+        # Customer traffic, binned once per dataset and shared across sections
+        hourly_traffic = traffic_for(ctx.dataset, ctx.location).by_hour(top_item=ctx.cube_item)
+        fig_traffic = ctx.figure(
+            px.bar,
+            hourly_traffic,
+            x="Hour",
+            y="Customers",
+            title="Customer Traffic by Hour",
+            labels={"Customers": "Customer Count", "Hour": "Hour of Day"},
+            layout=dict(margin=dict(t=30))
+        )
+        st.plotly_chart(fig_traffic, use_container_width=True)
+
+    # Revenue breakdown and performance indicators - 2 columns
+    st.subheader("Business Insights")
+    insight_col1, insight_col2 = st.columns(2)
+
+    with insight_col1:
+        service_revenue = ctx.cube.totals(["Service Type"], top_item=ctx.cube_item)
+        fig_service = ctx.figure(
+            px.pie,
+            service_revenue,
+            names="Service Type",
+            values="Sales",
+            title="Revenue by Service Type",
+            layout=dict(margin=dict(t=30))
+        )
+        st.plotly_chart(fig_service, use_container_width=True)
+
+    with insight_col2:
+        # Performance table
+        st.markdown("#### Sales Performance")
+        # Revenue and contribution per item, from the menu engineering engine
+        performance_data = menu_engine().matrix(ctx.cube)[["Top Item", "Portions", "Revenue", "Contribution"]]
+        performance_data = performance_data.rename(columns={"Top Item": "Item"})
+        paged_table(st, performance_data, "sales-performance", rules=[Gradient(("Revenue", "Contribution"), "Blues")],
+                    formats={"Portions": "{:,.0f}", "Revenue": "${:,.0f}", "Contribution": "${:,.0f}"})
+
+    # Alerts and inventory section
+    st.subheader("Alerts & Inventory")
+    alert_col1, alert_col2 = st.columns(2)
+
+    with alert_col1:
+        st.warning("⚠️ Low Inventory Items")
+        status = inventory_engine().status(ctx.cube, ctx.location)
+        inventory_alerts = status.loc[status["Below Threshold"], ["Ingredient", "Stock Level", "Threshold"]]
+        inventory_alerts.columns = ["Item", "Stock", "Threshold"]
+        paged_table(st, inventory_alerts, "inventory-alerts",
+                    rules=[Highlight(lambda rows: rows["Stock"] < rows["Threshold"], "#10456D")])
+
+    with alert_col2:
+        # Revenue vs contribution for the leading items
+        fig_sales_profit = ctx.figure(
+            px.bar,
+            performance_data.head(10),
+            x='Item',
+            y=['Revenue', 'Contribution'],
+            title="Revenue vs. Contribution",
+            barmode='group',
+            layout=dict(margin=dict(t=30))
+        )
+        st.plotly_chart(fig_sales_profit, use_container_width=True)
+
+    # Unusual sales, traffic, service times and staffing, from the background
+    # alert monitor
+    st.markdown("#### Metric Alerts")
+    metric_alerts = alert_monitor().active(ctx.locations)
+    if metric_alerts.empty:
+        st.success("No unusual sales, customer, service time or staffing levels.")
+    else:
+        paged_table(st, metric_alerts, "metric-alerts", formats={
+            "Since": period_label,
+            "Period": period_label,
+            "Value": "{:,.1f}",
+            "Expected": "{:,.1f}",
+            "Score": "{:+.1f}",
+        })
+
+    # Order-level drilldown; only the visible page is sorted, styled and sent
+    with st.expander("Order Lines"):
+        paged_table(st, ctx.data, "order-lines", formats={"Sales": "${:,.2f}", "Service Time": "{:.1f} min"})
+
+
+def _top_metrics(st, ctx, feed, avg_service_time):
+    scope = ""
+    if feed is None:
+        # Totals of the latest day, over every location in view
+        today = ctx.query(Query((Agg("Sales"), Agg("Customers")), by=("Date",), where=ctx.item_filter,
+                                order_by="Date", descending=True, limit=1))
+        # Nothing sold under the current filters leaves no latest day
+        today_revenue = today['Sales'].iloc[0] if len(today) else 0.0
+        today_orders = int(today['Customers'].iloc[0]) if len(today) else 0
+    else:
+        # POS events carry no location or item, so live totals are chain-wide
+        _, today_revenue, today_orders = feed.poll()
+        scope = " (live, all locations)"
+
+    # Top metrics section - 3 columns
+    col1, col2, col3 = st.columns(3)
+
+    with col1:
+        st.metric(
+            label=f"Today's Revenue{scope}",
+            value=f"${today_revenue:,.2f}",
+            delta=f"{((today_revenue/10000)*100):.1f}% of target"
+        )
+
+    with col2:
+        st.metric(
+            label=f"Today's Orders{scope}",
+            value=f"{today_orders:,}",
+            delta=f"{((today_orders/300)*100):.1f}% of target"
+        )
+
+    with col3:
+        st.metric(
+            label="Avg Service Time",
+            value="—" if pd.isna(avg_service_time) else f"{avg_service_time:.1f} min",
+            delta=None if pd.isna(avg_service_time) else f"{(10-avg_service_time):.1f} min to target"
+        )
+
+    if feed is not None:
+        # The feed's recent events, refreshed with the cards
+        recent = feed.per_minute()
+        if len(recent):
+            fig_recent = ctx.figure(px.bar, recent, x="Minute", y="Revenue", hover_data=["Orders"],
+                                    title="Revenue per Minute, Last Hour (live, all locations)")
+            st.plotly_chart(fig_recent, use_container_width=True)
@@ -0,0 +1,257 @@
+"""Batch sentiment scoring for customer reviews.
+
+Reviews are tokenised and scored against a weighted lexicon in vectorised
+batches: all tokens of a batch are exploded into one Series, mapped to their
+weights, flipped after a negation and summed per review; n-grams are counted
+the same way, from shifted copies of the token array. Large backfills fan
+the batches out over a process pool. A SentimentStore keeps scores per Review
+ID with their Location, together with running n-gram counts per location, so
+only reviews it has not seen are ever scored and every view can be limited
+to one location; it can persist both next to a Parquet file. Reviews without
+a Location column belong to stelle.data.DEFAULT_LOCATION.
+"""
+import json
+import os
+import threading
+import weakref
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from stelle import perf
+from stelle.data import DEFAULT_LOCATION, SAMPLE_LOCATIONS, cache, fingerprint
+from stelle.shards import ALL_LOCATIONS
+
+TOKEN_PATTERN = r"[a-z']+"
+SENTIMENTS = ["Positive", "Neutral", "Negative"]
+THRESHOLD = 0.25
+BATCH_SIZE = 20_000
+PARALLEL_THRESHOLD = 100_000
+SCORE_COLUMNS = ["Date", "Location", "Score", "Sentiment"]
+
+LEXICON = {
+    "great": 1.0, "good": 0.7, "excellent": 1.2, "amazing": 1.2, "loved": 1.1, "love": 1.0,
+    "friendly": 0.8, "nice": 0.6, "delicious": 1.1, "fresh": 0.6, "fast": 0.6, "quick": 0.5,
+    "tasty": 0.9, "perfect": 1.1, "recommend": 0.8, "welcoming": 0.7, "attentive": 0.7,
+    "cozy": 0.5, "best": 1.0, "enjoyed": 0.9, "helpful": 0.7, "clean": 0.5,
+    "bad": -0.8, "terrible": -1.3, "awful": -1.3, "slow": -0.8, "long": -0.4, "cold": -0.7,
+    "rude": -1.1, "dirty": -1.0, "bland": -0.7, "overpriced": -0.8, "wrong": -0.7,
+    "disappointing": -1.0, "disappointed": -1.0, "noisy": -0.5, "late": -0.6, "soggy": -0.7,
+    "burnt": -0.8, "worst": -1.2, "missing": -0.6, "waited": -0.5,
+}
+NEGATIONS = {"not", "no", "never", "isn't", "wasn't", "didn't", "don't", "hardly"}
+STOPWORDS = {"the", "a", "an", "was", "is", "and", "to", "of", "for", "it", "we", "i", "my",
+             "our", "bit", "very", "with", "at", "in", "on", "this", "that", "but", "were"}
+
+
+def score_texts(texts):
+    """Lexicon score per review for a Series of texts indexed by Review ID."""
+    tokens = texts.str.lower().str.findall(TOKEN_PATTERN).explode().dropna()
+    if tokens.empty:
+        return pd.Series(0.0, index=texts.index)
+    weights = tokens.map(LEXICON).fillna(0.0)
+    negated = tokens.groupby(level=0).shift(1).isin(NEGATIONS)
+    weights = weights.where(~negated, -weights)
+    grouped = weights.groupby(level=0)
+    scores = grouped.sum() / np.sqrt(grouped.size())
+    return scores.reindex(texts.index, fill_value=0.0)
+
+
+def label(scores):
+    return pd.Series(np.select([scores >= THRESHOLD, scores <= -THRESHOLD], SENTIMENTS[::2], SENTIMENTS[1]),
+                     index=scores.index)
+
+
+def count_phrases(texts, sizes=(2, 3)):
+    """n-gram counts for phrases that neither start nor end with a stopword."""
+    tokens = texts.reset_index(drop=True).str.lower().str.findall(TOKEN_PATTERN).explode().dropna()
+    review, words = tokens.index.to_numpy(), tokens.to_numpy(dtype=object)
+    stop = tokens.isin(STOPWORDS).to_numpy()
+    counts = Counter()
+    for size in sizes:
+        n = len(words) - size + 1
+        if n <= 0:
+            continue
+        # Tokens of a review are contiguous, so a gram whose first and last
+        # tokens share a review lies within it
+        keep = (review[:n] == review[size - 1:]) & ~stop[:n] & ~stop[size - 1:]
+        grams = pd.Series(words[:n][keep])
+        if len(grams):
+            grams = grams.str.cat([pd.Series(words[k:k + n][keep]) for k in range(1, size)], sep=" ")
+            counts.update(grams.value_counts().to_dict())
+    return counts
+
+
+def score_batch(reviews):
+    """Score one batch; returns (scores frame indexed by Review ID, phrase counts per location)."""
+    texts = reviews.set_index("Review ID")["Text"].fillna("")
+    scores = score_texts(texts)
+    locations = reviews["Location"].astype(object).to_numpy() if "Location" in reviews else np.full(len(reviews), DEFAULT_LOCATION, dtype=object)
+    frame = pd.DataFrame({"Date": reviews["Date"].to_numpy(), "Location": locations, "Score": scores.to_numpy(),
+                          "Sentiment": label(scores).to_numpy()}, index=texts.index)
+    phrases = {location: count_phrases(group) for location, group in texts.groupby(locations, sort=False)}
+    return frame, phrases
+
+
+def score_reviews(reviews, workers=None, batch_size=BATCH_SIZE):
+    """Score `reviews` in batches, over a process pool for large backfills."""
+    batches = [reviews.iloc[start:start + batch_size] for start in range(0, len(reviews), batch_size)]
+    if len(reviews) >= PARALLEL_THRESHOLD and len(batches) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(score_batch, batches))
+    else:
+        results = [score_batch(batch) for batch in batches]
+    phrases = {}
+    for _, counts in results:
+        merge_phrases(phrases, counts)
+    scores = pd.concat([frame for frame, _ in results]) if results else pd.DataFrame(columns=SCORE_COLUMNS)
+    return scores, phrases
+
+
+def merge_phrases(phrases, counts):
+    """Add per-location phrase `counts` into `phrases` in place."""
+    for location, location_counts in counts.items():
+        phrases.setdefault(location, Counter()).update(location_counts)
+    return phrases
+
+
+class SentimentStore:
+    """Scores per Review ID and phrase counts per location, updated with unseen reviews only."""
+
+    def __init__(self, path=None):
+        self.path = path
+        self.scores = pd.DataFrame({"Date": pd.Series(dtype="datetime64[ns]"),
+                                    "Location": pd.Series(dtype="object"),
+                                    "Score": pd.Series(dtype="float64"),
+                                    "Sentiment": pd.Series(dtype="object")})
+        self.phrases = {}
+        self._lock = threading.Lock()
+        self._seen = None
+        if path and os.path.exists(path):
+            scores = pd.read_parquet(path)
+            # Caches written before scores kept their Location are rescored
+            if "Location" in scores:
+                self.scores = scores
+                with open(path + ".phrases.json") as handle:
+                    self.phrases = {location: Counter(counts) for location, counts in json.load(handle).items()}
+
+    def update(self, reviews, workers=None):
+        """Score reviews whose IDs are not yet in the store; returns how many."""
+        with self._lock:
+            # Reruns pass the same cached frame; skip the ID lookup entirely
+            if self._seen is not None and self._seen() is reviews:
+                return 0
+            self._seen = weakref.ref(reviews)
+            new = reviews[~reviews["Review ID"].isin(self.scores.index)]
+            if new.empty:
+                return 0
+            scores, phrases = score_reviews(new, workers=workers)
+            self.scores = pd.concat([self.scores, scores]) if len(self.scores) else scores
+            merge_phrases(self.phrases, phrases)
+            if self.path:
+                self.save()
+            return len(new)
+
+    def save(self):
+        self.scores.to_parquet(self.path)
+        with open(self.path + ".phrases.json", "w") as handle:
+            json.dump(self.phrases, handle)
+
+    def scores_for(self, location=ALL_LOCATIONS):
+        """Scores of the reviews of `location`, or of all of them for ALL_LOCATIONS."""
+        scores = self.scores
+        return scores if location == ALL_LOCATIONS else scores[scores["Location"] == location]
+
+    def counts(self, location=ALL_LOCATIONS):
+        counts = self.scores_for(location)["Sentiment"].value_counts().reindex(SENTIMENTS, fill_value=0)
+        return counts.rename_axis("Sentiment").reset_index(name="Count")
+
+    def trends(self, freq="D", location=ALL_LOCATIONS):
+        """Reviews per period and sentiment, one column per sentiment."""
+        scores = self.scores_for(location)
+        periods = scores["Date"].dt.to_period(freq).dt.start_time.rename("Date")
+        table = scores.groupby([periods, "Sentiment"]).size().unstack(fill_value=0)
+        return table.reindex(columns=SENTIMENTS, fill_value=0).rename_axis(columns=None).reset_index()
+
+    def top_phrases(self, n=5, location=ALL_LOCATIONS):
+        if location == ALL_LOCATIONS:
+            phrases = sum(self.phrases.values(), Counter())
+        else:
+            phrases = self.phrases.get(location, Counter())
+        return pd.DataFrame(phrases.most_common(n), columns=["Feedback", "Mentions"])
+
+
+SAMPLE_PHRASES = {
+    "Positive": ["Great service!", "Loved the pizza!", "Friendly staff.", "The ambiance was nice.",
+                 "Delicious pasta and fresh salad.", "Fast delivery, food still hot.", "Would recommend the burger."],
+    "Neutral": ["Ordered a burger for takeaway.", "Came for lunch with colleagues.", "Tried the pasta special.",
+                "Picked up a pizza on the way home."],
+    "Negative": ["Wait time was a bit long.", "The pasta was cold.", "Delivery was late.",
+                 "Salad was not fresh.", "Service was slow tonight."],
+}
+
+
+def sample_reviews(start="2023-01-01", days=365, per_day=3, seed=0, locations=tuple(SAMPLE_LOCATIONS)):
+    """Seeded reviews composed from stock phrases, `per_day` on average across `locations`."""
+    rng = np.random.default_rng(seed)
+    counts = rng.poisson(per_day, days)
+    dates = np.repeat(pd.date_range(start, periods=days, freq="D").to_numpy(), counts)
+    kinds = rng.choice(SENTIMENTS, size=len(dates), p=[0.6, 0.25, 0.15])
+    texts = []
+    for kind in kinds:
+        phrases = SAMPLE_PHRASES[kind]
+        picks = rng.choice(len(phrases), size=rng.integers(1, 3), replace=False)
+        texts.append(" ".join(phrases[i] for i in picks))
+    return pd.DataFrame({"Review ID": [f"R{i:07d}" for i in range(len(dates))], "Date": dates,
+                         "Location": rng.choice(list(locations), size=len(dates)), "Text": texts})
+
+
+def load_reviews(source=None):
+    """Reviews from `source` or $STELLE_REVIEWS (CSV or Parquet), else samples."""
+    source = source or os.environ.get("STELLE_REVIEWS")
+    key = fingerprint(source) if source else ("sample-reviews",)
+    reviews = cache.get(key)
+    if reviews is None:
+        if not source:
+            reviews = sample_reviews()
+        elif source.lower().endswith(".csv"):
+            reviews = pd.read_csv(source, parse_dates=["Date"])
+        else:
+            reviews = pd.read_parquet(source)
+        reviews = cache.put(key, reviews)
+    return reviews
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def seed(scores, phrases):
+    """Start the process-wide store from precomputed scores and per-location phrase counts."""
+    if "Location" not in scores:
+        # Snapshots from before scores kept their Location; score afresh
+        return
+    store = sentiment_store()
+    with store._lock:
+        store.scores = scores
+        store.phrases = {location: Counter(counts) for location, counts in phrases.items()}
+        store._seen = None
+
+
+def sentiment_store():
+    """Process-wide store, persisted to $STELLE_SENTIMENT_CACHE when set."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = SentimentStore(os.environ.get("STELLE_SENTIMENT_CACHE"))
+        return _store
+
+
+@perf.timed("scored_reviews")
+def scored_reviews(reviews=None):
+    """The process-wide store, updated with `reviews` (default: load_reviews())."""
+    store = sentiment_store()
+    store.update(load_reviews() if reviews is None else reviews)
+    return store
@@ -0,0 +1,161 @@
+"""Per-location shards of the order data.
+
+The dataset is split by Location into shards, each with its own RollupCube.
+On refresh, a shard whose rows only grew by newer days has them folded into
+its cube, an unchanged shard is left alone, and only shards that changed in
+any other way are rebuilt, across a process pool once the rebuild is large
+enough to pay for the workers. The all-locations cube is the merge of the
+shard cubes, which is exact because every cube measure is additive.
+
+With DuckDB or Polars as the query engine, rebuilt shard cubes are
+aggregated by that engine over the files on disk rather than in pandas.
+"""
+import os
+import threading
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from stelle import perf
+from stelle.data import DATASETS_KEPT, dataset_key
+from stelle.filters import Eq, index_for
+from stelle.rollup import RollupCube
+
+ALL_LOCATIONS = "All Locations"
+# Below this many rows to rebuild, worker start-up and pickling cost more than
+# the rollups themselves
+PARALLEL_ROWS = 2_000_000
+
+
+def _build_cube(frame):
+    return RollupCube(frame)
+
+
+def build_cubes(frames, workers=None, engine=None):
+    """RollupCube per shard frame, built in worker processes for large inputs.
+
+    Given an on-disk stelle.query `engine` over every location, the shards'
+    rows are aggregated by that engine instead, in one pass, and `frames`
+    only names them.
+    """
+    if engine is not None:
+        return RollupCube.split_from_engine(engine, "Location", list(frames)) if frames else {}
+    workers = min(workers or os.cpu_count() or 1, len(frames))
+    if workers > 1 and sum(len(frame) for frame in frames.values()) >= PARALLEL_ROWS:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return dict(zip(frames, pool.map(_build_cube, frames.values())))
+    return {location: _build_cube(frame) for location, frame in frames.items()}
+
+
+class ShardSet:
+    """Location shards of one dataset and a rollup cube per shard."""
+
+    def __init__(self):
+        self.dataset = None
+        self.frames = {}
+        self.cubes = {}
+        self._merged = None
+        self._lock = threading.Lock()
+
+    @property
+    def locations(self):
+        return list(self.frames)
+
+    def refresh(self, dataset, workers=None, engine=None):
+        """Re-shard `dataset`, touching only the cubes of shards that changed (see build_cubes for `engine`)."""
+        index = index_for(dataset, name="shards")
+        frames = {}
+        for location in dataset["Location"].cat.categories:
+            if len(index.positions(Eq("Location", location))):
+                frames[location] = index.select(dataset, Eq("Location", location))
+        cubes, stale = {}, {}
+        changed = set(self.cubes) != set(frames)
+        for location, frame in frames.items():
+            cube = self.cubes.get(location)
+            if cube is not None and cube.last_date is not None:
+                known = int(frame["Date"].searchsorted(cube.last_date, side="right"))
+                if known == cube.rows:
+                    if known < len(frame):
+                        cube.append(frame.iloc[known:])
+                        changed = True
+                    cubes[location] = cube
+                    continue
+            stale[location] = frame
+        cubes.update(build_cubes(stale, workers, engine))
+        with self._lock:
+            self.dataset, self.frames, self.cubes = dataset, frames, cubes
+            if changed or stale:
+                self._merged = None
+        return self
+
+    def frame(self, location=ALL_LOCATIONS):
+        return self.dataset if location == ALL_LOCATIONS else self.frames[location]
+
+    def cube(self, location=ALL_LOCATIONS):
+        """The shard's cube, or the merge of all shard cubes for ALL_LOCATIONS."""
+        if location != ALL_LOCATIONS:
+            return self.cubes[location]
+        with self._lock:
+            if self._merged is None:
+                self._merged = RollupCube.merge(self.cubes.values())
+            return self._merged
+
+    @perf.timed("shards.comparison")
+    def comparison(self):
+        """One row per location: revenue, orders, service, staffing, top item and mix."""
+        rows = []
+        for location, cube in self.cubes.items():
+            mix = cube.totals(["Service Type"]).set_index("Service Type")
+            items = cube.totals(["Top Item"]).set_index("Top Item")
+            orders = mix["Rows"].sum()
+            row = {
+                "Location": location,
+                "Revenue": mix["Sales"].sum(),
+                "Orders": orders,
+                "Customers": mix["Customers"].sum(),
+                "Avg Service Time": mix["Service Time"].sum() / orders,
+                "Avg Staff Present": mix["Staff Present"].sum() / orders,
+                "Top Item": items["Rows"].idxmax(),
+            }
+            row.update((f"{service} Share", mix.loc[service, "Rows"] / orders) for service in mix.index)
+            rows.append(row)
+        return pd.DataFrame(rows).fillna(0)
+
+    def trend(self, grain, measure="Sales"):
+        """`measure` per period at `grain`, one column per location."""
+        columns = {location: cube.view(grain).set_index("Date")[measure] for location, cube in self.cubes.items()}
+        return pd.DataFrame(columns).fillna(0).rename_axis("Date").reset_index()
+
+
+_shards = OrderedDict()
+_shards_lock = threading.Lock()
+
+
+def seed(shards, name="default"):
+    """Start `name` from precomputed shard cubes; the next shards_for(name) refreshes them from there."""
+    with _shards_lock:
+        _shards[(name, None)] = (None, shards)
+
+
+@perf.timed("shards_for")
+def shards_for(dataset, name="default", engine=None):
+    """Return the ShardSet for `dataset`, refreshing the previous one in place.
+
+    Shard cubes are rebuilt by `engine`, an on-disk stelle.query engine over
+    the rows of `dataset`, when one is given. Shard sets are kept per name
+    and per source and date range (see stelle.data.dataset_key); the first
+    dataset under a seeded name takes over the seed.
+    """
+    key = dataset_key(dataset, name)
+    with _shards_lock:
+        ref, shards = _shards.get(key) or _shards.pop((name, None), (None, None))
+        if ref is not None and ref() is dataset:
+            return shards
+        shards = (shards or ShardSet()).refresh(dataset, engine=engine)
+        _shards[key] = (weakref.ref(dataset), shards)
+        _shards.move_to_end(key)
+        while len(_shards) > DATASETS_KEPT:
+            _shards.popitem(last=False)
+        return shards
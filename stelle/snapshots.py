@@ -0,0 +1,170 @@
+"""Versioned KPI snapshots precomputed outside the dashboard.
+
+`python -m stelle precompute` runs the heavy aggregations headlessly and
+writes them under a snapshot root:
+
+    <root>/<version>/manifest.json
+    <root>/<version>/<shard>/<grain>.arrow   rollup cube tables (Arrow IPC)
+    <root>/<version>/<shard>/traffic.npy     item x weekday x hour histogram
+    <root>/<version>/reviews.arrow           sentiment score per review
+    <root>/LATEST                            name of the newest version
+
+A version directory is complete before LATEST points at it, so readers never
+see a partial snapshot. The dashboard memory-maps the newest snapshot and
+seeds its per-dataset caches from it; the usual incremental paths then fold
+in only the rows newer than the snapshot. Data that is not an extension of
+the snapshotted data is detected there too, and simply rebuilt.
+"""
+import json
+import os
+import shutil
+import threading
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from stelle import sentiment, shards, traffic
+from stelle.rollup import DIMENSIONS, RollupCube
+from stelle.sentiment import score_reviews
+from stelle.shards import ALL_LOCATIONS, ShardSet
+from stelle.traffic import TrafficHistogram
+
+FORMAT = 1
+KEEP_VERSIONS = 3
+LATEST = "LATEST"
+
+
+def _write_table(root, name, frame):
+    # Uncompressed so readers can map the file instead of decoding it
+    feather.write_feather(frame, os.path.join(root, name), compression="uncompressed")
+    return name
+
+
+def _read_table(root, name):
+    # One block per column lets pandas wrap the mapped numeric buffers instead
+    # of consolidating them into a fresh 2D copy; dates, categories and
+    # strings are still decoded, but those are the index and labels, not the
+    # measures
+    source = pa.memory_map(os.path.join(root, name))
+    return pa.ipc.open_file(source).read_all().to_pandas(split_blocks=True)
+
+
+def write_snapshot(root, dataset, reviews=None, keep=KEEP_VERSIONS):
+    """Aggregate `dataset` (and `reviews`) into a new snapshot version under `root`."""
+    created = datetime.now(timezone.utc)
+    version = created.strftime("%Y%m%dT%H%M%S%fZ")
+    staging = os.path.join(root, version + ".tmp")
+    os.makedirs(staging)
+    sharded = ShardSet().refresh(dataset)
+    manifest = {"format": FORMAT, "version": version, "created": created.isoformat(),
+                "rows": len(dataset), "shards": {}}
+    for number, location in enumerate([ALL_LOCATIONS] + sharded.locations):
+        folder = "all" if location == ALL_LOCATIONS else f"location-{number:03d}"
+        os.makedirs(os.path.join(staging, folder))
+        cube = sharded.cube(location)
+        frame = sharded.frame(location)
+        histogram = TrafficHistogram(frame["Top Item"].cat.categories).add(frame)
+        np.save(os.path.join(staging, folder, "traffic.npy"), histogram.counts)
+        manifest["shards"][location] = {
+            "rows": cube.rows,
+            "last_date": cube.last_date.isoformat(),
+            "tables": {grain: _write_table(staging, f"{folder}/{grain.lower()}.arrow", table.reset_index())
+                       for grain, table in cube.tables.items()},
+            "traffic": {"file": f"{folder}/traffic.npy", "items": histogram.items, "rows": histogram.rows},
+        }
+    if reviews is not None:
+        scores, phrases = score_reviews(reviews)
+        manifest["reviews"] = {"file": _write_table(staging, "reviews.arrow", scores.rename_axis("Review ID").reset_index()),
+                               "phrases": dict(phrases)}
+    with open(os.path.join(staging, "manifest.json"), "w") as handle:
+        json.dump(manifest, handle, indent=1)
+    os.rename(staging, os.path.join(root, version))
+    pointer = os.path.join(root, LATEST + ".tmp")
+    with open(pointer, "w") as handle:
+        handle.write(version)
+    os.replace(pointer, os.path.join(root, LATEST))
+    _prune(root, keep)
+    return os.path.join(root, version)
+
+
+def _prune(root, keep):
+    versions = sorted(name for name in os.listdir(root)
+                      if os.path.isdir(os.path.join(root, name)) and not name.endswith(".tmp"))
+    for name in versions[:-keep] if keep > 0 else []:
+        shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+
+
+class Snapshot:
+    """Read access to one snapshot version; arrays and table measures are memory-mapped."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, "manifest.json")) as handle:
+            self.manifest = json.load(handle)
+        if self.manifest.get("format") != FORMAT:
+            raise ValueError(f"Unsupported snapshot format in {path}")
+
+    @property
+    def version(self):
+        return self.manifest["version"]
+
+    @property
+    def locations(self):
+        return [location for location in self.manifest["shards"] if location != ALL_LOCATIONS]
+
+    def cube(self, location):
+        entry = self.manifest["shards"][location]
+        tables = {grain: _read_table(self.path, name).set_index(["Date", *DIMENSIONS])
+                  for grain, name in entry["tables"].items()}
+        return RollupCube.from_tables(tables, entry["rows"], pd.Timestamp(entry["last_date"]))
+
+    def traffic(self, location):
+        entry = self.manifest["shards"][location]
+        histogram = TrafficHistogram(entry["traffic"]["items"])
+        histogram.counts = np.load(os.path.join(self.path, entry["traffic"]["file"]), mmap_mode="r")
+        histogram.rows = entry["traffic"]["rows"]
+        histogram.last_date = pd.Timestamp(entry["last_date"])
+        return histogram
+
+    def reviews(self):
+        """(scores indexed by Review ID, phrase counts), or None without reviews."""
+        entry = self.manifest.get("reviews")
+        if entry is None:
+            return None
+        return _read_table(self.path, entry["file"]).set_index("Review ID"), entry["phrases"]
+
+
+def latest(root):
+    """The newest complete snapshot under `root`, or None."""
+    try:
+        with open(os.path.join(root, LATEST)) as handle:
+            version = handle.read().strip()
+    except FileNotFoundError:
+        return None
+    return Snapshot(os.path.join(root, version))
+
+
+_installed = None
+_installed_lock = threading.Lock()
+
+
+def install_latest(root):
+    """Seed the dashboard caches from the newest snapshot, once per version."""
+    global _installed
+    snapshot = latest(root)
+    with _installed_lock:
+        if snapshot is None or snapshot.version == _installed:
+            return snapshot
+        seeded = ShardSet()
+        seeded.cubes = {location: snapshot.cube(location) for location in snapshot.locations}
+        shards.seed(seeded)
+        for location in [ALL_LOCATIONS] + snapshot.locations:
+            traffic.seed(snapshot.traffic(location), location)
+        reviews = snapshot.reviews()
+        if reviews is not None:
+            sentiment.seed(*reviews)
+        _installed = snapshot.version
+    return snapshot
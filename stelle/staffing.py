@@ -0,0 +1,202 @@
+"""Staff requirements and shift scheduling for the Staff Optimization section.
+
+Required headcount per (weekday, hour) comes from an Erlang-C queue: customer
+arrivals per hour and the observed mean Service Time give the offered load,
+and each slot gets the smallest number of staff whose expected wait meets the
+target. The Erlang recursion runs for all 168 slots of the week at once.
+
+Staff are then assigned to shifts greedily: each step picks the shift that
+covers the most uncovered staff-hours on a day and gives it to the available
+person with the most remaining contract hours. Solutions are cached per week
+and input hash.
+"""
+import hashlib
+import os
+import threading
+import zlib
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from stelle import perf
+from stelle.data import DATASETS_KEPT
+from stelle.traffic import WEEKDAYS
+
+SHIFTS = {"Morning": (6, 12), "Afternoon": (11, 17), "Evening": (16, 23)}
+TARGET_WAIT_MINUTES = 5.0
+MAX_STAFF_PER_SLOT = 50
+SOLUTION_CACHE_ENTRIES = 64
+
+
+def erlang_c_staff(arrivals, service_minutes, target_wait=TARGET_WAIT_MINUTES, max_staff=MAX_STAFF_PER_SLOT):
+    """Smallest headcount per slot whose Erlang-C expected wait meets the target.
+
+    `arrivals` are customers per hour (any shape); slots without arrivals
+    need no one. Returns an integer array of the same shape.
+    """
+    arrivals = np.asarray(arrivals, dtype=np.float64)
+    mu = 60.0 / service_minutes  # customers one person serves per hour
+    load = arrivals / mu
+    required = np.zeros(arrivals.shape, dtype=np.int64)
+    pending = arrivals > 0
+    blocking = np.ones(arrivals.shape)
+    for staff in range(1, max_staff + 1):
+        # Erlang-B recursion, then Erlang-C from B, for every slot at once
+        blocking = load * blocking / (staff + load * blocking)
+        stable = staff > load
+        with np.errstate(divide="ignore", invalid="ignore"):
+            waiting = staff * blocking / (staff - load * (1 - blocking))
+            wait_minutes = 60.0 * waiting / (staff * mu - arrivals)
+        met = pending & stable & (wait_minutes <= target_wait)
+        required[met] = staff
+        pending &= ~met
+        if not pending.any():
+            break
+    required[pending] = max_staff
+    return required
+
+
+def weekly_arrivals(traffic, weeks, scale=1.0):
+    """Average customers per (weekday, hour) over `weeks` weeks of history."""
+    return traffic.grid().astype(np.float64) / max(weeks, 1.0) * scale
+
+
+def sample_roster(size=20, location="Main", seed=0):
+    """Seeded roster: weekly hour caps and (weekday, shift) availability."""
+    rng = np.random.default_rng(seed)
+    rows = []
+    for person in range(size):
+        days = rng.choice(7, size=rng.integers(4, 7), replace=False)
+        shifts = list(SHIFTS)
+        for day in sorted(days):
+            for shift in rng.choice(shifts, size=rng.integers(1, 3), replace=False):
+                rows.append((f"{location} {person + 1:03d}", location, WEEKDAYS[day], shift,
+                             int(rng.choice([24, 32, 40]))))
+    roster = pd.DataFrame(rows, columns=["Staff", "Location", "Day", "Shift", "Max Hours"])
+    # Hour caps are per person, not per availability row
+    roster["Max Hours"] = roster.groupby("Staff")["Max Hours"].transform("first")
+    return roster
+
+
+_rosters = OrderedDict()
+_rosters_lock = threading.Lock()
+
+
+def load_roster(location="Main"):
+    """`location`'s rows of the $STELLE_ROSTER CSV (same columns as the sample), else a sample."""
+    path = os.environ.get("STELLE_ROSTER")
+    # Like dataset_key: the same location from another (or an edited) file is another entry
+    key = (location, path, os.path.getmtime(path) if path else None)
+    with _rosters_lock:
+        roster = _rosters.get(key)
+        if roster is not None:
+            _rosters.move_to_end(key)
+            return roster
+    if path:
+        roster = pd.read_csv(path)
+        if "Location" in roster:
+            roster = roster[roster["Location"] == location].reset_index(drop=True)
+    else:
+        roster = sample_roster(location=location, seed=zlib.crc32(location.encode()))
+    with _rosters_lock:
+        _rosters[key] = roster
+        while len(_rosters) > DATASETS_KEPT:
+            _rosters.popitem(last=False)
+    return roster
+
+
+def assign_shifts(required, roster):
+    """Greedy cover of a (7, 24) requirement grid with shifts from `roster`.
+
+    Returns the assignments (Staff, Day, Shift) and the uncovered staff-hours
+    left per (weekday, hour).
+    """
+    staff = list(pd.unique(roster["Staff"]))
+    shift_names = list(SHIFTS)
+    shift_hours = np.zeros((len(shift_names), 24), dtype=bool)
+    for index, (start, end) in enumerate(SHIFTS.values()):
+        shift_hours[index, start:end] = True
+    lengths = shift_hours.sum(axis=1)
+
+    person = pd.Categorical(roster["Staff"], categories=staff).codes
+    day = pd.Categorical(roster["Day"], categories=WEEKDAYS).codes
+    shift = pd.Categorical(roster["Shift"], categories=shift_names).codes
+    available = np.zeros((len(staff), 7, len(shift_names)), dtype=bool)
+    available[person, day, shift] = True
+    remaining = roster.groupby("Staff", sort=False)["Max Hours"].first().reindex(staff).to_numpy(dtype=np.float64)
+    working = np.zeros((len(staff), 7), dtype=bool)
+
+    deficit = np.asarray(required, dtype=np.int64).copy()
+    assignments = []
+    while True:
+        # Staff-hours each (day, shift) would cover against the current deficit;
+        # hours already over-covered count as nothing, not as a penalty
+        gain = (np.clip(deficit, 0, 1)[:, None, :] * shift_hours[None, :, :]).sum(axis=2)
+        eligible = available & ~working[:, :, None] & (remaining[:, None, None] >= lengths[None, None, :])
+        gain = np.where(eligible.any(axis=0), gain, 0)
+        d, s = np.unravel_index(np.argmax(gain), gain.shape)
+        if gain[d, s] == 0:
+            break
+        candidates = np.flatnonzero(eligible[:, d, s])
+        chosen = candidates[np.argmax(remaining[candidates])]
+        working[chosen, d] = True
+        remaining[chosen] -= lengths[s]
+        deficit[d, shift_hours[s]] -= 1
+        assignments.append((staff[chosen], WEEKDAYS[d], shift_names[s]))
+    schedule = pd.DataFrame(assignments, columns=["Staff", "Day", "Shift"])
+    return schedule, np.clip(deficit, 0, None)
+
+
+class StaffPlan:
+    """Requirements and a shift schedule for one week and location."""
+
+    def __init__(self, required, schedule, shortfall):
+        self.required = required
+        self.schedule = schedule
+        self.shortfall = shortfall
+
+    def required_by_weekday(self, hours=range(6, 23)):
+        return pd.DataFrame(self.required[:, list(hours)], index=WEEKDAYS, columns=list(hours))
+
+    @classmethod
+    def combine(cls, plans):
+        """Sum of independent plans, e.g. one per location."""
+        plans = list(plans)
+        return cls(sum(plan.required for plan in plans),
+                   pd.concat([plan.schedule for plan in plans], ignore_index=True),
+                   sum(plan.shortfall for plan in plans))
+
+    def scheduled_by_shift(self):
+        counts = self.schedule.groupby(["Day", "Shift"]).size().rename("Staff Scheduled")
+        index = pd.MultiIndex.from_product([WEEKDAYS, list(SHIFTS)], names=["Day", "Shift"])
+        return counts.reindex(index, fill_value=0).reset_index()
+
+
+_plans = OrderedDict()
+_plans_lock = threading.Lock()
+
+
+def _input_hash(arrivals, service_minutes, target_wait, roster):
+    digest = hashlib.sha1(np.ascontiguousarray(arrivals).tobytes())
+    digest.update(np.float64([service_minutes, target_wait]).tobytes())
+    digest.update(pd.util.hash_pandas_object(roster, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+@perf.timed("plan_week")
+def plan_week(week_start, arrivals, service_minutes, roster, target_wait=TARGET_WAIT_MINUTES):
+    """Erlang-C requirements plus greedy schedule, cached per week and inputs."""
+    key = (pd.Timestamp(week_start), _input_hash(arrivals, service_minutes, target_wait, roster))
+    with _plans_lock:
+        plan = _plans.get(key)
+        if plan is not None:
+            _plans.move_to_end(key)
+            return plan
+    required = erlang_c_staff(arrivals, service_minutes, target_wait)
+    plan = StaffPlan(required, *assign_shifts(required, roster))
+    with _plans_lock:
+        _plans[key] = plan
+        while len(_plans) > SOLUTION_CACHE_ENTRIES:
+            _plans.popitem(last=False)
+    return plan
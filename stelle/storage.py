@@ -0,0 +1,182 @@
+"""Order data stored as Parquet partitioned by location and month.
+
+    <root>/Location=<name>/Month=<YYYY-MM>/part-*.parquet
+    <root>/_manifest.json    per file: Location, Month, first/last Date, rows, bytes
+
+Files are written sorted by Date with row-group statistics, and the manifest
+records each file's Date range, from the Parquet footers for datasets written
+by other tools (`python -m stelle generate`, say; the leading underscore keeps
+Arrow's dataset discovery from reading the manifest as data). A date-range
+read keeps only the files whose range overlaps before any rows are read, and
+Arrow then skips row groups by their statistics, so last week of history
+costs a few small files rather than the whole dataset.
+"""
+import json
+import os
+import threading
+from dataclasses import dataclass
+from urllib.parse import unquote
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+MANIFEST = "_manifest.json"
+PARTITION_COLUMNS = ["Location", "Month"]
+ROW_GROUP_ROWS = 64 * 1024
+
+
+@dataclass(frozen=True)
+class PartFile:
+    """One data file of a partitioned dataset, `path` relative to the root."""
+    path: str
+    location: str
+    month: str
+    first: pd.Timestamp
+    last: pd.Timestamp
+    rows: int
+    bytes: int
+
+
+def is_partitioned(path):
+    """Whether `path` is a directory laid out as Location=/Month= partitions."""
+    return os.path.isdir(path) and any(name.startswith("Location=") for name in os.listdir(path))
+
+
+def _data_files(root):
+    for folder, dirs, files in os.walk(root):
+        dirs.sort()
+        for name in sorted(files):
+            if name.endswith(".parquet") and not name.startswith(("_", ".")):
+                full = os.path.join(folder, name)
+                yield os.path.relpath(full, root), os.path.getsize(full)
+
+
+def _describe(root, path, size):
+    """A PartFile from the file's partition path and its footer's Date statistics."""
+    keys = dict(unquote(part).split("=", 1) for part in path.split(os.sep)[:-1] if "=" in part)
+    metadata = pq.ParquetFile(os.path.join(root, path)).metadata
+    column = metadata.schema.to_arrow_schema().get_field_index("Date")
+    stats = [metadata.row_group(i).column(column).statistics for i in range(metadata.num_row_groups)]
+    stats = [s for s in stats if s is not None and s.has_min_max]
+    if not stats:
+        raise ValueError(f"{path} has no Date statistics")
+    first, last = min(s.min for s in stats), max(s.max for s in stats)
+    return PartFile(path, keys.get("Location"), keys.get("Month"), pd.Timestamp(first), pd.Timestamp(last),
+                    metadata.num_rows, size)
+
+
+class PartitionIndex:
+    """The files of a partitioned dataset and the Date range each one holds."""
+
+    def __init__(self, root, files):
+        self.root = root
+        self.files = files
+
+    @property
+    def locations(self):
+        return sorted({part.location for part in self.files if part.location is not None})
+
+    @property
+    def bounds(self):
+        """(first, last) Date over the whole dataset."""
+        return min(part.first for part in self.files), max(part.last for part in self.files)
+
+    def select(self, start=None, end=None, locations=None):
+        """Files that may hold rows dated within [start, end] at `locations`."""
+        return [part for part in self.files
+                if (start is None or part.last >= start) and (end is None or part.first <= end)
+                and (locations is None or part.location in locations)]
+
+
+def write_manifest(root):
+    """Describe every data file under `root` in its manifest; returns the PartitionIndex."""
+    files = [_describe(root, path, size) for path, size in _data_files(root)]
+    entries = [{"path": part.path, "location": part.location, "month": part.month, "first": part.first.isoformat(),
+                "last": part.last.isoformat(), "rows": part.rows, "bytes": part.bytes} for part in files]
+    staging = os.path.join(root, MANIFEST + ".tmp")
+    try:
+        with open(staging, "w") as handle:
+            json.dump({"files": entries}, handle, indent=1)
+        os.replace(staging, os.path.join(root, MANIFEST))
+    except OSError:
+        # A read-only dataset is still served, describing it once per process
+        pass
+    return PartitionIndex(root, files)
+
+
+def _read_manifest(root):
+    try:
+        with open(os.path.join(root, MANIFEST)) as handle:
+            entries = json.load(handle)["files"]
+    except (OSError, ValueError, KeyError):
+        return None
+    return [PartFile(entry["path"], entry["location"], entry["month"], pd.Timestamp(entry["first"]),
+                     pd.Timestamp(entry["last"]), entry["rows"], entry["bytes"]) for entry in entries]
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def partition_index(root):
+    """The PartitionIndex of `root`, from its manifest while that lists exactly the files on disk.
+
+    Datasets written or changed without updating the manifest get a fresh one,
+    built from the Parquet footers.
+    """
+    root = os.path.abspath(root)
+    listing = tuple(_data_files(root))
+    with _indexes_lock:
+        cached = _indexes.get(root)
+        if cached is not None and cached[0] == listing:
+            return cached[1]
+    files = _read_manifest(root)
+    if files is not None and sorted((part.path, part.bytes) for part in files) == sorted(listing):
+        index = PartitionIndex(root, files)
+    else:
+        index = write_manifest(root)
+    with _indexes_lock:
+        _indexes[root] = (listing, index)
+    return index
+
+
+def write_partitioned(frame, root, row_group_rows=ROW_GROUP_ROWS):
+    """Write an order frame under `root` partitioned by Location and Month, replacing those partitions."""
+    frame = frame.sort_values("Date", kind="stable")
+    months, labels = pd.factorize(frame["Date"].dt.to_period("M"), sort=True)
+    table = pa.Table.from_pandas(frame, preserve_index=False).append_column(
+        "Month", pa.DictionaryArray.from_arrays(pa.array(months, type=pa.int32()), pa.array(labels.strftime("%Y-%m"))))
+    ds.write_dataset(table, root, format="parquet", partitioning=PARTITION_COLUMNS, partitioning_flavor="hive",
+                     existing_data_behavior="delete_matching", max_rows_per_group=row_group_rows,
+                     min_rows_per_group=min(row_group_rows, 1024))
+    return write_manifest(root)
+
+
+def read_partitions(root, start=None, end=None, locations=None):
+    """Rows dated within [start, end] (inclusive days) at `locations`, reading only overlapping files.
+
+    The frame's attrs["stelle.read"] records how much of the dataset was read.
+    """
+    start = None if start is None else pd.Timestamp(start)
+    end = None if end is None else pd.Timestamp(end) + pd.Timedelta(days=1) - pd.Timedelta(1, "ns")
+    index = partition_index(root)
+    parts = index.select(start, end, locations)
+    # With no file in range, one file still supplies the schema of the empty frame
+    dataset = ds.dataset([os.path.join(index.root, part.path) for part in parts or index.files[:1]], format="parquet",
+                         partitioning=ds.HivePartitioning.discover(infer_dictionary=True),
+                         partition_base_dir=index.root)
+    condition = None
+    for bound, compare in ((start, "__ge__"), (end, "__le__")):
+        if bound is not None:
+            term = getattr(ds.field("Date"), compare)(pa.scalar(bound.as_unit("ns"), pa.timestamp("ns")))
+            condition = term if condition is None else condition & term
+    columns = [name for name in dataset.schema.names if name != "Month"]
+    if parts:
+        frame = dataset.to_table(columns=columns, filter=condition).to_pandas()
+    else:
+        frame = dataset.schema.empty_table().select(columns).to_pandas()
+    frame.attrs["stelle.read"] = {"files": len(parts), "bytes": sum(part.bytes for part in parts),
+                                  "total_files": len(index.files), "total_bytes": sum(part.bytes for part in index.files)}
+    return frame
@@ -0,0 +1,133 @@
+"""Paged, server-sorted tables with vectorised styling.
+
+`st.dataframe` ships the whole frame to the browser, and pandas Styler rules
+such as `.apply(..., axis=1)` call back into Python per row. `paged_table`
+sorts on the server instead (sort orders are cached per frame and column),
+slices out one page and styles only that window. Styling rules compute the
+CSS for every cell of the window with array operations; a gradient is scaled
+to the whole column so colours stay put from page to page.
+"""
+import math
+import threading
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from stelle import perf
+
+PAGE_SIZE = 50
+SORT_CACHE_ENTRIES = 16
+UNSORTED = "(unsorted)"
+# Colour stops (light to dark) for Gradient
+PALETTES = {
+    "Blues": ["#f7fbff", "#c6dbef", "#6baed6", "#2171b5", "#08306b"],
+    "Reds": ["#fff5f0", "#fcbba1", "#fb6a4a", "#cb181d", "#67000d"],
+}
+
+
+def _rgb(stops):
+    return np.array([[int(stop[i:i + 2], 16) for i in (1, 3, 5)] for stop in stops], dtype=np.float64)
+
+
+@dataclass(frozen=True)
+class Gradient:
+    """Background shaded by value, scaled to the min/max of the whole column."""
+    columns: tuple
+    palette: str = "Blues"
+
+    def apply(self, css, window, frame):
+        stops = _rgb(PALETTES[self.palette])
+        positions = np.linspace(0.0, 1.0, len(stops))
+        for column in self.columns:
+            full = frame[column].to_numpy(dtype=np.float64)
+            # Nothing to scale to in an empty or all-NaN column; leave it plain
+            if np.isnan(full).all():
+                continue
+            lo, hi = np.nanmin(full), np.nanmax(full)
+            values = window[column].to_numpy(dtype=np.float64)
+            missing = np.isnan(values)
+            scaled = (np.where(missing, lo, values) - lo) / (hi - lo if hi > lo else 1.0)
+            rgb = np.stack([np.interp(scaled, positions, stops[:, channel]) for channel in range(3)], axis=1)
+            # Dark backgrounds get light text, as Styler.background_gradient does
+            luminance = rgb @ np.array([0.299, 0.587, 0.114]) / 255
+            channels = pd.DataFrame(rgb.round().astype(int).astype(str), index=window.index)
+            background = "background-color: rgb(" + channels[0] + ", " + channels[1] + ", " + channels[2] + ")"
+            text = np.where(luminance < 0.5, "; color: #f1f1f1", "; color: #000000")
+            # NaN cells stay unstyled, as with Styler.background_gradient
+            css[column] = np.where(missing, css[column], background + text)
+
+
+@dataclass(frozen=True)
+class Highlight:
+    """Background `color` on rows where `condition(window)` holds, in `columns` (default all)."""
+    condition: object
+    color: str
+    columns: tuple = None
+
+    def apply(self, css, window, frame):
+        mask = np.asarray(self.condition(window), dtype=bool)
+        for column in self.columns or window.columns:
+            css[column] = np.where(mask, f"background-color: {self.color}", css[column])
+
+
+_orders = OrderedDict()
+_orders_lock = threading.Lock()
+
+
+def sort_order(frame, column, descending=False):
+    """Row positions of `frame` sorted by `column`, cached per frame object."""
+    key = (id(frame), column, descending)
+    with _orders_lock:
+        ref, order = _orders.get(key, (None, None))
+        if ref is not None and ref() is frame:
+            _orders.move_to_end(key)
+            return order
+    values = frame[column]
+    values = values.cat.codes if isinstance(values.dtype, pd.CategoricalDtype) else values
+    order = np.argsort(values.to_numpy(), kind="stable")
+    if descending:
+        order = order[::-1]
+    with _orders_lock:
+        _orders[key] = (weakref.ref(frame), order)
+        while len(_orders) > SORT_CACHE_ENTRIES:
+            _orders.popitem(last=False)
+    return order
+
+
+def styled_window(window, frame, rules=(), formats=None):
+    """Styler for `window` with each rule's CSS computed in one pass."""
+    styler = window.style
+    if rules:
+        def css():
+            table = pd.DataFrame("", index=window.index, columns=window.columns)
+            for rule in rules:
+                rule.apply(table, window, frame)
+            return table
+        styled = css()
+        styler = styler.apply(lambda _: styled, axis=None)
+    if formats:
+        styler = styler.format(formats)
+    return styler
+
+
+@perf.timed("paged_table")
+def paged_table(st, frame, key, rules=(), formats=None, page_size=PAGE_SIZE):
+    """Render one sorted page of `frame`; only that page is styled and sent."""
+    window = frame
+    if len(frame) > page_size:
+        sort_col, order_col, page_col = st.columns([3, 2, 2])
+        sort_by = sort_col.selectbox("Sort by", [UNSORTED] + list(frame.columns), key=f"{key}-sort")
+        descending = order_col.checkbox("Descending", key=f"{key}-descending")
+        pages = math.ceil(len(frame) / page_size)
+        page = int(page_col.number_input(f"Page (of {pages:,})", min_value=1, max_value=pages, value=1, step=1,
+                                         key=f"{key}-page"))
+        start, stop = (page - 1) * page_size, min(page * page_size, len(frame))
+        if sort_by == UNSORTED:
+            window = frame.iloc[start:stop]
+        else:
+            window = frame.take(sort_order(frame, sort_by, descending)[start:stop])
+        st.caption(f"Rows {start + 1:,}–{stop:,} of {len(frame):,}")
+    st.dataframe(styled_window(window, frame, rules, formats), use_container_width=True, hide_index=True)
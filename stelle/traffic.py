@@ -0,0 +1,121 @@
+"""Customer traffic by hour of day and weekday.
+
+Transaction timestamps are binned with integer arithmetic on their epoch
+nanoseconds and a single `np.bincount` into an (item x weekday x hour) count
+cube, so any menu-item filter is a slice rather than a rescan. Each
+transaction is weighted by its Customers, so the cube counts customers
+whether the rows are order lines or daily totals. Histograms are
+built once per dataset and extended with the rows a refreshed dataset adds.
+"""
+import threading
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from stelle import perf
+from stelle.data import DATASETS_KEPT, dataset_key, order_timestamps
+
+NS_PER_HOUR = 3_600_000_000_000
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+OPENING_HOURS = range(6, 23)
+
+
+def bin_timestamps(timestamps, items=None, n_items=1, weights=None):
+    """(n_items, 7, 24) counts of `timestamps`, optionally split by item code and weighted."""
+    hours = np.asarray(timestamps, dtype="datetime64[ns]").view(np.int64) // NS_PER_HOUR
+    # Hours since the epoch modulo one week give weekday * 24 + hour; the epoch
+    # was a Thursday (weekday 3 with Monday as 0), hence the 72 hour shift
+    slots = (hours + 72) % 168
+    if items is not None:
+        slots = slots + np.asarray(items, dtype=np.int64) * 168
+    counts = np.bincount(slots, weights=weights, minlength=n_items * 168)
+    return counts.astype(np.int64).reshape(n_items, 7, 24)
+
+
+class TrafficHistogram:
+    """Customer counts per menu item, weekday and hour of day."""
+
+    def __init__(self, items):
+        self.items = list(items)
+        self.counts = np.zeros((len(self.items), 7, 24), dtype=np.int64)
+        self.rows = 0
+        self.last_date = None
+
+    def add(self, frame):
+        if frame.empty:
+            return self
+        timestamps, rows, weights = _timestamps(frame)
+        codes = pd.Categorical(frame["Top Item"], categories=self.items).codes[rows]
+        # Not in place: snapshot counts are read-only memory maps
+        self.counts = self.counts + bin_timestamps(timestamps, codes, len(self.items), weights)
+        self.rows += len(frame)
+        newest = frame["Date"].max()
+        self.last_date = newest if self.last_date is None else max(self.last_date, newest)
+        return self
+
+    def grid(self, top_item=None):
+        """(7, 24) weekday x hour counts for one item or all items."""
+        if top_item is None:
+            return self.counts.sum(axis=0)
+        return self.counts[self.items.index(top_item)]
+
+    def by_hour(self, top_item=None, hours=OPENING_HOURS):
+        counts = self.grid(top_item).sum(axis=0)
+        return pd.DataFrame({"Hour": list(hours), "Customers": counts[list(hours)]})
+
+    def by_weekday(self, top_item=None, hours=OPENING_HOURS):
+        """Weekday x hour frame for heatmaps, restricted to opening hours."""
+        grid = self.grid(top_item)[:, list(hours)]
+        return pd.DataFrame(grid, index=WEEKDAYS, columns=list(hours))
+
+
+def _timestamps(frame):
+    """Per-transaction timestamps, the frame row each belongs to and its customers (None for one each)."""
+    if "Timestamp" in frame:
+        return frame["Timestamp"].to_numpy(), np.arange(len(frame)), frame["Customers"].to_numpy(dtype=np.float64)
+    # Daily rows: spread each day's customers over the opening hours, one
+    # timestamp per customer
+    return (*order_timestamps(frame), None)
+
+
+_histograms = OrderedDict()
+_histograms_lock = threading.Lock()
+
+
+def seed(histogram, name="default"):
+    """Start `name` from a precomputed histogram; the next traffic_for(name) extends it from there."""
+    with _histograms_lock:
+        _histograms[(name, None)] = (None, histogram)
+
+
+@perf.timed("traffic_for")
+def traffic_for(frame, name="default"):
+    """Return the histogram for `frame`, extending the previous one when possible.
+
+    Histograms are kept per name and per source and date range (see
+    stelle.data.dataset_key); the first dataset under a seeded name takes over
+    the seed.
+    """
+    key = dataset_key(frame, name)
+    with _histograms_lock:
+        ref, histogram = _histograms.get(key) or _histograms.pop((name, None), (None, None))
+        if ref is not None and ref() is frame:
+            return histogram
+        items = list(frame["Top Item"].cat.categories)
+        if histogram is not None and histogram.items == items and histogram.last_date is not None:
+            known = int(frame["Date"].searchsorted(histogram.last_date, side="right"))
+            if known == histogram.rows:
+                histogram.add(frame.iloc[known:])
+            else:
+                histogram = None
+        else:
+            histogram = None
+        if histogram is None:
+            histogram = TrafficHistogram(items).add(frame)
+        _histograms[key] = (weakref.ref(frame), histogram)
+        _histograms.move_to_end(key)
+        while len(_histograms) > DATASETS_KEPT:
+            _histograms.popitem(last=False)
+        return histogram
@@ -0,0 +1,44 @@
+import numpy as np
+
+from stelle.alerts import DETECTOR_STATE, SERIES_STATE, AlertMonitor
+from stelle.data import load_data
+from stelle.storage import write_partitioned
+
+
+def _state(monitor):
+    return {name: getattr(monitor.engine, name) for name in [*SERIES_STATE, *DETECTOR_STATE]}
+
+
+def test_scan_reads_only_new_files_and_matches_a_replay(tmp_path):
+    orders = load_data()
+    write_partitioned(orders[orders["Date"] < "2023-07-01"], tmp_path)
+    reads = []
+
+    def load(source=None, start=None, end=None):
+        frame = load_data(source, start, end)
+        reads.append(frame.attrs["stelle.read"]["files"])
+        return frame
+
+    monitor = AlertMonitor(source=str(tmp_path), load=load, interval=1e9)
+    assert monitor.wait(30)
+    write_partitioned(orders[orders["Date"] >= "2023-07-01"], tmp_path)
+    reads.clear()
+    assert monitor.scan() == 184
+    # The June files holding the last fed day, then July to December
+    assert reads == [3 * 7]
+
+    replay = AlertMonitor(source=str(tmp_path), interval=1e9)
+    assert replay.wait(30)
+    assert monitor.engine.keys == replay.engine.keys
+    for name, values in _state(monitor).items():
+        np.testing.assert_allclose(values.astype(float), _state(replay)[name].astype(float), err_msg=name)
+
+
+def test_rewritten_history_is_replayed(tmp_path):
+    orders = load_data()
+    write_partitioned(orders, tmp_path)
+    monitor = AlertMonitor(source=str(tmp_path), interval=1e9)
+    assert monitor.wait(30)
+    march = orders[(orders["Date"] >= "2023-03-01") & (orders["Date"] < "2023-04-01")]
+    write_partitioned(march.assign(Sales=march["Sales"] * 3), tmp_path)
+    assert monitor.scan() == 364
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from stelle.cohorts import CohortMatrix
+
+
+@pytest.fixture(scope="module")
+def orders():
+    rng = np.random.default_rng(0)
+    dates = pd.Timestamp("2023-01-01") + pd.to_timedelta(np.sort(rng.integers(0, 300, size=5000)), unit="D")
+    ids = rng.integers(0, 400, size=5000).astype(float)
+    ids[rng.random(5000) < 0.02] = np.nan
+    return pd.DataFrame({"Date": dates, "Customer ID": ids})
+
+
+def _expected(orders, grain):
+    """Counts, active and returning customers straight from a groupby, periods numbered from 0."""
+    known = orders.dropna(subset=["Customer ID"])
+    period = known["Date"].dt.to_period("M" if grain == "Monthly" else "W-SUN").astype("int64")
+    pairs = pd.DataFrame({"Customer": known["Customer ID"], "Period": period - period.min()}).drop_duplicates()
+    pairs["Cohort"] = pairs.groupby("Customer")["Period"].transform("min")
+    periods = range(pairs["Period"].max() + 1)
+    counts = pd.crosstab(pairs["Cohort"], pairs["Period"] - pairs["Cohort"]).reindex(index=periods, columns=periods, fill_value=0)
+    active = pairs.groupby("Period").size().reindex(periods, fill_value=0)
+    before = pairs.assign(Period=pairs["Period"] + 1)[["Customer", "Period"]]
+    returning = pairs.merge(before).groupby("Period").size().reindex(periods, fill_value=0)
+    return counts, active, returning
+
+
+@pytest.mark.parametrize("grain", ["Monthly", "Weekly"])
+def test_retention_matches_a_groupby(orders, grain):
+    counts, active, returning = _expected(orders, grain)
+    matrix = CohortMatrix(grain).append(orders)
+    table = matrix.retention(share=False)
+    # Offsets past the newest period are missing, not zero
+    future = np.add.outer(np.arange(len(active)), np.arange(len(active))) >= len(active)
+    np.testing.assert_array_equal(np.isnan(table.to_numpy()), future)
+    np.testing.assert_array_equal(table.to_numpy()[~future], counts.to_numpy()[~future])
+    rates = matrix.rates()
+    np.testing.assert_array_equal(rates["Active"].to_numpy(), active.to_numpy())
+    np.testing.assert_array_equal(rates["Returning"].to_numpy(), returning.to_numpy())
+
+
+def test_appending_in_batches_matches_one_pass(orders):
+    whole = CohortMatrix("Weekly").append(orders)
+    batched = CohortMatrix("Weekly")
+    for day in pd.date_range("2023-01-01", periods=10, freq="30D"):
+        batched.append(orders[(orders["Date"] >= day) & (orders["Date"] < day + pd.Timedelta(days=30))])
+    pd.testing.assert_frame_equal(batched.retention(), whole.retention())
+    pd.testing.assert_frame_equal(batched.rates(), whole.rates())
@@ -0,0 +1,10 @@
+import json
+
+from stelle.data import dataset_key, load_data
+
+
+def test_loaded_frames_carry_a_json_serialisable_source():
+    frame = load_data(start="2023-02-01", end="2023-06-30")
+    assert dataset_key(frame, "x") == ("x", ("sample", "2023-02-01", "2023-06-30"))
+    # Streamlit serialises attrs with every frame it shows, derived ones included
+    json.dumps(frame.iloc[:5].attrs)
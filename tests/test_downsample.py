@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from stelle.downsample import downsample, lttb, minmax
+
+
+def _series(n=10_000, seed=0):
+    rng = np.random.default_rng(seed)
+    y = rng.normal(0, 1, n).cumsum()
+    y[1234], y[8765] = y.max() + 50, y.min() - 50
+    return np.arange(n), y
+
+
+def test_lttb_keeps_endpoints_and_spikes_at_the_requested_count():
+    x, y = _series()
+    keep = lttb(x, y, 500)
+    assert len(keep) == 500 and (np.diff(keep) > 0).all()
+    assert keep[0] == 0 and keep[-1] == len(x) - 1
+    assert {1234, 8765} <= set(keep)
+
+
+@pytest.mark.parametrize("n_out", [4, 5, 100, 501])
+def test_minmax_keeps_endpoints_and_extrema_within_the_requested_count(n_out):
+    x, y = _series()
+    keep = minmax(x, y, n_out)
+    assert len(keep) <= n_out and {0, len(x) - 1, int(np.argmin(y)), int(np.argmax(y))} <= set(keep)
+
+
+def test_downsample_reduces_only_the_zoom_window():
+    frame = pd.DataFrame({"Date": pd.date_range("2023-01-01", periods=50_000, freq="min"),
+                          "Sales": _series(50_000)[1]})
+    window = (pd.Timestamp("2023-01-10"), pd.Timestamp("2023-01-20"))
+    points = downsample(frame, "Date", "Sales", width=300, window=window)
+    assert len(points) == 600
+    assert points["Date"].min() >= window[0] and points["Date"].max() <= window[1]
+    assert len(downsample(frame, "Date", "Sales", width=300)) == 600
@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from stelle.data import load_data
+from stelle.filters import And, Between, Eq, FilterIndex, In, Or
+
+
+@pytest.fixture(scope="module")
+def orders():
+    return load_data()
+
+
+def _cases(orders):
+    item, service, location = orders["Top Item"], orders["Service Type"], orders["Location"]
+    dates = orders["Date"]
+    return [
+        (Eq("Top Item", "Pizza"), item == "Pizza"),
+        (Eq("Location", "Nowhere"), location == "Nowhere"),
+        (Eq("Month", "2023-02"), dates.dt.strftime("%Y-%m") == "2023-02"),
+        (In("Service Type", ("Delivery", "Takeaway")), service.isin(["Delivery", "Takeaway"])),
+        (Between("2023-01-10", "2023-02-20"), dates.between("2023-01-10", "2023-02-20")),
+        (Between("2030-01-01", "2030-12-31"), dates.between("2030-01-01", "2030-12-31")),
+        (And(Eq("Location", "Downtown"), Eq("Top Item", "Salad"), Between("2023-03-01", "2023-06-30")),
+         (location == "Downtown") & (item == "Salad") & dates.between("2023-03-01", "2023-06-30")),
+        (Or(Eq("Top Item", "Burger"), And(Eq("Service Type", "Dine-in"), Eq("Month", "2023-04"))),
+         (item == "Burger") | ((service == "Dine-in") & (dates.dt.strftime("%Y-%m") == "2023-04"))),
+        (And(), pd.Series(True, index=orders.index)),
+        (Or(), pd.Series(False, index=orders.index)),
+    ]
+
+
+def test_positions_match_a_boolean_mask(orders):
+    index = FilterIndex(orders)
+    for expr, mask in _cases(orders):
+        np.testing.assert_array_equal(index.positions(expr), np.flatnonzero(mask.to_numpy()), err_msg=repr(expr))
+
+
+def test_select_matches_boolean_indexing(orders):
+    index = FilterIndex(orders)
+    for expr, mask in _cases(orders):
+        pd.testing.assert_frame_equal(index.select(orders, expr), orders[mask.to_numpy()])
@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+
+from stelle.data import load_data
+from stelle.forecast import ForecastEngine, daily_matrix, forecaster_for
+from stelle.rollup import RollupCube
+from stelle.shards import ShardSet
+
+
+def test_merged_cube_extends_the_fitted_engine():
+    full = load_data()
+    shards = ShardSet().refresh(load_data(end="2023-09-30"))
+    engine = forecaster_for(shards.cube(), "test-merged")
+    fitted_day = engine.last_day
+    shards.refresh(full)
+    assert forecaster_for(shards.cube(), "test-merged") is engine
+    assert engine.last_day > fitted_day
+    refit = forecaster_for(ShardSet().refresh(full).cube(), "test-refit")
+    for model in engine.models:
+        np.testing.assert_allclose(engine.forecast(model, "2024-01-01")["Predicted Sales"],
+                                   refit.forecast(model, "2024-01-01")["Predicted Sales"], rtol=1e-6)
+
+
+def test_engines_are_kept_per_date_range():
+    first = ShardSet().refresh(load_data(start="2023-02-01", end="2023-09-30"))
+    second = ShardSet().refresh(load_data(start="2023-03-01", end="2023-06-30"))
+    engine = forecaster_for(first.cube("Midtown"), "Midtown", first.frame("Midtown"))
+    other = forecaster_for(second.cube("Midtown"), "Midtown", second.frame("Midtown"))
+    assert other is not engine and other.last_day == pd.Timestamp("2023-06-30")
+    assert forecaster_for(first.cube("Midtown"), "Midtown", first.frame("Midtown")) is engine
+
+
+def test_empty_cube_leaves_the_engine_unfitted():
+    engine = ForecastEngine(*daily_matrix(RollupCube(load_data().iloc[:0])))
+    assert engine.last_day is None
@@ -0,0 +1,16 @@
+import pytest
+
+from benchmarks.headless import RecordingStreamlit
+from stelle.data import load_data
+from stelle.reports import HtmlStreamlit
+from stelle.sections import SECTIONS, SectionContext, render
+from stelle.shards import shards_for
+
+
+@pytest.mark.parametrize("stand_in", [RecordingStreamlit, HtmlStreamlit])
+@pytest.mark.parametrize("name", list(SECTIONS))
+def test_every_section_renders_through_both_stand_ins(stand_in, name):
+    shards = shards_for(load_data())
+    dataset = shards.frame("Downtown")
+    render(name, stand_in(), SectionContext(data=dataset, dataset=dataset, cube=shards.cube("Downtown"),
+                                            shards=shards, location="Downtown"))
@@ -0,0 +1,28 @@
+import numpy as np
+import pandas as pd
+
+from stelle.data import load_data
+from stelle.inventory import SAMPLE_RECIPES, BillOfMaterials, InventoryEngine
+from stelle.rollup import RollupCube
+
+
+def test_consumption_matches_a_dense_product():
+    # A repeated (item, ingredient) pair adds up, as in a recipe listing it twice
+    recipes = pd.concat([SAMPLE_RECIPES, pd.DataFrame([("Pizza", "Cheese", 0.01)], columns=SAMPLE_RECIPES.columns)])
+    bom = BillOfMaterials(recipes)
+    dense = recipes.pivot_table(index="Item", columns="Ingredient", values="Quantity", aggfunc="sum", fill_value=0)
+    dense = dense.reindex(index=bom.items, columns=bom.ingredients).to_numpy()
+    portions = np.random.default_rng(0).integers(0, 50, size=(30, len(bom.items))).astype(np.float64)
+    np.testing.assert_allclose(bom.consumption(portions), portions @ dense)
+    np.testing.assert_allclose(bom.consumption(portions[0]), portions[:1] @ dense)
+
+
+def test_usage_matches_a_merge_and_groupby():
+    orders = load_data()
+    downtown = orders[orders["Location"] == "Downtown"]
+    usage = InventoryEngine().usage(RollupCube(downtown))
+    merged = downtown.merge(SAMPLE_RECIPES, left_on="Top Item", right_on="Item")
+    expected = (merged["Customers"] * merged["Quantity"]).groupby([merged["Date"], merged["Ingredient"]]).sum()
+    expected = expected.unstack(fill_value=0).reindex(index=usage.index, columns=usage.columns, fill_value=0)
+    np.testing.assert_allclose(usage.to_numpy(), expected.to_numpy())
+    assert usage.index.equals(pd.DatetimeIndex(sorted(downtown["Date"].unique())))
@@ -0,0 +1,54 @@
+import json
+import os
+
+import numpy as np
+
+from stelle.live import FileTailer, LiveFeed, RingBuffer, RunningTotals, parse_events
+
+
+def _events(*rows):
+    return [json.dumps({"ts": ts, "amount": amount, "orders": orders}).encode() for ts, amount, orders in rows]
+
+
+def test_ring_buffer_wraps_around_keeping_the_newest_rows():
+    buffer = RingBuffer(capacity=5, columns={"x": "int64"})
+    buffer.extend({"x": np.arange(3)})
+    buffer.extend({"x": np.arange(3, 7)})
+    assert buffer.snapshot()["x"].tolist() == [2, 3, 4, 5, 6]
+    buffer.extend({"x": np.arange(7, 20)})
+    assert buffer.snapshot()["x"].tolist() == [15, 16, 17, 18, 19]
+
+
+def test_file_tailer_holds_partial_lines_and_follows_rotation(tmp_path):
+    path = tmp_path / "events.jsonl"
+    path.write_bytes(b'{"a": 1}\n{"a"')
+    tailer = FileTailer(str(path))
+    assert tailer.poll() == [b'{"a": 1}']
+    with open(path, "ab") as handle:
+        handle.write(b': 2}\n')
+    assert tailer.poll() == [b'{"a": 2}']
+    # Rotation: a new file under the same name, already longer than the offset
+    rotated = tmp_path / "next.jsonl"
+    rotated.write_bytes(b'{"b": 1}\n{"b": 2}\n{"b": 3}\n')
+    os.replace(rotated, path)
+    assert tailer.poll() == [b'{"b": 1}', b'{"b": 2}', b'{"b": 3}']
+
+
+def test_running_totals_roll_over_to_the_newest_day():
+    totals = RunningTotals()
+    totals.update(parse_events(_events(("2026-10-16T22:00:00", 10.0, 1), ("2026-10-16T23:00:00", 5.0, 2))))
+    assert (totals.revenue, totals.orders) == (15.0, 3)
+    totals.update(parse_events(_events(("2026-10-16T23:59:00", 4.0, 1), ("2026-10-17T00:01:00", 7.5, 1))))
+    assert (str(totals.day), totals.revenue, totals.orders) == ("2026-10-17", 7.5, 1)
+    totals.update(parse_events(_events(("2026-10-17T09:00:00", 2.5, 3))))
+    assert (totals.revenue, totals.orders) == (10.0, 4)
+
+
+def test_per_minute_bins_the_last_hour():
+    feed = LiveFeed(capacity=10)
+    feed.ingest(_events(("2026-10-17T17:00:30", 99.0, 1), ("2026-10-17T18:58:10", 10.0, 1),
+                        ("2026-10-17T18:58:50", 5.0, 2), ("2026-10-17T18:59:59", 1.0, 1)))
+    recent = feed.per_minute(minutes=60)
+    assert len(recent) == 60 and str(recent["Minute"].iloc[-1]) == "2026-10-17 18:59:00"
+    assert recent["Revenue"].tolist()[-2:] == [15.0, 1.0] and recent["Orders"].tolist()[-2:] == [3, 1]
+    assert recent["Revenue"].sum() == 16.0
@@ -0,0 +1,31 @@
+import gc
+
+import pandas as pd
+
+from stelle.data import load_data
+from stelle.inventory import inventory_engine
+from stelle.menu import MenuEngine
+from stelle.rollup import RollupCube
+
+
+def test_periods_follow_date_range_changes():
+    # A cube for a new range can reuse the id of the previous range's cube
+    engine = MenuEngine(inventory_engine().bom)
+    for start, end in [("2023-02-01", "2023-09-30"), ("2023-01-01", "2023-12-31"), ("2023-03-01", "2023-06-30")]:
+        cube = RollupCube(load_data(start=start, end=end))
+        result = engine.periods(cube, "Monthly")
+        expected = MenuEngine(inventory_engine().bom).periods(cube, "Monthly")
+        pd.testing.assert_frame_equal(result, expected)
+        assert result["Date"].min() == pd.Timestamp(start)
+        del cube
+        gc.collect()
+
+
+def test_matrix_follows_date_range_changes():
+    engine = MenuEngine(inventory_engine().bom)
+    for start, end in [("2023-02-01", "2023-09-30"), ("2023-01-01", "2023-12-31")]:
+        cube = RollupCube(load_data(start=start, end=end))
+        expected = MenuEngine(inventory_engine().bom).matrix(cube)
+        pd.testing.assert_frame_equal(engine.matrix(cube), expected)
+        del cube
+        gc.collect()
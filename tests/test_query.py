@@ -0,0 +1,56 @@
+from importlib.util import find_spec
+
+import pandas as pd
+import pytest
+
+from stelle.data import load_data
+from stelle.filters import And, Between, Eq, In, Or
+from stelle.query import ROWS, Agg, DuckDBEngine, PandasEngine, PolarsEngine, Query
+from stelle.storage import write_partitioned
+
+QUERIES = [
+    Query((Agg("Sales"), ROWS)),
+    Query((Agg("Sales"), Agg("Customers"), ROWS), by=("Top Item",)),
+    Query((Agg("Sales"), Agg("Service Time", "mean"), Agg("Staff Present", "max", "Most Staff")),
+          by=("Date", "Location"), grain="Weekly", where=Between("2023-02-01", "2023-05-31")),
+    Query((Agg("Customers"), ROWS), by=("Date", "Service Type"), grain="Monthly",
+          where=And(In("Top Item", ("Pizza", "Pasta")), Or(Eq("Location", "Downtown"), Eq("Month", "2023-03")))),
+    Query((Agg("Sales"),), by=("Top Item",), order_by="Sales", descending=True, limit=2),
+]
+
+
+@pytest.fixture(scope="module")
+def orders():
+    return load_data()
+
+
+@pytest.fixture(scope="module")
+def engines(orders, tmp_path_factory):
+    root = tmp_path_factory.mktemp("orders")
+    write_partitioned(orders, root / "partitioned")
+    orders.to_parquet(root / "orders.parquet")
+    engines = {"pandas": PandasEngine(orders, "test_query")}
+    # The on-disk engines are optional; each one installed is compared
+    if find_spec("duckdb"):
+        engines["duckdb"] = DuckDBEngine(str(root / "orders.parquet"))
+        engines["duckdb partitioned"] = DuckDBEngine(str(root / "partitioned"))
+    if find_spec("polars"):
+        engines["polars"] = PolarsEngine(str(root / "orders.parquet"))
+        engines["polars partitioned"] = PolarsEngine(str(root / "partitioned"))
+    return engines
+
+
+def test_pandas_engine_matches_a_groupby(orders):
+    grouped = orders.groupby("Top Item", observed=True).agg(Sales=("Sales", "sum"), Customers=("Customers", "sum"),
+                                                           Rows=("Sales", "size")).reset_index()
+    result = PandasEngine(orders, "test_query").execute(QUERIES[1])
+    pd.testing.assert_frame_equal(result, grouped, check_dtype=False, check_categorical=False)
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_engines_agree(engines, query):
+    expected = engines["pandas"].execute(query)
+    assert len(expected)
+    for name, engine in engines.items():
+        result = engine.execute(query)
+        pd.testing.assert_frame_equal(result, expected, check_dtype=False, obj=name)
@@ -0,0 +1,42 @@
+import pandas as pd
+
+from stelle.data import load_data
+from stelle.reports import HtmlStreamlit
+from stelle.sections import SectionContext, render
+from stelle.sentiment import scored_reviews
+from stelle.shards import shards_for
+
+
+class RecordingContext(SectionContext):
+    """SectionContext that keeps the data of every figure a section builds, by title."""
+
+    def figure(self, build, data, **kwargs):
+        self.figures[kwargs.get("title")] = data
+        return super().figure(build, data, **kwargs)
+
+
+def _render(name, location, start=None, end=None, figures=None, **selections):
+    shards = shards_for(load_data(start=start, end=end))
+    dataset = shards.frame(location)
+    st = HtmlStreamlit()
+    ctx = RecordingContext(data=dataset, dataset=dataset, cube=shards.cube(location), shards=shards,
+                           location=location, **selections)
+    ctx.figures = {} if figures is None else figures
+    render(name, st, ctx)
+    return st.html()
+
+
+def test_overview_with_an_item_not_sold_in_range():
+    dataset = shards_for(load_data(start="2023-01-05", end="2023-01-05")).frame("Downtown")
+    unsold = next(item for item in dataset["Top Item"].cat.categories if item not in set(dataset["Top Item"]))
+    page = _render("Overview", "Downtown", "2023-01-05", "2023-01-05", menu_item_filter=unsold)
+    assert "$0.00" in page and "—" in page
+
+
+def test_sentiment_is_per_location_in_both_sections():
+    insights, feedback = {}, {}
+    _render("Customer Insights", "Midtown", figures=insights)
+    _render("Customer Feedback", "Midtown", figures=feedback)
+    title = "Customer Sentiment Distribution"
+    pd.testing.assert_frame_equal(insights[title], feedback[title])
+    assert insights[title]["Count"].sum() < scored_reviews().counts()["Count"].sum()
@@ -0,0 +1,29 @@
+from collections import Counter
+
+import pandas as pd
+
+from stelle.sentiment import STOPWORDS, TOKEN_PATTERN, SentimentStore, count_phrases, sample_reviews
+
+
+def test_count_phrases_stays_within_each_review():
+    texts = pd.Series(["Great pizza", "", "pizza was not fresh at all", "fresh salad"], index=[7, 7, 8, 9])
+    expected = Counter()
+    for tokens in texts.str.lower().str.findall(TOKEN_PATTERN):
+        for size in (2, 3):
+            for start in range(len(tokens) - size + 1):
+                gram = tokens[start:start + size]
+                if gram[0] not in STOPWORDS and gram[-1] not in STOPWORDS:
+                    expected[" ".join(gram)] += 1
+    assert count_phrases(texts) == expected
+    assert "pizza pizza" not in count_phrases(texts) and "fresh fresh" not in count_phrases(texts)
+
+
+def test_store_views_are_per_location():
+    reviews = sample_reviews(days=60)
+    store = SentimentStore()
+    store.update(reviews)
+    locations = sorted(reviews["Location"].unique())
+    assert sorted(store.phrases) == locations
+    per_location = sum(store.counts(location)["Count"].to_numpy() for location in locations)
+    assert (per_location == store.counts()["Count"].to_numpy()).all()
+    assert store.counts(locations[0])["Count"].sum() == (reviews["Location"] == locations[0]).sum()
@@ -0,0 +1,34 @@
+import pandas as pd
+import pytest
+
+from stelle.data import load_data
+from stelle.query import disk_engine
+from stelle.shards import ShardSet, shards_for
+from stelle.storage import write_partitioned
+
+
+@pytest.mark.parametrize("kind", ["duckdb", "polars"])
+def test_engine_built_shards_match_pandas(tmp_path, kind):
+    pytest.importorskip(kind)
+    write_partitioned(load_data(), tmp_path)
+    dates = ("2023-02-01", "2023-05-31")
+    dataset = load_data(str(tmp_path), *dates)
+    built = ShardSet().refresh(dataset, engine=disk_engine(kind=kind, source=str(tmp_path), dates=dates))
+    expected = ShardSet().refresh(dataset)
+    assert built.locations == expected.locations
+    for location in ["All Locations", *expected.locations]:
+        cube = built.cube(location)
+        assert (cube.rows, cube.last_date) == (expected.cube(location).rows, expected.cube(location).last_date)
+        for grain in ["Daily", "Monthly"]:
+            pd.testing.assert_frame_equal(cube.view(grain, by=["Top Item"]).astype({"Top Item": str}),
+                                          expected.cube(location).view(grain, by=["Top Item"]).astype({"Top Item": str}),
+                                          check_dtype=False)
+
+
+def test_shards_are_kept_per_date_range():
+    first = shards_for(load_data(start="2023-02-01", end="2023-09-30"))
+    second = shards_for(load_data(start="2023-03-01", end="2023-06-30"))
+    assert second is not first
+    assert shards_for(load_data(start="2023-02-01", end="2023-09-30")) is first
+    assert first.cube().last_date == pd.Timestamp("2023-09-30")
+    assert second.cube().last_date == pd.Timestamp("2023-06-30")
@@ -0,0 +1,27 @@
+import pandas as pd
+import pyarrow as pa
+
+from stelle import snapshots
+from stelle.data import load_data
+from stelle.rollup import RollupCube
+
+
+def test_snapshot_cube_matches_and_maps_its_measures(tmp_path, monkeypatch):
+    orders = load_data()
+    snapshots.write_snapshot(tmp_path, orders)
+    mapped, open_map = [], pa.memory_map
+
+    def memory_map(path):
+        source = open_map(path)
+        mapped.append(source.read_buffer())
+        source.seek(0)
+        return source
+
+    monkeypatch.setattr(snapshots.pa, "memory_map", memory_map)
+    daily = snapshots.latest(tmp_path).cube("Downtown").tables["Daily"]
+    expected = RollupCube(orders[orders["Location"] == "Downtown"]).tables["Daily"]
+    pd.testing.assert_frame_equal(daily.sort_index(), expected.sort_index(), check_dtype=False,
+                                  check_index_type=False, check_categorical=False)
+    # The measures point into a mapped file rather than at a decoded copy
+    address = daily["Sales"].to_numpy().__array_interface__["data"][0]
+    assert any(buffer.address <= address < buffer.address + buffer.size for buffer in mapped)
@@ -0,0 +1,39 @@
+import numpy as np
+
+from stelle import staffing
+from stelle.staffing import SHIFTS, assign_shifts, erlang_c_staff, sample_roster
+from stelle.traffic import WEEKDAYS
+
+
+def test_erlang_c_matches_the_textbook_value():
+    # 200 customers/hour at 3 minutes each is 10 Erlangs; with 11 staff the
+    # probability of waiting is 0.6821, an average wait of 2.046 minutes
+    assert erlang_c_staff([200.0], 3.0, target_wait=2.05).tolist() == [11]
+    assert erlang_c_staff([200.0], 3.0, target_wait=2.04).tolist() == [12]
+    assert erlang_c_staff([0.0, 12.0], 3.0).tolist() == [0, 1]
+
+
+def test_shifts_cover_the_requirement():
+    arrivals = np.zeros((7, 24))
+    arrivals[:, 7:22] = np.linspace(10, 60, 15)
+    required = erlang_c_staff(arrivals, 4.0)
+    schedule, shortfall = assign_shifts(required, sample_roster(size=60))
+    assert not shortfall.any()
+    covered = np.zeros((7, 24), dtype=np.int64)
+    for day, shift in zip(schedule["Day"], schedule["Shift"]):
+        start, end = SHIFTS[shift]
+        covered[WEEKDAYS.index(day), start:end] += 1
+    assert (covered >= required).all()
+    # Every staffed slot meets the wait target with the staff it was given
+    assert (erlang_c_staff(arrivals, 4.0, target_wait=staffing.TARGET_WAIT_MINUTES, max_staff=covered.max()) <= covered).all()
+
+
+def test_rosters_are_bounded_and_follow_the_roster_file(tmp_path, monkeypatch):
+    monkeypatch.delenv("STELLE_ROSTER", raising=False)
+    for number in range(staffing.DATASETS_KEPT + 4):
+        staffing.load_roster(f"Location {number}")
+    assert len(staffing._rosters) <= staffing.DATASETS_KEPT
+    path = tmp_path / "roster.csv"
+    sample_roster(size=2, location="Downtown").to_csv(path, index=False)
+    monkeypatch.setenv("STELLE_ROSTER", str(path))
+    assert staffing.load_roster("Downtown")["Staff"].nunique() == 2
@@ -0,0 +1,25 @@
+import pandas as pd
+
+from stelle.data import load_data, load_orders
+from stelle.storage import read_partitions, write_partitioned
+
+
+def test_range_outside_the_data_reads_no_files(tmp_path):
+    orders = load_data()
+    write_partitioned(orders, tmp_path)
+    frame = read_partitions(tmp_path, "2030-01-01", "2030-01-31")
+    assert frame.empty
+    assert {"Date", "Location", "Sales", "Top Item"} <= set(frame.columns)
+    assert "Month" not in frame.columns
+    assert frame.attrs["stelle.read"]["files"] == 0
+    assert load_orders(str(tmp_path), "2030-01-01", "2030-01-31").empty
+
+
+def test_range_reads_only_its_rows(tmp_path):
+    orders = load_data()
+    write_partitioned(orders, tmp_path)
+    frame = read_partitions(tmp_path, "2023-03-05", "2023-03-11", locations=["Downtown"])
+    expected = orders[(orders["Date"] >= "2023-03-05") & (orders["Date"] <= "2023-03-11") & (orders["Location"] == "Downtown")]
+    assert len(frame) == len(expected)
+    assert frame["Date"].min() == pd.Timestamp("2023-03-05")
+    assert frame.attrs["stelle.read"]["files"] == 1
@@ -0,0 +1,19 @@
+import numpy as np
+import pandas as pd
+
+from stelle.tables import Gradient, styled_window
+
+
+def _css(frame):
+    return styled_window(frame, frame, [Gradient(("Value",))])._compute().ctx
+
+
+def test_gradient_skips_empty_and_all_nan_columns():
+    for frame in [pd.DataFrame({"Value": pd.Series(dtype="float64")}), pd.DataFrame({"Value": [np.nan, np.nan]})]:
+        styled_window(frame, frame, [Gradient(("Value",))]).to_html()
+        assert not any(_css(frame).values())
+
+
+def test_gradient_leaves_nan_cells_plain():
+    css = _css(pd.DataFrame({"Value": [1.0, np.nan, 3.0]}))
+    assert css[(0, 0)] and css[(2, 0)] and not css.get((1, 0))
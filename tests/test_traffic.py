@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+
+from stelle.data import load_data
+from stelle.traffic import WEEKDAYS, TrafficHistogram, bin_timestamps
+
+
+def test_bin_timestamps_matches_weekday_and_hour():
+    timestamps = pd.to_datetime(["2026-10-12 06:15", "2026-10-12 06:59", "2026-10-17 23:30",
+                                 "2026-10-18 00:00", "1969-12-31 23:10"])
+    counts = bin_timestamps(timestamps.to_numpy())[0]
+    expected = np.zeros((7, 24), dtype=np.int64)
+    np.add.at(expected, (timestamps.weekday, timestamps.hour), 1)
+    np.testing.assert_array_equal(counts, expected)
+    assert counts[WEEKDAYS.index("Saturday"), 23] == 1 and counts[WEEKDAYS.index("Wednesday"), 23] == 1
+
+
+def test_order_lines_count_their_customers():
+    orders = pd.DataFrame({
+        "Date": pd.to_datetime(["2023-01-02", "2023-01-02", "2023-01-03"]),
+        "Timestamp": pd.to_datetime(["2023-01-02 12:10", "2023-01-02 12:40", "2023-01-03 19:05"]),
+        "Top Item": pd.Categorical(["Pizza", "Burger", "Pizza"]),
+        "Customers": [3, 2, 4],
+    })
+    histogram = TrafficHistogram(["Burger", "Pizza"]).add(orders)
+    assert histogram.grid()[0, 12] == 5 and histogram.grid("Pizza")[1, 19] == 4
+    assert histogram.grid().sum() == orders["Customers"].sum()
+
+
+def test_daily_rows_count_their_customers():
+    frame = load_data(end="2023-01-31")
+    histogram = TrafficHistogram(frame["Top Item"].cat.categories).add(frame)
+    assert histogram.grid().sum() == frame["Customers"].sum()